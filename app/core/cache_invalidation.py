@@ -11,20 +11,33 @@ Phase 3-05: Cache Optimization - Cache Invalidation Policies
 """
 
 import asyncio
-import hashlib
+import fnmatch
 import json
 import logging
+import re
 from abc import ABC, abstractmethod
+from collections import Counter, deque
 from dataclasses import dataclass, field
 from datetime import datetime, timedelta
 from enum import Enum
-from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+from typing import Any, Callable, Deque, Dict, List, Optional, Pattern, Set, Tuple
 from functools import wraps
+from itertools import islice
 
-from .cache_manager import get_cache_manager, CacheManager
+from .cache_manager import get_cache_manager, CacheManager, _build_key
 
 logger = logging.getLogger(__name__)
 
+# 通配符元字符
+_GLOB_CHARS = frozenset("*?[")
+
+
+def _compile_glob(pattern: str) -> Optional[Pattern[str]]:
+    """将通配符模式编译为正则，不含通配符时返回 None"""
+    if _GLOB_CHARS.isdisjoint(pattern):
+        return None
+    return re.compile(fnmatch.translate(pattern))
+
 
 class InvalidationType(Enum):
     """失效类型"""
@@ -57,7 +70,7 @@ class InvalidationEvent(Enum):
     MAINTENANCE_MODE = "maintenance_mode"
 
 
-@dataclass
+@dataclass(slots=True)
 class InvalidationRule:
     """失效规则"""
     name: str
@@ -68,9 +81,11 @@ class InvalidationRule:
     dependencies: Set[str] = field(default_factory=set)
     ttl: Optional[int] = None
     callback: Optional[Callable] = None
+    # 注册时预编译的通配符正则（无通配符时为 None，直接按键查找）
+    compiled_pattern: Optional[Pattern[str]] = field(default=None, repr=False, compare=False)
 
 
-@dataclass
+@dataclass(slots=True)
 class InvalidationRecord:
     """失效记录"""
     cache_key: str
@@ -94,9 +109,18 @@ class CacheInvalidator:
     def __init__(self, cache_manager: Optional[CacheManager] = None):
         self._cache_manager = cache_manager or get_cache_manager()
         self._rules: Dict[str, InvalidationRule] = {}
-        self._history: List[InvalidationRecord] = []
+        # 反向索引：事件/标签/依赖 -> 规则列表
+        self._by_event: Dict[InvalidationEvent, List[InvalidationRule]] = {}
+        self._by_tag: Dict[str, List[InvalidationRule]] = {}
+        self._by_dep: Dict[str, List[InvalidationRule]] = {}
         self._max_history = 1000
+        self._history: Deque[InvalidationRecord] = deque(maxlen=self._max_history)
+        # 累计统计（增量维护，避免 get_stats 扫描历史）
+        self._count_by_type: Counter = Counter()
+        self._count_by_trigger: Counter = Counter()
         self._event_handlers: Dict[InvalidationEvent, List[Callable]] = {}
+        # 模式 -> 匹配的缓存键（CACHE_CONFIGS 基本静态，变更时调用 clear_pattern_cache）
+        self._pattern_cache: Dict[str, Tuple[str, ...]] = {}
 
         # 注册默认失效规则
         self._register_default_rules()
@@ -130,15 +154,48 @@ class CacheInvalidator:
 
     def register_rule(self, rule: InvalidationRule):
         """注册失效规则"""
+        rule.compiled_pattern = _compile_glob(rule.cache_key_pattern)
+
+        # 同名规则先移出索引
+        old_rule = self._rules.get(rule.name)
+        if old_rule is not None:
+            self._unindex_rule(old_rule)
+
         self._rules[rule.name] = rule
+        self._index_rule(rule)
         logger.debug(f"📝 Registered invalidation rule: {rule.name}")
 
     def unregister_rule(self, rule_name: str):
         """取消注册失效规则"""
-        if rule_name in self._rules:
-            del self._rules[rule_name]
+        rule = self._rules.pop(rule_name, None)
+        if rule is not None:
+            self._unindex_rule(rule)
             logger.debug(f"🗑️ Unregistered invalidation rule: {rule_name}")
 
+    def _index_rule(self, rule: InvalidationRule):
+        """将规则加入反向索引"""
+        for event in rule.events:
+            self._by_event.setdefault(event, []).append(rule)
+        for tag in rule.tags:
+            self._by_tag.setdefault(tag, []).append(rule)
+        for dep in rule.dependencies:
+            self._by_dep.setdefault(dep, []).append(rule)
+
+    def _unindex_rule(self, rule: InvalidationRule):
+        """将规则移出反向索引"""
+        for index, names in (
+            (self._by_event, rule.events),
+            (self._by_tag, rule.tags),
+            (self._by_dep, rule.dependencies),
+        ):
+            for name in names:
+                rules = index.get(name)
+                if not rules:
+                    continue
+                rules[:] = [r for r in rules if r is not rule]
+                if not rules:
+                    del index[name]
+
     def on_event(self, event: InvalidationEvent, handler: Callable):
         """注册事件处理器"""
         if event not in self._event_handlers:
@@ -152,43 +209,40 @@ class CacheInvalidator:
         context = context or {}
         count = 0
 
-        # 触发事件处理器
-        if event in self._event_handlers:
-            for handler in self._event_handlers[event]:
-                try:
-                    result = await handler(context)
+        # 并发触发事件处理器（快照列表，避免执行期间注册新处理器）
+        handlers = tuple(self._event_handlers.get(event, ()))
+        if handlers:
+            results = await asyncio.gather(
+                *(handler(context) for handler in handlers),
+                return_exceptions=True,
+            )
+            for result in results:
+                if isinstance(result, Exception):
+                    logger.error(f"❌ Event handler failed: {result}")
+                elif isinstance(result, dict):
                     count += result.get("invalidated_count", 0)
-                except Exception as e:
-                    logger.error(f"❌ Event handler failed: {e}")
 
-        # 根据规则失效缓存
-        for rule in self._rules.values():
-            if event in rule.events:
-                count += await self._apply_rule(rule, trigger=event.value)
+        # 并发应用匹配的失效规则
+        count += await self._apply_rules(self._by_event.get(event, ()), trigger=event.value)
 
         logger.info(f"✅ Event {event.value} invalidated {count} caches")
         return count
 
     async def invalidate_by_tag(self, tag: str) -> int:
         """按标签失效缓存"""
-        count = 0
-        for rule in self._rules.values():
-            if tag in rule.tags:
-                count += await self._apply_rule(rule, trigger=f"tag:{tag}")
-        return count
+        return await self._apply_rules(self._by_tag.get(tag, ()), trigger=f"tag:{tag}")
 
     async def invalidate_by_pattern(self, pattern: str) -> int:
         """按模式失效缓存"""
-        import fnmatch
+        matched_keys = self._match_cache_keys(pattern)
+        if not matched_keys:
+            return 0
 
-        count = 0
-        for key in self._cache_manager.CACHE_CONFIGS.keys():
-            if fnmatch.fnmatch(key, pattern):
-                await self._cache_manager.delete(key)
-                self._record_history(key, InvalidationType.MANUAL, f"pattern:{pattern}")
-                count += 1
+        await self._cache_manager.delete_many(matched_keys)
+        for key in matched_keys:
+            self._record_history(key, InvalidationType.MANUAL, f"pattern:{pattern}")
 
-        return count
+        return len(matched_keys)
 
     async def invalidate_by_key(self, key: str) -> bool:
         """失效指定缓存"""
@@ -198,29 +252,52 @@ class CacheInvalidator:
 
     async def invalidate_dependencies(self, key: str) -> int:
         """级联失效依赖缓存"""
+        return await self._apply_rules(self._by_dep.get(key, ()), trigger=f"dependency:{key}")
+
+    async def _apply_rules(self, rules: List[InvalidationRule], trigger: str) -> int:
+        """并发应用多条失效规则，单条规则失败不影响其他规则"""
+        if not rules:
+            return 0
+
+        rules = tuple(rules)
+        results = await asyncio.gather(
+            *(self._apply_rule(rule, trigger=trigger) for rule in rules),
+            return_exceptions=True,
+        )
+
         count = 0
-        for rule in self._rules.values():
-            if key in rule.dependencies:
-                count += await self._apply_rule(rule, trigger=f"dependency:{key}")
+        for rule, result in zip(rules, results):
+            if isinstance(result, Exception):
+                logger.error(f"❌ Invalidation rule {rule.name} failed: {result}")
+            else:
+                count += result
         return count
 
     async def _apply_rule(self, rule: InvalidationRule, trigger: str) -> int:
         """应用失效规则"""
-        count = 0
-
         # 匹配缓存键
-        matched_keys = self._match_cache_keys(rule.cache_key_pattern)
+        matched_keys = self._match_cache_keys(rule.cache_key_pattern, rule.compiled_pattern)
 
-        for key in matched_keys:
-            await self._cache_manager.delete(key)
-            self._record_history(key, rule.invalidation_type, trigger)
-            count += 1
+        if matched_keys:
+            # 依赖键去重，每条规则只级联失效一次（而非每个匹配键一次）
+            deps_to_delete = set(rule.dependencies).difference(matched_keys)
+
+            # 匹配键与依赖键合并为一次批量删除
+            await self._cache_manager.delete_many(matched_keys + list(deps_to_delete))
+
+            for key in matched_keys:
+                self._record_history(key, rule.invalidation_type, trigger)
 
             # 级联失效依赖
-            if rule.dependencies:
-                for dep in rule.dependencies:
-                    await self._cache_manager.delete(dep)
-                    self._record_history(dep, InvalidationType.DEPENDENCY, f"parent:{key}")
+            for dep in deps_to_delete:
+                self._record_history(dep, InvalidationType.DEPENDENCY, f"parent_rule:{rule.name}")
+
+        # 通配符规则还需删除装饰器写入的派生键（"<配置键>:<摘要>"）
+        derived = 0
+        if rule.compiled_pattern is not None:
+            derived = await self._cache_manager.delete_pattern(rule.cache_key_pattern)
+            if derived:
+                self._record_history(rule.cache_key_pattern, rule.invalidation_type, trigger)
 
         # 执行回调
         if rule.callback:
@@ -229,18 +306,36 @@ class CacheInvalidator:
             except Exception as e:
                 logger.error(f"❌ Invalidation callback failed: {e}")
 
-        return count
+        return len(matched_keys) + derived
 
-    def _match_cache_keys(self, pattern: str) -> List[str]:
+    def _match_cache_keys(
+        self,
+        pattern: str,
+        compiled: Optional[Pattern[str]] = None,
+    ) -> List[str]:
         """匹配缓存键模式"""
-        import fnmatch
-
-        matched = []
-        for key in self._cache_manager.CACHE_CONFIGS.keys():
-            if fnmatch.fnmatch(key, pattern):
-                matched.append(key)
+        cached = self._pattern_cache.get(pattern)
+        if cached is not None:
+            return list(cached)
+
+        configs = self._cache_manager.CACHE_CONFIGS
+        if compiled is None:
+            compiled = _compile_glob(pattern)
+
+        if compiled is None:
+            # 无通配符：直接按键查找
+            matched = [pattern] if pattern in configs else []
+        else:
+            match = compiled.match
+            matched = [key for key in configs if match(key)]
+
+        self._pattern_cache[pattern] = tuple(matched)
         return matched
 
+    def clear_pattern_cache(self):
+        """清空模式匹配缓存（运行时修改 CACHE_CONFIGS 后调用）"""
+        self._pattern_cache.clear()
+
     def _record_history(
         self,
         cache_key: str,
@@ -254,11 +349,10 @@ class CacheInvalidator:
             trigger=trigger,
             timestamp=datetime.now(),
         )
+        # deque(maxlen) 自动淘汰最旧的记录
         self._history.append(record)
-
-        # 限制历史记录数量
-        if len(self._history) > self._max_history:
-            self._history = self._history[-self._max_history:]
+        self._count_by_type[invalidation_type.value] += 1
+        self._count_by_trigger[trigger] += 1
 
     def get_history(
         self,
@@ -266,28 +360,24 @@ class CacheInvalidator:
         limit: int = 100,
     ) -> List[InvalidationRecord]:
         """获取失效历史"""
-        history = self._history
-
         if cache_key:
-            import fnmatch
-            history = [r for r in history if fnmatch.fnmatch(r.cache_key, cache_key)]
+            compiled = _compile_glob(cache_key)
+            if compiled is None:
+                history = [r for r in self._history if r.cache_key == cache_key]
+            else:
+                match = compiled.match
+                history = [r for r in self._history if match(r.cache_key)]
+            return history[-limit:]
 
-        return history[-limit:]
+        start = max(0, len(self._history) - limit) if limit > 0 else 0
+        return list(islice(self._history, start, None))
 
     def get_stats(self) -> Dict[str, Any]:
-        """获取失效统计"""
-        by_type = {}
-        by_trigger = {}
-
-        for record in self._history:
-            type_name = record.invalidation_type.value
-            by_type[type_name] = by_type.get(type_name, 0) + 1
-            by_trigger[record.trigger] = by_trigger.get(record.trigger, 0) + 1
-
+        """获取失效统计（自启动以来的累计值）"""
         return {
-            "total_invalidations": len(self._history),
-            "by_type": by_type,
-            "by_trigger": by_trigger,
+            "total_invalidations": sum(self._count_by_type.values()),
+            "by_type": dict(self._count_by_type),
+            "by_trigger": dict(self._count_by_trigger),
             "rules_count": len(self._rules),
         }
 
@@ -319,12 +409,18 @@ class CachedWithInvalidation:
         self.ttl = ttl
         self.tags = tags or set()
         self.invalidate_on = invalidate_on or set()
-        self.invalidate_on_keys = invalidate_on or set()
+        self.invalidate_on_keys = invalidate_on_keys or set()
+        # 首次调用时解析并缓存管理器实例
+        self._mgr: Optional[CacheManager] = None
+        self._deps_registered = False
 
     def __call__(self, func: Callable):
         @wraps(func)
         async def wrapper(*args, **kwargs):
-            cache_manager = get_cache_manager()
+            cache_manager = self._mgr
+            if cache_manager is None:
+                cache_manager = self._mgr = get_cache_manager()
+                self._register_dependency_rule()
 
             # 生成缓存键
             actual_key = self._make_cache_key(func, args, kwargs)
@@ -344,21 +440,23 @@ class CachedWithInvalidation:
 
         return wrapper
 
-    def _make_cache_key(self, func: Callable, args: tuple, kwargs: dict) -> str:
-        """生成缓存键"""
-        # 包含函数名和参数的哈希
-        key_parts = [self.cache_key, func.__name__]
-
-        # 添加位置参数
-        for arg in args:
-            key_parts.append(str(arg))
-
-        # 添加关键字参数（排序以保持一致性）
-        for k in sorted(kwargs.keys()):
-            key_parts.append(f"{k}:{kwargs[k]}")
+    def _register_dependency_rule(self):
+        """将 invalidate_on_keys 注册为依赖失效规则（只注册一次）"""
+        if self._deps_registered or not self.invalidate_on_keys:
+            return
+
+        get_cache_invalidator().register_rule(InvalidationRule(
+            name=f"{self.cache_key}_deps",
+            # 实际写入的键为 _make_cache_key 生成的 "<cache_key>:<摘要>"
+            cache_key_pattern=f"{self.cache_key}:*",
+            invalidation_type=InvalidationType.DEPENDENCY,
+            dependencies=set(self.invalidate_on_keys),
+        ))
+        self._deps_registered = True
 
-        key_string = ":".join(key_parts)
-        return f"{self.cache_key}:{hashlib.md5(key_string.encode()).hexdigest()[:8]}"
+    def _make_cache_key(self, func: Callable, args: tuple, kwargs: dict) -> str:
+        """生成缓存键（函数名和参数的哈希）"""
+        return _build_key(self.cache_key, func, args, kwargs, digest_size=4)
 
 
 # 全局单例
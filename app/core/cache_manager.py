@@ -11,8 +11,13 @@ Phase 3-05: Cache Optimization
 """
 
 import asyncio
+import fnmatch
+import hashlib
 import json
 import logging
+import re
+import time
+from collections import OrderedDict, defaultdict
 from dataclasses import dataclass, field
 from datetime import datetime, timedelta
 from enum import Enum
@@ -23,9 +28,31 @@ from contextlib import asynccontextmanager
 from .redis_client import get_redis_service, RedisService
 from .config_cache import ConfigCache
 
+try:
+    import orjson
+except ImportError:  # orjson 不可用时回退到标准库 json
+    orjson = None
+
 logger = logging.getLogger(__name__)
 
 
+def _dumps(value: Any) -> Union[bytes, str]:
+    """序列化缓存值（优先使用 orjson）"""
+    if orjson is not None:
+        return orjson.dumps(
+            value,
+            option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS,
+        )
+    return json.dumps(value, ensure_ascii=False)
+
+
+def _loads(raw: Union[bytes, str]) -> Any:
+    """反序列化缓存值（优先使用 orjson）"""
+    if orjson is not None:
+        return orjson.loads(raw)
+    return json.loads(raw)
+
+
 class CacheLevel(Enum):
     """缓存级别"""
     L1_MEMORY = "l1_memory"      # 进程内内存缓存 (最快)
@@ -42,7 +69,7 @@ class CacheStrategy(Enum):
     REFRESH_AHEAD = "refresh_ahead"      # 预刷新
 
 
-@dataclass
+@dataclass(slots=True)
 class CacheConfig:
     """缓存配置"""
     key: str
@@ -55,15 +82,22 @@ class CacheConfig:
     invalidate_on: Set[str] = field(default_factory=set)  # 触发失效的事件
 
 
-@dataclass
+@dataclass(slots=True)
+class CacheSlot:
+    """cached_slot 产出的缓存值容器"""
+    value: Any = None
+
+
+@dataclass(slots=True)
 class CacheStats:
     """缓存统计"""
     key: str
     hits: int = 0
     misses: int = 0
+    l1_hits: int = 0  # 其中由进程内前置缓存命中的次数
     evictions: int = 0
     size: int = 0
-    last_access: Optional[datetime] = None
+    last_access: int = 0  # time.monotonic_ns()，0 表示从未访问
     created_at: datetime = field(default_factory=datetime.now)
 
     @property
@@ -188,6 +222,10 @@ class CacheManager:
     def __init__(self):
         self._redis_service: Optional[RedisService] = None
         self._memory_cache: ConfigCache = ConfigCache(default_ttl=300)
+        # L2_REDIS 前置的进程内 LRU：key -> (过期时间(monotonic), value)
+        self._l1: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+        self._l1_max = 512
+        self._l1_ttl = 5  # 秒，实际取 min(config.ttl, _l1_ttl)
         self._stats: Dict[str, CacheStats] = {}
         self._warm_tasks: List[Callable] = []
         self._initialized = False
@@ -196,6 +234,37 @@ class CacheManager:
         for key, config in self.CACHE_CONFIGS.items():
             self._stats[key] = CacheStats(key=key)
 
+        # 热路径使用的配置快表：key -> (level, ttl, enabled)
+        # CACHE_CONFIGS 在运行时被修改后需调用 _build_fast_config() 重建
+        self._fast_cfg: Dict[str, Tuple[CacheLevel, int, bool]] = {}
+        # 反向索引：标签/事件 -> 缓存键列表
+        self._tag_index: Dict[str, List[str]] = {}
+        self._event_index: Dict[str, List[str]] = {}
+        self._build_fast_config()
+
+    def _build_fast_config(self):
+        """根据 CACHE_CONFIGS 构建配置快表及标签/事件索引"""
+        self._fast_cfg = {}
+        tag_index: Dict[str, List[str]] = defaultdict(list)
+        event_index: Dict[str, List[str]] = defaultdict(list)
+
+        for key, config in self.CACHE_CONFIGS.items():
+            self._fast_cfg[key] = (config.level, config.ttl, config.enabled)
+            for tag in config.tags:
+                tag_index[tag].append(key)
+            for event in config.invalidate_on:
+                event_index[event].append(key)
+
+        self._tag_index = dict(tag_index)
+        self._event_index = dict(event_index)
+
+    def _resolve_cfg(self, key: str) -> Optional[Tuple[CacheLevel, int, bool]]:
+        """查找键的配置；装饰器生成的派生键（"<配置键>:<摘要>"）沿用配置键的设置"""
+        cfg = self._fast_cfg.get(key)
+        if cfg is None and ":" in key:
+            cfg = self._fast_cfg.get(key.partition(":")[0])
+        return cfg
+
     async def initialize(self):
         """初始化缓存管理器"""
         if self._initialized:
@@ -261,28 +330,38 @@ class CacheManager:
                 "hits": stats.hits,
                 "misses": stats.misses,
                 "hit_rate": stats.hit_rate,
+                "l1_hits": stats.l1_hits,
                 "size": stats.size,
-                "last_access": stats.last_access.isoformat() if stats.last_access else None,
+                "last_access": self._format_access_time(stats.last_access),
             }
             for key, stats in self._stats.items()
         }
 
+    @staticmethod
+    def _format_access_time(last_access: int) -> Optional[str]:
+        """将 monotonic_ns 访问时间转换为 ISO 格式的墙钟时间"""
+        if not last_access:
+            return None
+        elapsed = (time.monotonic_ns() - last_access) / 1e9
+        return datetime.fromtimestamp(time.time() - elapsed).isoformat()
+
     async def get(self, key: str, default: Any = None) -> Optional[Any]:
         """
         获取缓存值
 
         根据配置的缓存级别，从相应的层级获取数据
         """
-        config = self.get_config(key)
-        if not config or not config.enabled:
+        cfg = self._resolve_cfg(key)
+        if cfg is None or not cfg[2]:
             return default
+        level, config_ttl, _ = cfg
 
         stats = self._stats.get(key)
         if stats:
-            stats.last_access = datetime.now()
+            stats.last_access = time.monotonic_ns()
 
         # 根据缓存级别获取数据
-        if config.level == CacheLevel.L1_MEMORY:
+        if level is CacheLevel.L1_MEMORY:
             value = self._memory_cache.get(key)
             if value is not None:
                 if stats:
@@ -292,10 +371,23 @@ class CacheManager:
                 stats.misses += 1
             return default
 
-        elif config.level == CacheLevel.L2_REDIS:
+        elif level is CacheLevel.L2_REDIS:
+            # 先查进程内前置缓存
+            entry = self._l1.get(key)
+            if entry is not None:
+                if entry[0] > time.monotonic():
+                    self._l1.move_to_end(key)
+                    if stats:
+                        stats.hits += 1
+                        stats.l1_hits += 1
+                    return entry[1]
+                del self._l1[key]
+
             if self._redis_service:
-                value = await self._redis_service.get_json(self._make_redis_key(key))
+                raw = await self._redis_service.redis.get(self._make_redis_key(key))
+                value = _loads(raw) if raw else None
                 if value is not None:
+                    self._l1_put(key, value, config_ttl)
                     if stats:
                         stats.hits += 1
                     return value
@@ -312,26 +404,28 @@ class CacheManager:
 
         根据配置的缓存级别和策略，设置缓存
         """
-        config = self.get_config(key)
-        if not config or not config.enabled:
+        cfg = self._resolve_cfg(key)
+        if cfg is None or not cfg[2]:
             return False
+        level, config_ttl, _ = cfg
 
-        cache_ttl = ttl or config.ttl
+        cache_ttl = ttl or config_ttl
 
         # 根据缓存级别设置数据
-        if config.level == CacheLevel.L1_MEMORY:
+        if level is CacheLevel.L1_MEMORY:
             self._memory_cache.set(key, value, ttl=cache_ttl)
             stats = self._stats.get(key)
             if stats:
                 stats.size += 1
             return True
 
-        elif config.level == CacheLevel.L2_REDIS:
+        elif level is CacheLevel.L2_REDIS:
+            self._l1.pop(key, None)
             if self._redis_service:
-                await self._redis_service.set_json(
+                await self._redis_service.redis.set(
                     self._make_redis_key(key),
-                    value,
-                    ttl=cache_ttl
+                    _dumps(value),
+                    ex=cache_ttl or None,
                 )
                 stats = self._stats.get(key)
                 if stats:
@@ -341,17 +435,138 @@ class CacheManager:
 
         return False
 
+    async def get_many(self, keys: List[str]) -> Dict[str, Any]:
+        """
+        批量获取缓存值
+
+        L2_REDIS 级别的键通过一次 MGET 获取，只产生一次网络往返
+
+        Returns:
+            命中的 {key: value}，未命中或未配置的键不会出现在结果中
+        """
+        results: Dict[str, Any] = {}
+        redis_keys: List[Tuple[str, Tuple[CacheLevel, int, bool]]] = []  # (key, cfg)
+        now = time.monotonic()
+
+        for key in keys:
+            cfg = self._resolve_cfg(key)
+            if cfg is None or not cfg[2]:
+                continue
+            level = cfg[0]
+
+            stats = self._stats.get(key)
+            if stats:
+                stats.last_access = time.monotonic_ns()
+
+            if level is CacheLevel.L1_MEMORY:
+                value = self._memory_cache.get(key)
+                if value is not None:
+                    results[key] = value
+                    if stats:
+                        stats.hits += 1
+                elif stats:
+                    stats.misses += 1
+
+            elif level is CacheLevel.L2_REDIS:
+                entry = self._l1.get(key)
+                if entry is not None and entry[0] > now:
+                    self._l1.move_to_end(key)
+                    results[key] = entry[1]
+                    if stats:
+                        stats.hits += 1
+                        stats.l1_hits += 1
+                elif self._redis_service:
+                    redis_keys.append((key, cfg))
+
+        if redis_keys:
+            raw_values = await self._redis_service.redis.mget(
+                [self._make_redis_key(key) for key, _ in redis_keys]
+            )
+            for (key, cfg), raw in zip(redis_keys, raw_values):
+                stats = self._stats.get(key)
+                if raw:
+                    value = _loads(raw)
+                    results[key] = value
+                    self._l1_put(key, value, cfg[1])
+                    if stats:
+                        stats.hits += 1
+                elif stats:
+                    stats.misses += 1
+
+        return results
+
+    async def set_many(self, mapping: Dict[str, Any], ttl: Optional[int] = None) -> int:
+        """
+        批量设置缓存值
+
+        L2_REDIS 级别的键通过非事务 pipeline 一次性提交
+
+        Returns:
+            成功写入的缓存键数量
+        """
+        return await self.set_many_with_ttl(
+            [(key, value, ttl) for key, value in mapping.items()]
+        )
+
+    async def set_many_with_ttl(self, items: List[Tuple[str, Any, Optional[int]]]) -> int:
+        """
+        批量设置缓存值（每个键单独指定 TTL）
+
+        Args:
+            items: (key, value, ttl) 列表，ttl 为 None 时使用配置的 TTL
+
+        Returns:
+            成功写入的缓存键数量
+        """
+        written: List[str] = []
+        redis_items: List[Tuple[str, Any, int]] = []
+
+        for key, value, ttl in items:
+            cfg = self._resolve_cfg(key)
+            if cfg is None or not cfg[2]:
+                continue
+            level, config_ttl, _ = cfg
+
+            cache_ttl = ttl or config_ttl
+
+            if level is CacheLevel.L1_MEMORY:
+                self._memory_cache.set(key, value, ttl=cache_ttl)
+                written.append(key)
+            elif level is CacheLevel.L2_REDIS and self._redis_service:
+                self._l1.pop(key, None)
+                redis_items.append((key, value, cache_ttl))
+
+        if redis_items:
+            async with self._redis_service.redis.pipeline(transaction=False) as pipe:
+                for key, value, cache_ttl in redis_items:
+                    pipe.set(
+                        self._make_redis_key(key),
+                        _dumps(value),
+                        ex=cache_ttl or None,
+                    )
+                await pipe.execute()
+            written.extend(key for key, _, _ in redis_items)
+
+        for key in written:
+            stats = self._stats.get(key)
+            if stats:
+                stats.size += 1
+
+        return len(written)
+
     async def delete(self, key: str) -> bool:
         """删除缓存"""
-        config = self.get_config(key)
-        if not config:
+        cfg = self._resolve_cfg(key)
+        if cfg is None:
             return False
+        level = cfg[0]
 
         # 删除所有层级的缓存
-        if config.level == CacheLevel.L1_MEMORY:
+        if level is CacheLevel.L1_MEMORY:
             self._memory_cache.invalidate(key)
 
-        elif config.level == CacheLevel.L2_REDIS:
+        elif level is CacheLevel.L2_REDIS:
+            self._l1.pop(key, None)
             if self._redis_service:
                 await self._redis_service.redis.delete(self._make_redis_key(key))
 
@@ -362,26 +577,101 @@ class CacheManager:
 
         return True
 
+    async def delete_many(self, keys: List[str]) -> int:
+        """
+        批量删除缓存
+
+        L2_REDIS 级别的键合并为一次 DEL 命令，只产生一次网络往返
+
+        Returns:
+            实际处理的缓存键数量（未配置的键会被忽略）
+        """
+        redis_keys: List[str] = []
+        count = 0
+
+        for key in keys:
+            cfg = self._resolve_cfg(key)
+            if cfg is None:
+                continue
+            level = cfg[0]
+
+            if level is CacheLevel.L1_MEMORY:
+                self._memory_cache.invalidate(key)
+            elif level is CacheLevel.L2_REDIS:
+                self._l1.pop(key, None)
+                redis_keys.append(self._make_redis_key(key))
+
+            stats = self._stats.get(key)
+            if stats:
+                stats.evictions += 1
+                stats.size = max(0, stats.size - 1)
+            count += 1
+
+        if redis_keys and self._redis_service:
+            await self._redis_service.redis.delete(*redis_keys)
+
+        return count
+
+    async def delete_pattern(self, pattern: str) -> int:
+        """
+        按通配符删除派生缓存键（如 "my_func:*"）
+
+        派生键不在 CACHE_CONFIGS 中，需扫描实际存储：进程内缓存直接匹配，
+        Redis 通过 SCAN 分批查找后一次 DEL
+
+        Returns:
+            删除的缓存键数量
+        """
+        cfg = self._resolve_cfg(pattern)
+        if cfg is None:
+            return 0
+        level = cfg[0]
+        match = re.compile(fnmatch.translate(pattern)).match
+
+        if level is CacheLevel.L1_MEMORY:
+            keys = [k for k in self._memory_cache.keys() if match(k)]
+            for key in keys:
+                self._memory_cache.invalidate(key)
+            return len(keys)
+
+        if level is CacheLevel.L2_REDIS:
+            local_keys = [k for k in self._l1 if match(k)]
+            for key in local_keys:
+                del self._l1[key]
+            if not self._redis_service:
+                return len(local_keys)
+
+            redis = self._redis_service.redis
+            redis_keys = [
+                rk async for rk in redis.scan_iter(match=self._make_redis_key(pattern), count=500)
+            ]
+            if redis_keys:
+                await redis.delete(*redis_keys)
+            return len(redis_keys)
+
+        return 0
+
     async def invalidate_by_tag(self, tag: str) -> int:
         """按标签失效缓存"""
-        count = 0
-        for key, config in self.CACHE_CONFIGS.items():
-            if tag in config.tags:
-                await self.delete(key)
-                count += 1
+        keys = self._tag_index.get(tag)
+        count = await self.delete_many(keys) if keys else 0
         logger.info(f"🗑️ Invalidated {count} caches with tag: {tag}")
         return count
 
     async def invalidate_by_event(self, event: str) -> int:
         """按事件失效缓存"""
-        count = 0
-        for key, config in self.CACHE_CONFIGS.items():
-            if event in config.invalidate_on:
-                await self.delete(key)
-                count += 1
+        keys = self._event_index.get(event)
+        count = await self.delete_many(keys) if keys else 0
         logger.info(f"🗑️ Invalidated {count} caches on event: {event}")
         return count
 
+    def _l1_put(self, key: str, value: Any, ttl: int):
+        """写入 L2_REDIS 前置缓存，超出容量时淘汰最久未使用的条目"""
+        self._l1[key] = (time.monotonic() + min(ttl, self._l1_ttl), value)
+        self._l1.move_to_end(key)
+        if len(self._l1) > self._l1_max:
+            self._l1.popitem(last=False)
+
     def _make_redis_key(self, key: str) -> str:
         """生成Redis键名"""
         return f"cache:{key}"
@@ -391,6 +681,9 @@ class CacheManager:
         """
         缓存上下文管理器
 
+        产出缓存值（未命中时为 None）；未命中时由调用方自行写入缓存，
+        退出时不再回写，避免命中时的重复 SET。
+
         使用示例:
             async with cache_manager.cached_context("my_key") as result:
                 if result is None:
@@ -399,10 +692,27 @@ class CacheManager:
                     await cache_manager.set("my_key", result, ttl)
                 # 使用 result
         """
-        result = await self.get(key)
-        yield result
-        if result is not None:
-            await self.set(key, result, ttl)
+        yield await self.get(key)
+
+    @asynccontextmanager
+    async def cached_slot(self, key: str, ttl: Optional[int] = None):
+        """
+        带自动回写的缓存上下文管理器
+
+        产出 CacheSlot，slot.value 为缓存值（未命中时为 None）。
+        未命中时在块内给 slot.value 赋值，退出时写入缓存；命中时不重复写入。
+
+        使用示例:
+            async with cache_manager.cached_slot("my_key") as slot:
+                if slot.value is None:
+                    slot.value = await expensive_operation()
+                # 使用 slot.value
+        """
+        slot = CacheSlot(await self.get(key))
+        was_hit = slot.value is not None
+        yield slot
+        if not was_hit and slot.value is not None:
+            await self.set(key, slot.value, ttl)
 
 
 # 全局单例
@@ -423,6 +733,34 @@ async def init_cache_manager():
     await manager.initialize()
 
 
+def _build_key(
+    prefix: str,
+    func: Callable,
+    args: tuple,
+    kwargs: dict,
+    digest_size: int = 8,
+) -> str:
+    """
+    生成装饰器使用的缓存键
+
+    参数使用 repr 规范化，关键字参数按名称排序，逐段写入哈希（以 \\0 分隔
+    防止拼接碰撞），不构造中间大字符串
+    """
+    h = hashlib.blake2b(digest_size=digest_size)
+    h.update(prefix.encode())
+    h.update(b"\0")
+    h.update(func.__name__.encode())
+    for arg in args:
+        h.update(b"\0")
+        h.update(repr(arg).encode())
+    for k in sorted(kwargs):
+        h.update(b"\0")
+        h.update(k.encode())
+        h.update(b"=")
+        h.update(repr(kwargs[k]).encode())
+    return f"{prefix}:{h.hexdigest()}"
+
+
 def cached(
     cache_key: str,
     ttl: Optional[int] = None,
@@ -438,12 +776,17 @@ def cached(
             return result
     """
     def decorator(func: Callable):
+        # 首次调用时解析并缓存管理器实例
+        manager: Optional[CacheManager] = None
+
         @wraps(func)
         async def wrapper(*args, **kwargs):
-            manager = get_cache_manager()
+            nonlocal manager
+            if manager is None:
+                manager = get_cache_manager()
 
             # 生成实际的缓存键
-            actual_key = f"{cache_key}:{args}:{kwargs}"
+            actual_key = _build_key(cache_key, func, args, kwargs)
 
             # 尝试从缓存获取
             cached_value = await manager.get(actual_key)
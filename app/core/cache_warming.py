@@ -11,28 +11,109 @@ Phase 3-05: Cache Optimization - Cache Warming Strategy
 """
 
 import asyncio
+import atexit
+import functools
+import inspect
 import logging
+import os
+import sys
+import threading
+import time
 from abc import ABC, abstractmethod
+from collections import Counter
 from dataclasses import dataclass
 from datetime import datetime, timedelta
-from enum import Enum
-from typing import Any, Callable, Dict, List, Optional, Set
+from enum import IntEnum
+from graphlib import CycleError, TopologicalSorter
+from typing import Any, Callable, Dict, Iterator, List, Optional, Set, Tuple
 from concurrent.futures import ThreadPoolExecutor
+from itertools import groupby
+from operator import attrgetter
+from pathlib import Path
 
-from .cache_manager import get_cache_manager, CacheManager
+from .cache_manager import get_cache_manager, CacheManager, _dumps, _loads
 
 logger = logging.getLogger(__name__)
 
+# Python 3.12+ 支持立即执行（eager）的任务工厂：协程在创建时同步执行到第一个
+# 真正挂起点，已完成的预热任务无需再经过一次事件循环调度
+_eager_task_factory = getattr(asyncio, "eager_task_factory", None)
 
-class WarmupPriority(Enum):
-    """预热优先级"""
-    CRITICAL = "critical"  # 关键数据，必须预热
-    HIGH = "high"          # 高优先级
-    MEDIUM = "medium"      # 中等优先级
-    LOW = "low"            # 低优先级
+# 同步预热函数使用的共享线程池（按需创建）
+_warmup_executor: Optional[ThreadPoolExecutor] = None
+_warmup_executor_lock = threading.Lock()
 
 
-@dataclass
+def get_warmup_executor() -> ThreadPoolExecutor:
+    """获取预热共享线程池（大小由 WARMUP_POOL_SIZE 控制，默认 4）"""
+    global _warmup_executor
+    if _warmup_executor is None:
+        with _warmup_executor_lock:
+            if _warmup_executor is None:
+                _warmup_executor = ThreadPoolExecutor(
+                    max_workers=int(os.getenv("WARMUP_POOL_SIZE", "4")),
+                    thread_name_prefix="warmup",
+                )
+                atexit.register(shutdown_warmup_executor)
+    return _warmup_executor
+
+
+# 预热快照文件：保存上一次预热成功的数据，进程冷启动时先用它填充缓存
+_DEFAULT_SNAPSHOT_PATH = Path(
+    os.getenv(
+        "WARMUP_SNAPSHOT_PATH",
+        os.path.join(os.getenv("TRADINGAGENTS_DATA_DIR", "./data"), "cache", "warmup_snapshot.json"),
+    )
+)
+
+
+def shutdown_warmup_executor():
+    """关闭预热共享线程池"""
+    global _warmup_executor
+    with _warmup_executor_lock:
+        if _warmup_executor is not None:
+            _warmup_executor.shutdown(wait=False)
+            _warmup_executor = None
+
+
+def _is_async_callable(func: Callable) -> bool:
+    """判断调用是否返回协程（展开 functools.partial，兼容定义了 async __call__ 的对象）"""
+    while isinstance(func, functools.partial):
+        func = func.func
+    return inspect.iscoroutinefunction(func) or inspect.iscoroutinefunction(
+        getattr(func, "__call__", None)
+    )
+
+
+async def _call_warmup_func(func: Callable) -> Any:
+    """
+    执行预热函数
+
+    异步函数直接在事件循环中等待；同步函数放到共享线程池中执行，
+    若其返回可等待对象（如被同步装饰器包装的异步函数），回到事件循环中继续等待
+    """
+    if _is_async_callable(func):
+        return await func()
+    result = await asyncio.get_running_loop().run_in_executor(get_warmup_executor(), func)
+    if inspect.isawaitable(result):
+        result = await result
+    return result
+
+
+class WarmupPriority(IntEnum):
+    """预热优先级（数值越小优先级越高，可直接比较和排序）"""
+    CRITICAL = 0  # 关键数据，必须预热
+    HIGH = 1      # 高优先级
+    MEDIUM = 2    # 中等优先级
+    LOW = 3       # 低优先级
+
+    @property
+    def label(self) -> str:
+        """用于日志展示的小写名称"""
+        return self.name.lower()
+
+
+@dataclass(slots=True)
 class WarmupTask:
     """预热任务"""
     name: str
@@ -50,9 +131,21 @@ class WarmupTask:
             self.depends_on = []
 
 
+def _estimate_size(data: Any) -> int:
+    """估算预热数据大小（容器取元素个数，其他对象取 sys.getsizeof），避免整体字符串化"""
+    if data is None:
+        return 0
+    try:
+        return len(data)
+    except TypeError:
+        return sys.getsizeof(data)
+
+
 class WarmupResult:
     """预热结果"""
 
+    __slots__ = ("success", "failed", "skipped", "total_time")
+
     def __init__(self):
         self.success: Dict[str, Any] = {}
         self.failed: Dict[str, str] = {}
@@ -61,14 +154,14 @@ class WarmupResult:
 
     def add_success(self, task_name: str, data: Any = None):
         self.success[task_name] = {
-            "timestamp": datetime.now().isoformat(),
-            "data_size": len(str(data)) if data else 0,
+            "ts_ns": time.time_ns(),
+            "data_size": _estimate_size(data),
         }
 
     def add_failure(self, task_name: str, error: str):
         self.failed[task_name] = {
             "error": error,
-            "timestamp": datetime.now().isoformat(),
+            "ts_ns": time.time_ns(),
         }
 
     def add_skip(self, task_name: str):
@@ -86,6 +179,21 @@ class WarmupResult:
     def skipped_count(self) -> int:
         return len(self.skipped)
 
+    def to_dict(self) -> Dict[str, Any]:
+        """转换为可序列化的字典（此时才将 ts_ns 格式化为 ISO 时间）"""
+
+        def _render(entry: Dict[str, Any]) -> Dict[str, Any]:
+            rendered = {k: v for k, v in entry.items() if k != "ts_ns"}
+            rendered["timestamp"] = datetime.fromtimestamp(entry["ts_ns"] / 1e9).isoformat()
+            return rendered
+
+        return {
+            "success": {name: _render(entry) for name, entry in self.success.items()},
+            "failed": {name: _render(entry) for name, entry in self.failed.items()},
+            "skipped": list(self.skipped),
+            "total_time": self.total_time,
+        }
+
 
 class CacheWarmer:
     """
@@ -99,12 +207,23 @@ class CacheWarmer:
     5. 失败重试
     """
 
-    def __init__(self, cache_manager: Optional[CacheManager] = None):
+    def __init__(
+        self,
+        cache_manager: Optional[CacheManager] = None,
+        snapshot_path: Optional[Path] = None,
+    ):
         self._cache_manager = cache_manager or get_cache_manager()
         self._tasks: Dict[str, WarmupTask] = {}
+        # 按优先级分桶的任务列表，在注册/注销时维护
+        self._tasks_by_priority: Dict[WarmupPriority, List[WarmupTask]] = {
+            priority: [] for priority in WarmupPriority
+        }
         self._results: WarmupResult = WarmupResult()
         self._running = False
-        self._executor = ThreadPoolExecutor(max_workers=10)
+
+        # 本轮预热成功写入的数据 (cache_key, data, ttl, 过期时间戳)，结束后持久化
+        self._snapshot_path = snapshot_path or _DEFAULT_SNAPSHOT_PATH
+        self._snapshot_entries: List[Tuple[str, Any, int, float]] = []
 
         # 注册默认预热任务
         self._register_default_tasks()
@@ -146,14 +265,39 @@ class CacheWarmer:
 
     def register_task(self, task: WarmupTask):
         """注册预热任务"""
+        old_task = self._tasks.get(task.name)
+        if old_task is not None:
+            self._remove_from_bucket(old_task)
+
         self._tasks[task.name] = task
-        logger.debug(f"📝 Registered warmup task: {task.name}")
+        self._tasks_by_priority[task.priority].append(task)
+
+        # 注册时检测循环依赖
+        try:
+            TopologicalSorter(
+                {t.name: t.depends_on for t in self._tasks.values()}
+            ).prepare()
+        except CycleError as e:
+            self.unregister_task(task.name)
+            if old_task is not None:
+                self.register_task(old_task)
+            raise ValueError(
+                f"Warmup task {task.name} introduces a dependency cycle: {e.args[1]}"
+            ) from e
+
+        logger.debug("📝 Registered warmup task: %s", task.name)
 
     def unregister_task(self, task_name: str):
         """取消注册预热任务"""
-        if task_name in self._tasks:
-            del self._tasks[task_name]
-            logger.debug(f"🗑️ Unregistered warmup task: {task_name}")
+        task = self._tasks.pop(task_name, None)
+        if task is not None:
+            self._remove_from_bucket(task)
+            logger.debug("🗑️ Unregistered warmup task: %s", task_name)
+
+    def _remove_from_bucket(self, task: WarmupTask):
+        """将任务从优先级分桶中移除"""
+        bucket = self._tasks_by_priority[task.priority]
+        bucket[:] = [t for t in bucket if t is not task]
 
     async def warmup_all(
         self,
@@ -173,51 +317,68 @@ class CacheWarmer:
 
         self._running = True
         self._results = WarmupResult()
-        start_time = asyncio.get_event_loop().time()
+        self._snapshot_entries = []
+        start_time = time.perf_counter()
 
         logger.info(f"🔥 Starting cache warmup with {len(self._tasks)} tasks...")
 
         try:
-            # 按优先级排序任务
-            sorted_tasks = self._sort_tasks_by_priority(priority_filter)
+            tasks = [
+                task
+                for _, group in self._iter_priority_groups(priority_filter)
+                for task in group
+            ]
+            # 依赖拓扑分层：同层任务相互独立，层内按优先级排列
+            levels = self._topo_levels(tasks)
 
             if parallel:
-                await self._warmup_parallel(sorted_tasks)
+                await self._warmup_parallel(levels)
             else:
-                await self._warmup_sequential(sorted_tasks)
+                await self._warmup_sequential(
+                    [task for level in levels for task in level]
+                )
+
+            await self._save_snapshot()
 
         finally:
             self._running = False
-            self._results.total_time = asyncio.get_event_loop().time() - start_time
+            self._results.total_time = time.perf_counter() - start_time
 
             self._log_summary()
 
         return self._results
 
-    def _sort_tasks_by_priority(
+    def _iter_priority_groups(
         self, priority_filter: Optional[WarmupPriority]
-    ) -> List[WarmupTask]:
-        """按优先级排序任务"""
-        priority_order = {
-            WarmupPriority.CRITICAL: 0,
-            WarmupPriority.HIGH: 1,
-            WarmupPriority.MEDIUM: 2,
-            WarmupPriority.LOW: 3,
-        }
-
-        tasks = list(self._tasks.values())
+    ) -> Iterator[Tuple[WarmupPriority, List[WarmupTask]]]:
+        """按优先级由高到低产出任务分组，priority_filter 为最低包含的优先级"""
+        for priority in WarmupPriority:
+            if priority_filter is not None and priority > priority_filter:
+                break
+            yield priority, self._tasks_by_priority[priority]
+
+    @staticmethod
+    def _topo_levels(tasks: List[WarmupTask]) -> List[List[WarmupTask]]:
+        """
+        按依赖关系对任务分层（Kahn 算法），O(N+E)
 
-        # 过滤优先级
-        if priority_filter:
-            min_priority = priority_order[priority_filter]
-            tasks = [
-                t for t in tasks if priority_order[t.priority] <= min_priority
-            ]
+        只考虑本次参与预热的任务之间的依赖；依赖未参与的任务在执行时被跳过。
+        每层内保持传入顺序（即优先级顺序）。
+        """
+        position = {task.name: i for i, task in enumerate(tasks)}
+        by_name = {task.name: task for task in tasks}
 
-        # 排序
-        tasks.sort(key=lambda t: priority_order[t.priority])
+        sorter = TopologicalSorter()
+        for task in tasks:
+            sorter.add(task.name, *(dep for dep in task.depends_on if dep in by_name))
+        sorter.prepare()
 
-        return tasks
+        levels: List[List[WarmupTask]] = []
+        while sorter.is_active():
+            ready = sorter.get_ready()
+            levels.append([by_name[name] for name in sorted(ready, key=position.__getitem__)])
+            sorter.done(*ready)
+        return levels
 
     async def _warmup_sequential(self, tasks: List[WarmupTask]):
         """顺序执行预热任务"""
@@ -237,50 +398,95 @@ class CacheWarmer:
             await self._execute_task(task)
             executed.add(task.name)
 
-    async def _warmup_parallel(self, tasks: List[WarmupTask]):
-        """并行执行预热任务"""
-        # 按优先级分组
-        groups: Dict[WarmupPriority, List[WarmupTask]] = {
-            WarmupPriority.CRITICAL: [],
-            WarmupPriority.HIGH: [],
-            WarmupPriority.MEDIUM: [],
-            WarmupPriority.LOW: [],
-        }
+    async def _warmup_parallel(self, levels: List[List[WarmupTask]]):
+        """并行执行预热任务（按依赖分层，层内同优先级并行，不同优先级按顺序）"""
+        executed: Set[str] = set()
 
-        for task in tasks:
-            if task.enabled:
-                groups[task.priority].append(task)
+        for level in levels:
+            for priority, group in groupby(level, key=attrgetter("priority")):
+                group_tasks = []
+                for task in group:
+                    if not task.enabled:
+                        continue
+                    if not self._check_dependencies(task, executed):
+                        logger.warning(f"⚠️ Skipping task {task.name} due to unmet dependencies")
+                        self._results.add_skip(task.name)
+                        continue
+                    group_tasks.append(task)
+
+                if group_tasks:
+                    await self._run_group(priority, group_tasks)
+                    executed.update(task.name for task in group_tasks)
+
+    async def _run_group(self, priority: WarmupPriority, group_tasks: List[WarmupTask]):
+        """并行执行一组同优先级的预热任务"""
+
+        logger.info(f"🔥 Warming {len(group_tasks)} {priority.label} priority tasks...")
+
+        # 并行执行同优先级的任务，结果在组结束时批量写入缓存
+        results = await asyncio.gather(
+            *self._spawn_tasks(group_tasks),
+            return_exceptions=True,
+        )
+        await self._write_group_results(
+            [r for r in results if isinstance(r, tuple)]
+        )
 
-        # 按优先级顺序执行每组任务
-        for priority in [WarmupPriority.CRITICAL, WarmupPriority.HIGH, WarmupPriority.MEDIUM, WarmupPriority.LOW]:
-            group_tasks = groups[priority]
-            if not group_tasks:
-                continue
+    def _spawn_tasks(self, tasks: List[WarmupTask]) -> List[Any]:
+        """为一组预热任务创建可等待对象（支持时使用 eager 任务）"""
+        coros = [self._execute_task(task, defer_write=True) for task in tasks]
+        if _eager_task_factory is None:
+            return coros
 
-            logger.info(f"🔥 Warming {len(group_tasks)} {priority.value} priority tasks...")
+        loop = asyncio.get_running_loop()
+        return [_eager_task_factory(loop, coro) for coro in coros]
 
-            # 并行执行同优先级的任务
-            await asyncio.gather(
-                *[self._execute_task(task) for task in group_tasks],
-                return_exceptions=True,
+    async def _write_group_results(self, completed: List[Tuple[WarmupTask, Any]]):
+        """将一组任务的预热数据通过一次批量写入存入缓存"""
+        if not completed:
+            return
+
+        try:
+            await self._cache_manager.set_many_with_ttl(
+                [(task.cache_key, data, task.ttl) for task, data in completed]
             )
+        except Exception as e:
+            logger.warning(f"⚠️ Failed to store warmup group results: {e}")
+            for task, _ in completed:
+                self._results.add_failure(task.name, str(e))
+            return
+
+        for task, data in completed:
+            self._results.add_success(task.name, data)
+            self._record_snapshot(task, data)
+            logger.debug("✅ Warmup task completed: %s", task.name)
 
     def _check_dependencies(self, task: WarmupTask, executed: Set[str]) -> bool:
         """检查任务依赖是否满足"""
         return all(dep in executed for dep in task.depends_on)
 
-    async def _execute_task(self, task: WarmupTask):
-        """执行单个预热任务"""
-        logger.debug(f"🔥 Executing warmup task: {task.name}")
+    async def _execute_task(
+        self, task: WarmupTask, defer_write: bool = False
+    ) -> Optional[Tuple[WarmupTask, Any]]:
+        """
+        执行单个预热任务
+
+        Args:
+            defer_write: 为 True 时不立即写缓存，而是返回 (task, data)，
+                由调用方批量写入后再记录成功
+        """
+        logger.debug("🔥 Executing warmup task: %s", task.name)
 
         for attempt in range(task.retry_count):
             try:
-                # 带超时执行
+                # 带超时执行（同步函数放到共享线程池中执行）
                 data = await asyncio.wait_for(
-                    task.func(),
-                    timeout=task.timeout,
+                    _call_warmup_func(task.func), timeout=task.timeout
                 )
 
+                if defer_write and data is not None:
+                    return task, data
+
                 # 存入缓存
                 if data is not None:
                     await self._cache_manager.set(
@@ -288,10 +494,11 @@ class CacheWarmer:
                         data,
                         ttl=task.ttl,
                     )
+                    self._record_snapshot(task, data)
 
                 self._results.add_success(task.name, data)
-                logger.debug(f"✅ Warmup task completed: {task.name}")
-                return
+                logger.debug("✅ Warmup task completed: %s", task.name)
+                return None
 
             except asyncio.TimeoutError:
                 logger.warning(
@@ -307,6 +514,99 @@ class CacheWarmer:
                 if attempt == task.retry_count - 1:
                     self._results.add_failure(task.name, str(e))
 
+    def _record_snapshot(self, task: WarmupTask, data: Any):
+        """记录一条预热成功的数据，供结束时写入快照"""
+        self._snapshot_entries.append(
+            (task.cache_key, data, task.ttl, time.time() + task.ttl)
+        )
+
+    async def _save_snapshot(self):
+        """将本轮预热数据原子写入快照文件（写临时文件后 os.replace）"""
+        if not self._snapshot_entries:
+            return
+
+        entries = list(self._snapshot_entries)
+        path = self._snapshot_path
+
+        def _write():
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+            payload = _dumps(entries)
+            with open(tmp_path, "wb") as f:
+                f.write(payload.encode() if isinstance(payload, str) else payload)
+            os.replace(tmp_path, path)
+
+        try:
+            await asyncio.to_thread(_write)
+            logger.debug("💾 Warmup snapshot saved: %d entries -> %s", len(entries), path)
+        except Exception as e:
+            logger.warning(f"⚠️ Failed to save warmup snapshot: {e}")
+
+    async def load_snapshot(self) -> int:
+        """
+        从快照文件预填充缓存（冷启动时调用）
+
+        只恢复尚未过期的条目，TTL 取剩余有效期
+
+        Returns:
+            恢复的条目数量
+        """
+        path = self._snapshot_path
+
+        def _read() -> Any:
+            with open(path, "rb") as f:
+                return _loads(f.read())
+
+        try:
+            entries = await asyncio.to_thread(_read)
+        except FileNotFoundError:
+            return 0
+        except Exception as e:
+            logger.warning(f"⚠️ Failed to load warmup snapshot: {e}")
+            return 0
+
+        if not isinstance(entries, list):
+            logger.warning(f"⚠️ Ignoring malformed warmup snapshot: {path}")
+            return 0
+
+        now = time.time()
+        items = []
+        for entry in entries:
+            if not self._is_valid_snapshot_entry(entry):
+                logger.warning(f"⚠️ Skipping invalid warmup snapshot entry: {entry!r:.100}")
+                continue
+            key, data, _ttl, expiry = entry
+            if expiry - now >= 1:
+                items.append((key, data, int(expiry - now)))
+        if not items:
+            return 0
+
+        try:
+            await self._cache_manager.set_many_with_ttl(items)
+        except Exception as e:
+            logger.warning(f"⚠️ Failed to restore warmup snapshot: {e}")
+            return 0
+
+        logger.info(f"💾 Restored {len(items)} cache entries from warmup snapshot")
+        return len(items)
+
+    def _is_valid_snapshot_entry(self, entry: Any) -> bool:
+        """校验快照条目格式 [key, data, ttl, expiry]，且键必须是已配置的缓存"""
+        if not isinstance(entry, list) or len(entry) != 4:
+            return False
+        key, data, ttl, expiry = entry
+        return (
+            isinstance(key, str)
+            and data is not None
+            and isinstance(ttl, int)
+            and isinstance(expiry, (int, float))
+            and self._cache_manager._resolve_cfg(key) is not None
+        )
+
+    def shutdown(self):
+        """释放预热器持有的资源（共享线程池）"""
+        shutdown_warmup_executor()
+
     def _log_summary(self):
         """记录预热摘要"""
         result = self._results
@@ -351,6 +651,11 @@ class CacheWarmer:
         }
 
 
+# AdaptiveWarmer 访问计数分片数（须为 2 的幂）
+_ACCESS_SHARDS = 16
+_ACCESS_SHARD_MASK = _ACCESS_SHARDS - 1
+
+
 class AdaptiveWarmer:
     """
     自适应预热器
@@ -363,25 +668,27 @@ class AdaptiveWarmer:
 
     def __init__(self, cache_manager: Optional[CacheManager] = None):
         self._cache_manager = cache_manager or get_cache_manager()
-        self._access_counts: Dict[str, int] = {}
+        # 访问计数按键哈希分片，降低并发 record_access 时对同一字典的争用，
+        # 仅在查询热点时合并
+        self._shards: List[Counter] = [Counter() for _ in range(_ACCESS_SHARDS)]
         self._last_warmup: Dict[str, datetime] = {}
         self._hot_threshold = 100  # 访问次数阈值
 
     def record_access(self, key: str):
         """记录缓存访问"""
-        self._access_counts[key] = self._access_counts.get(key, 0) + 1
+        self._shards[hash(key) & _ACCESS_SHARD_MASK][key] += 1
 
     def is_hot(self, key: str) -> bool:
         """检查是否是热点数据"""
-        return self._access_counts.get(key, 0) >= self._hot_threshold
+        return self._shards[hash(key) & _ACCESS_SHARD_MASK].get(key, 0) >= self._hot_threshold
 
     def get_hot_keys(self, limit: int = 10) -> List[str]:
         """获取热点键列表"""
-        return sorted(
-            self._access_counts.keys(),
-            key=lambda k: self._access_counts[k],
-            reverse=True,
-        )[:limit]
+        # 各分片键集互不相交，合并后 most_common(n) 内部使用 heapq.nlargest
+        merged: Counter = Counter()
+        for shard in self._shards:
+            merged.update(shard)
+        return [key for key, _ in merged.most_common(limit)]
 
     async def warm_hot_keys(self):
         """预热热点数据"""
@@ -402,28 +709,21 @@ class AdaptiveWarmer:
 
     def reset_stats(self):
         """重置统计"""
-        self._access_counts.clear()
-
-
-# 全局单例
-_cache_warmer: Optional[CacheWarmer] = None
-_adaptive_warmer: Optional[AdaptiveWarmer] = None
+        for shard in self._shards:
+            shard.clear()
 
 
+# 全局单例（functools.cache 保证只创建一次，测试中可用 cache_clear() 重置）
+@functools.cache
 def get_cache_warmer() -> CacheWarmer:
     """获取缓存预热器实例"""
-    global _cache_warmer
-    if _cache_warmer is None:
-        _cache_warmer = CacheWarmer()
-    return _cache_warmer
+    return CacheWarmer()
 
 
+@functools.cache
 def get_adaptive_warmer() -> AdaptiveWarmer:
     """获取自适应预热器实例"""
-    global _adaptive_warmer
-    if _adaptive_warmer is None:
-        _adaptive_warmer = AdaptiveWarmer()
-    return _adaptive_warmer
+    return AdaptiveWarmer()
 
 
 async def warmup_cache(
@@ -433,3 +733,16 @@ async def warmup_cache(
     """执行缓存预热"""
     warmer = get_cache_warmer()
     return await warmer.warmup_all(priority_filter=priority, parallel=parallel)
+
+
+async def start_cache_warmup(parallel: bool = True) -> "asyncio.Task":
+    """
+    启动时预热缓存
+
+    先用上次的快照立即填充缓存，再在后台执行完整预热，不阻塞启动
+
+    Returns:
+        后台预热任务
+    """
+    await get_cache_warmer().load_snapshot()
+    return asyncio.create_task(warmup_cache(parallel=parallel))
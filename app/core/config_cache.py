@@ -8,9 +8,12 @@
 - TTL 自动过期
 - 统一失效机制
 """
+import asyncio
+import heapq
+import itertools
 import time
 import logging
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Hashable, List, Optional, Tuple
 from threading import Lock
 from functools import wraps
 
@@ -21,18 +24,26 @@ class ConfigCache:
     """
     配置缓存（线程安全）
 
+    每个键存储为不可变的 (value, expiry) 元组，读路径只做一次字典查找和一次
+    时间比较，依赖 CPython 字典单次操作的原子性，无需加锁。
+
     使用示例:
         cache = ConfigCache(default_ttl=300)  # 5分钟TTL
         cache.set("system_config", {...})
         config = cache.get("system_config")
     """
 
-    def __init__(self, default_ttl: int = 300):  # 默认5分钟
-        self._cache: Dict[str, Any] = {}
-        self._timestamps: Dict[str, float] = {}
-        self._ttls: Dict[str, int] = {}  # 单个key的TTL
+    def __init__(self, default_ttl: int = 300, maxsize: int = 10_000):  # 默认5分钟
+        # key -> (value, 过期时间(time.monotonic))
+        self._cache: Dict[str, Tuple[Any, float]] = {}
         self._default_ttl: int = default_ttl
-        self._lock = Lock()
+        self._maxsize: int = maxsize
+        self._lock = Lock()  # 用于批量清空和过期堆维护（读路径不加锁）
+
+        # 过期时间最小堆 (expiry, seq, key)，供后台清理按过期顺序弹出
+        self._expiry_heap: List[Tuple[float, int, Hashable]] = []
+        self._seq = itertools.count()
+        self._sweeper_task: Optional["asyncio.Task"] = None
 
         # 缓存统计
         self._hits = 0
@@ -45,21 +56,21 @@ class ConfigCache:
         Returns:
             缓存值，如果不存在或已过期返回 None
         """
-        with self._lock:
-            if key in self._cache:
-                # 检查是否过期
-                ttl = self._ttls.get(key, self._default_ttl)
-                if time.time() - self._timestamps[key] < ttl:
-                    self._hits += 1
-                    logger.debug(f"✅ 配置缓存命中: {key} (命中率: {self.hit_rate:.1%})")
-                    return self._cache[key]
-                else:
-                    # 缓存过期，删除
-                    self._remove(key)
-                    logger.debug(f"⏰ 配置缓存过期: {key}")
-
-            self._misses += 1
-            return None
+        entry = self._cache.get(key)
+        if entry is not None:
+            if entry[1] > time.monotonic():
+                self._hits += 1
+                # hit_rate 需要计算，仅在 DEBUG 开启时求值
+                if logger.isEnabledFor(logging.DEBUG):
+                    logger.debug("✅ 配置缓存命中: %s (命中率: %.1f%%)", key, self.hit_rate * 100)
+                return entry[0]
+
+            # 缓存过期，删除（仅当条目未被并发替换时）
+            self._remove(key, entry)
+            logger.debug("⏰ 配置缓存过期: %s", key)
+
+        self._misses += 1
+        return None
 
     def set(self, key: str, value: Any, ttl: Optional[int] = None) -> None:
         """
@@ -70,12 +81,18 @@ class ConfigCache:
             value: 缓存值
             ttl: 过期时间（秒），None 则使用默认 TTL
         """
+        ttl = self._default_ttl if ttl is None else ttl
+        if key not in self._cache and len(self._cache) >= self._maxsize:
+            self._evict()
+        expiry = time.monotonic() + ttl
+        self._cache[key] = (value, expiry)
+
         with self._lock:
-            self._cache[key] = value
-            self._timestamps[key] = time.time()
-            if ttl is not None:
-                self._ttls[key] = ttl
-            logger.debug(f"💾 配置已缓存: {key} (TTL: {ttl or self._default_ttl}秒)")
+            heapq.heappush(self._expiry_heap, (expiry, next(self._seq), key))
+            # 同一键反复写入会在堆中留下过时条目，堆明显大于缓存时重建
+            if len(self._expiry_heap) > 2 * max(len(self._cache), 1024):
+                self._rebuild_heap()
+        logger.debug("💾 配置已缓存: %s (TTL: %s秒)", key, ttl)
 
     def invalidate(self, key: Optional[str] = None) -> None:
         """
@@ -84,31 +101,88 @@ class ConfigCache:
         Args:
             key: 指定键，None 则清空所有缓存
         """
-        with self._lock:
-            if key:
-                self._remove(key)
-                logger.debug(f"🗑️ 配置缓存已失效: {key}")
-            else:
+        if key:
+            self._remove(key)
+            logger.debug("🗑️ 配置缓存已失效: %s", key)
+        else:
+            with self._lock:
                 count = len(self._cache)
                 self._cache.clear()
-                self._timestamps.clear()
-                self._ttls.clear()
-                logger.debug(f"🗑️ 所有配置缓存已清除: {count}条")
+                self._expiry_heap.clear()
+            logger.debug("🗑️ 所有配置缓存已清除: %d条", count)
+
+    def keys(self) -> List[str]:
+        """返回当前缓存键的快照（可能包含尚未清理的过期键）"""
+        return list(self._cache)
 
     def has(self, key: str) -> bool:
         """检查缓存是否存在且未过期"""
+        entry = self._cache.get(key)
+        return entry is not None and entry[1] > time.monotonic()
+
+    def sweep_expired(self) -> int:
+        """
+        清理已过期的条目
+
+        按过期时间从堆顶弹出，复杂度 O(过期条目数 · log N)，而非扫描全部缓存
+
+        Returns:
+            清理的条目数量
+        """
+        now = time.monotonic()
+        removed = 0
         with self._lock:
-            if key in self._cache:
-                ttl = self._ttls.get(key, self._default_ttl)
-                if time.time() - self._timestamps[key] < ttl:
-                    return True
-            return False
-
-    def _remove(self, key: str) -> None:
-        """内部方法：移除指定键"""
-        self._cache.pop(key, None)
-        self._timestamps.pop(key, None)
-        self._ttls.pop(key, None)
+            heap = self._expiry_heap
+            while heap and heap[0][0] <= now:
+                _, _, key = heapq.heappop(heap)
+                entry = self._cache.get(key)
+                # 键可能已被重新写入（新的过期时间），只删除确实过期的条目
+                if entry is not None and entry[1] <= now:
+                    self._cache.pop(key, None)
+                    removed += 1
+
+        if removed:
+            logger.debug("🧹 配置缓存清理过期条目: %d条", removed)
+        return removed
+
+    async def _sweep_loop(self, interval: float) -> None:
+        """后台定期清理过期条目"""
+        while True:
+            await asyncio.sleep(interval)
+            self.sweep_expired()
+
+    def start_sweeper(self, interval: float = 60) -> None:
+        """在当前事件循环中启动后台清理任务（无运行中的事件循环时忽略）"""
+        if self._sweeper_task is not None and not self._sweeper_task.done():
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        self._sweeper_task = loop.create_task(self._sweep_loop(interval))
+
+    def _rebuild_heap(self) -> None:
+        """根据当前缓存内容重建过期堆（调用方需持有锁）"""
+        self._expiry_heap = [
+            (expiry, next(self._seq), key)
+            for key, (_, expiry) in list(self._cache.items())
+        ]
+        heapq.heapify(self._expiry_heap)
+
+    def _evict(self) -> None:
+        """容量已满时淘汰最早写入的条目（字典保持插入顺序）"""
+        try:
+            oldest = next(iter(self._cache))
+        except (StopIteration, RuntimeError):
+            return
+        self._cache.pop(oldest, None)
+
+    def _remove(self, key: str, expected: Optional[Tuple[Any, float]] = None) -> None:
+        """内部方法：移除指定键（指定 expected 时仅在条目未变化时移除）"""
+        if expected is None:
+            self._cache.pop(key, None)
+        elif self._cache.get(key) is expected:
+            self._cache.pop(key, None)
 
     @property
     def hit_rate(self) -> float:
@@ -118,14 +192,40 @@ class ConfigCache:
 
     def get_stats(self) -> Dict[str, Any]:
         """获取缓存统计信息"""
+        # 锁内只做一致性快照，字典在锁外构建
         with self._lock:
-            return {
-                "hits": self._hits,
-                "misses": self._misses,
-                "hit_rate": self.hit_rate,
-                "size": len(self._cache),
-                "default_ttl": self._default_ttl
-            }
+            hits, misses, size = self._hits, self._misses, len(self._cache)
+        total = hits + misses
+        return {
+            "hits": hits,
+            "misses": misses,
+            "hit_rate": hits / total if total > 0 else 0.0,
+            "size": size,
+            "maxsize": self._maxsize,
+            "default_ttl": self._default_ttl
+        }
+
+
+# 正在加载中的键 -> Future，用于合并并发的缓存未命中
+_inflight: Dict[Hashable, "asyncio.Future"] = {}
+
+
+def _make_config_key(fn_name: str, args: tuple, kwargs: dict) -> Hashable:
+    """
+    生成 cached_config 的缓存键
+
+    优先使用可哈希的元组键 (fn_name, args, 按名称排序的 kwargs)，参数值连同类型一起参与比较
+    （与 lru_cache(typed=True) 一致，f(1)、f(1.0)、f(True) 互不共用结果）；
+    参数不可哈希时退化为 repr 字符串键
+    """
+    typed_args = tuple((type(arg), arg) for arg in args)
+    items = tuple((name, type(value), value) for name, value in sorted(kwargs.items())) if kwargs else ()
+    key = (fn_name, typed_args, items)
+    try:
+        hash(key)
+    except TypeError:
+        return f"{fn_name}:{args!r}:{list(items)!r}"
+    return key
 
 
 def cached_config(ttl: int = 300):
@@ -139,21 +239,48 @@ def cached_config(ttl: int = 300):
             return config
     """
     def decorator(func):
+        fn_name = func.__name__
+
         @wraps(func)
         async def wrapper(*args, **kwargs):
             # 生成缓存键
-            cache_key = f"{func.__name__}:{args}:{kwargs}"
+            cache_key = _make_config_key(fn_name, args, kwargs)
 
             # 尝试从缓存获取
             cached = _config_cache.get(cache_key)
             if cached is not None:
                 return cached
 
+            # 同一键已有请求在加载中：等待其结果，避免缓存击穿
+            loop = asyncio.get_running_loop()
+            inflight = _inflight.get(cache_key)
+            if inflight is not None and inflight.get_loop() is loop:
+                try:
+                    return await asyncio.shield(inflight)
+                except asyncio.CancelledError:
+                    if not inflight.cancelled():
+                        raise
+                    # 加载方被取消，由当前调用自行加载
+
             # 缓存未命中，执行函数
-            result = await func(*args, **kwargs)
+            future = loop.create_future()
+            _inflight[cache_key] = future
+            try:
+                result = await func(*args, **kwargs)
+            except asyncio.CancelledError:
+                future.cancel()
+                raise
+            except Exception as e:
+                future.set_exception(e)
+                future.exception()  # 标记已读取，无等待方时不打印警告
+                raise
+            finally:
+                if _inflight.get(cache_key) is future:
+                    del _inflight[cache_key]
 
             # 存入缓存
             _config_cache.set(cache_key, result, ttl=ttl)
+            future.set_result(result)
 
             return result
 
@@ -166,7 +293,8 @@ _config_cache = ConfigCache(default_ttl=300)  # 5分钟默认TTL
 
 
 def get_config_cache() -> ConfigCache:
-    """获取配置缓存实例"""
+    """获取配置缓存实例（在事件循环中调用时顺带启动过期清理任务）"""
+    _config_cache.start_sweeper()
     return _config_cache
 
 
@@ -11,20 +11,37 @@ Phase 3-06: Database Query Optimization - Index Management
 """
 
 import asyncio
+import json
 import logging
+import time
 from dataclasses import dataclass, field
 from datetime import datetime, timedelta
 from typing import Any, Dict, List, Optional, Set, Tuple
 from enum import Enum
 
 from motor.motor_asyncio import AsyncIOMotorClient
-from pymongo import ASCENDING, DESCENDING, TEXT
+from pymongo import ASCENDING, DESCENDING, TEXT, IndexModel
 from pymongo.errors import OperationFailure
 
 from .database import get_database
+from .redis_client import get_redis_service
 
 logger = logging.getLogger(__name__)
 
+# verify_indexes / get_optimization_suggestions 复用索引信息的有效期（秒）
+_INDEX_INFO_TTL = 30.0
+
+# get_query_performance 缓存 explain 结果的有效期（秒）
+_EXPLAIN_CACHE_TTL = 60.0
+
+# analyze_index_usage 结果的 Redis 缓存（多个仪表盘查看者共享一次查询）
+_INDEX_USAGE_CACHE_KEY = "index_usage_v1"
+_INDEX_USAGE_CACHE_TTL = 30
+
+# get_collection_indexes 结果的 Redis 缓存，索引变更时主动失效
+_COLLECTION_INDEXES_CACHE_KEY = "collection_indexes_v1:{collection}"
+_COLLECTION_INDEXES_CACHE_TTL = 300
+
 
 class IndexType(Enum):
     """索引类型"""
@@ -49,6 +66,30 @@ class IndexSpec:
     expire_after_seconds: Optional[int] = None
     weights: Optional[Dict[str, int]] = None  # 用于文本索引
     partial_filter: Optional[Dict[str, Any]] = None  # 部分索引
+    min_server_version: Optional[Tuple[int, int]] = None  # 所需的最低 MongoDB 版本，低于该版本时跳过
+
+    # 由 __post_init__ 预先计算的 pymongo 参数，创建索引时直接使用
+    _keys_arg: List[Tuple[str, Any]] = field(init=False, repr=False, compare=False)
+    _options: Dict[str, Any] = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self):
+        if self.index_type == IndexType.TEXT:
+            self._keys_arg = [(k, TEXT) for k in self.keys]
+        else:
+            self._keys_arg = list(self.keys.items())
+
+        options: Dict[str, Any] = {"background": self.background}
+        if self.unique:
+            options["unique"] = True
+        if self.sparse:
+            options["sparse"] = True
+        if self.expire_after_seconds:
+            options["expireAfterSeconds"] = self.expire_after_seconds
+        if self.weights:
+            options["weights"] = self.weights
+        if self.partial_filter:
+            options["partialFilterExpression"] = self.partial_filter
+        self._options = options
 
 
 @dataclass
@@ -74,7 +115,21 @@ class DatabaseIndexManager:
     4. 提供优化建议
     """
 
-    # 预定义的索引规范
+    # 已从 INDEX_SPECS 移除的冗余索引 (集合, 索引名)。从 INDEX_SPECS 移除不会删除已部署的索引，
+    # 需运行 scripts/maintenance/optimize_mongodb_indexes.py --drop-redundant
+    # （即 drop_redundant_indexes()）一次性清理：
+    # - kline_date_idx: 按时间查询应带上 symbol/period 使用 kline_symbol_period_date_idx
+    # - news_recent_idx: 创建时固定时间下限的部分索引，与 news_date_idx 键相同，改由查询限定时间窗口
+    # - ai_analysis_created_idx: 与 ai_analysis_ttl_idx 字段相同（单字段索引可双向遍历）
+    # - ai_analysis_symbol_type_idx: 是 ai_analysis_cover_idx 的前缀
+    REDUNDANT_INDEXES: List[Tuple[str, str]] = [
+        ("klines", "kline_date_idx"),
+        ("news", "news_recent_idx"),
+        ("ai_analysis", "ai_analysis_created_idx"),
+        ("ai_analysis", "ai_analysis_symbol_type_idx"),
+    ]
+
+    # 预定义的索引规范（复合索引按 ESR 规则排列：等值 -> 排序 -> 范围）
     INDEX_SPECS: List[IndexSpec] = [
         # ========== 股票数据 ==========
         IndexSpec(
@@ -99,12 +154,6 @@ class DatabaseIndexManager:
             keys={"symbol": 1, "period": 1, "timestamp": -1},
             index_type=IndexType.COMPOUND,
         ),
-        IndexSpec(
-            name="kline_date_idx",
-            collection="klines",
-            keys={"timestamp": -1},
-            index_type=IndexType.SINGLE,
-        ),
         IndexSpec(
             name="kline_ttl_idx",
             collection="klines",
@@ -120,18 +169,19 @@ class DatabaseIndexManager:
             keys={"symbols": 1, "published_at": -1},
             index_type=IndexType.COMPOUND,
         ),
-        IndexSpec(
-            name="news_date_idx",
-            collection="news",
-            keys={"published_at": -1},
-            index_type=IndexType.SINGLE,
-        ),
         IndexSpec(
             name="news_source_date_idx",
             collection="news",
             keys={"source": 1, "published_at": -1},
             index_type=IndexType.COMPOUND,
         ),
+        IndexSpec(
+            # 最新新闻列表；“近 N 天”由查询中的 published_at 范围条件限定
+            name="news_date_idx",
+            collection="news",
+            keys={"published_at": -1},
+            index_type=IndexType.SINGLE,
+        ),
         IndexSpec(
             name="news_tags_idx",
             collection="news",
@@ -162,17 +212,12 @@ class DatabaseIndexManager:
 
         # ========== AI分析结果 ==========
         IndexSpec(
-            name="ai_analysis_symbol_type_idx",
+            # 覆盖索引：只投影这些字段（并排除 _id）的列表查询无需回表（无 FETCH 阶段）
+            name="ai_analysis_cover_idx",
             collection="ai_analysis",
-            keys={"symbol": 1, "analysis_type": 1, "created_at": -1},
+            keys={"symbol": 1, "analysis_type": 1, "created_at": -1, "score": 1, "confidence": 1},
             index_type=IndexType.COMPOUND,
         ),
-        IndexSpec(
-            name="ai_analysis_created_idx",
-            collection="ai_analysis",
-            keys={"created_at": -1},
-            index_type=IndexType.SINGLE,
-        ),
         IndexSpec(
             name="ai_analysis_ttl_idx",
             collection="ai_analysis",
@@ -196,7 +241,8 @@ class DatabaseIndexManager:
             keys={"cache_key": 1},
             index_type=IndexType.SINGLE,
             unique=True,
-            sparse=True,
+            # 部分索引替代 sparse：只索引 cache_key 为字符串的文档
+            partial_filter={"cache_key": {"$type": "string"}},
         ),
         IndexSpec(
             name="screening_created_idx",
@@ -229,6 +275,16 @@ class DatabaseIndexManager:
             keys={"status": 1, "created_at": -1},
             index_type=IndexType.COMPOUND,
         ),
+        IndexSpec(
+            name="tasks_pending_idx",
+            collection="analysis_tasks",
+            keys={"created_at": -1},
+            index_type=IndexType.SINGLE,
+            # 只索引未完成任务，供僵尸任务/任务队列扫描使用；查询的 status 条件必须是该集合的子集才会命中。
+            # 部分索引中的 $in 需要 MongoDB 6.0+，更低版本跳过，由 tasks_status_idx 承担同类查询
+            partial_filter={"status": {"$in": ["pending", "processing", "running"]}},
+            min_server_version=(6, 0),
+        ),
         IndexSpec(
             name="tasks_user_idx",
             collection="analysis_tasks",
@@ -240,10 +296,15 @@ class DatabaseIndexManager:
     def __init__(self):
         self._db = None
         self._stats: Dict[str, IndexStats] = {}
-
-    async def initialize(self):
-        """初始化索引管理器"""
-        self._db = get_database()
+        # 集合名 -> (获取时间, index_information() 结果)
+        self._idx_info_cache: Dict[str, Tuple[float, Dict[str, Any]]] = {}
+        # (集合, 查询条件, 投影, verbosity) -> (获取时间, 分析结果)
+        self._explain_cache: Dict[Tuple[str, str, str, str], Tuple[float, Dict[str, Any]]] = {}
+        self._server_version: Optional[Tuple[int, int]] = None
+
+    async def initialize(self, db: Any = None):
+        """初始化索引管理器（db 为空时使用应用的默认数据库，独立脚本可传入自己的连接）"""
+        self._db = db if db is not None else get_database()
         logger.info("✅ DatabaseIndexManager initialized")
 
     async def create_all_indexes(self, force: bool = False) -> Dict[str, Any]:
@@ -260,91 +321,293 @@ class DatabaseIndexManager:
             "created": [],
             "existing": [],
             "failed": [],
+            "skipped": [],
         }
 
         logger.info("🔧 Starting index creation...")
 
+        server_version = await self._get_server_version()
+        specs_by_collection: Dict[str, List[IndexSpec]] = {}
         for spec in self.INDEX_SPECS:
-            try:
-                collection = self._db[spec.collection]
-                existing_indexes = await collection.index_information()
-
-                if spec.name in existing_indexes and not force:
-                    results["existing"].append(spec.name)
-                    logger.debug(f"⏭️  Index already exists: {spec.collection}.{spec.name}")
-                    continue
-
-                # 构建索引选项
-                index_options = {
-                    "name": spec.name,
-                    "background": spec.background,
-                }
+            if not self._is_supported(spec, server_version):
+                logger.info(
+                    f"⏭️  Skipping index {spec.collection}.{spec.name}: requires MongoDB "
+                    f"{'.'.join(map(str, spec.min_server_version))}+"
+                )
+                results["skipped"].append(spec.name)
+                continue
+            specs_by_collection.setdefault(spec.collection, []).append(spec)
+
+        # 每个集合只查询一次已有索引
+        existing_by_collection = await self._get_indexes_cached(list(specs_by_collection))
+
+        # 各集合互不依赖，并发执行；同一集合的索引通过一次 createIndexes 提交
+        outcomes = await asyncio.gather(
+            *(
+                self._create_collection_indexes(name, specs, existing_by_collection[name], force)
+                for name, specs in specs_by_collection.items()
+            ),
+            return_exceptions=True,
+        )
 
-                if spec.unique:
-                    index_options["unique"] = True
-                if spec.sparse:
-                    index_options["sparse"] = True
-                if spec.expire_after_seconds:
-                    index_options["expireAfterSeconds"] = spec.expire_after_seconds
-                if spec.weights:
-                    index_options["weights"] = spec.weights
-                if spec.partial_filter:
-                    index_options["partialFilterExpression"] = spec.partial_filter
-
-                # 创建索引
-                if spec.index_type == IndexType.TEXT:
-                    await collection.create_index(
-                        [(k, TEXT) for k in spec.keys.keys()],
-                        **index_options
-                    )
-                else:
-                    await collection.create_index(
-                        list(spec.keys.items()),
-                        **index_options
-                    )
-
-                results["created"].append(spec.name)
-                logger.info(f"✅ Created index: {spec.collection}.{spec.name}")
-
-            except OperationFailure as e:
-                results["failed"].append(spec.name)
-                logger.error(f"❌ Failed to create index {spec.collection}.{spec.name}: {e}")
-            except Exception as e:
-                results["failed"].append(spec.name)
-                logger.error(f"❌ Unexpected error creating index {spec.collection}.{spec.name}: {e}")
+        for (name, specs), outcome in zip(specs_by_collection.items(), outcomes):
+            if isinstance(outcome, BaseException):
+                logger.error(f"❌ Unexpected error creating indexes on {name}: {outcome}")
+                results["failed"].extend(spec.name for spec in specs)
+                continue
+            for spec_name, bucket in outcome:
+                results[bucket].append(spec_name)
+
+        if results["created"]:
+            self._idx_info_cache.clear()
+            self._explain_cache.clear()
+            await self._cache_delete(
+                *(_COLLECTION_INDEXES_CACHE_KEY.format(collection=name) for name in specs_by_collection)
+            )
 
         logger.info(
             f"🔧 Index creation complete: "
             f"{len(results['created'])} created, "
             f"{len(results['existing'])} existing, "
-            f"{len(results['failed'])} failed"
+            f"{len(results['failed'])} failed, "
+            f"{len(results['skipped'])} skipped"
         )
 
         return results
 
+    async def _get_server_version(self) -> Tuple[int, int]:
+        """MongoDB 服务端 (major, minor) 版本，查询失败时返回 (0, 0)（按最低版本处理）"""
+        if self._server_version is None:
+            try:
+                info = await self._db.command("buildInfo")
+                major, minor = info.get("versionArray", [0, 0])[:2]
+                self._server_version = (int(major), int(minor))
+            except Exception as e:
+                logger.warning(f"⚠️ Failed to read MongoDB server version: {e}")
+                return (0, 0)
+        return self._server_version
+
+    @staticmethod
+    def _is_supported(spec: IndexSpec, server_version: Tuple[int, int]) -> bool:
+        """索引规范是否受当前 MongoDB 版本支持"""
+        return spec.min_server_version is None or server_version >= spec.min_server_version
+
+    def _spec_collections(self) -> List[str]:
+        """INDEX_SPECS 涉及的集合（去重，保持顺序）"""
+        return list(dict.fromkeys(spec.collection for spec in self.INDEX_SPECS))
+
+    async def _get_indexes_cached(
+        self,
+        collection_names: List[str],
+        max_age: float = 0.0,
+    ) -> Dict[str, Any]:
+        """
+        批量获取集合的索引信息，每个集合只调用一次 index_information()
+
+        Args:
+            collection_names: 集合名列表
+            max_age: 大于 0 时复用该时间（秒）内获取过的结果
+
+        Returns:
+            集合名 -> 索引信息字典（查询失败时为异常对象）
+        """
+        now = time.monotonic()
+        result: Dict[str, Any] = {}
+        to_fetch: List[str] = []
+
+        for name in collection_names:
+            cached = self._idx_info_cache.get(name)
+            if max_age > 0 and cached is not None and now - cached[0] < max_age:
+                result[name] = cached[1]
+            else:
+                to_fetch.append(name)
+
+        if to_fetch:
+            infos = await asyncio.gather(
+                *(self._db[name].index_information() for name in to_fetch),
+                return_exceptions=True,
+            )
+            for name, info in zip(to_fetch, infos):
+                result[name] = info
+                if not isinstance(info, BaseException):
+                    self._idx_info_cache[name] = (now, info)
+
+        return result
+
+    async def _get_coll_stats(self, collection_names: List[str]) -> Dict[str, Any]:
+        """
+        并发获取集合统计（collstats），每个集合一次
+
+        Returns:
+            集合名 -> collstats 结果（查询失败时为异常对象）
+        """
+        coll_stats_list = await asyncio.gather(
+            *(self._db.command("collstats", name) for name in collection_names),
+            return_exceptions=True,
+        )
+        return dict(zip(collection_names, coll_stats_list))
+
+    @staticmethod
+    async def _cache_get(key: str) -> Any:
+        """读取 Redis 缓存，Redis 不可用时返回 None"""
+        try:
+            return await get_redis_service().get_json(key)
+        except Exception as e:
+            logger.debug(f"⚠️ Redis cache get failed for {key}: {e}")
+            return None
+
+    @staticmethod
+    async def _cache_set(key: str, value: Any, ttl: int):
+        """写入 Redis 缓存（日期等值按字符串保存），失败时忽略"""
+        try:
+            await get_redis_service().set_with_ttl(key, json.dumps(value, default=str), ttl)
+        except Exception as e:
+            logger.debug(f"⚠️ Redis cache set failed for {key}: {e}")
+
+    @staticmethod
+    async def _cache_delete(*keys: str):
+        """删除 Redis 缓存键，失败时忽略（由 TTL 兜底）"""
+        if not keys:
+            return
+        try:
+            await get_redis_service().redis.delete(*keys)
+        except Exception as e:
+            logger.debug(f"⚠️ Redis cache delete failed for {keys}: {e}")
+
+    @staticmethod
+    def _index_model(spec: IndexSpec) -> IndexModel:
+        """将索引规范转换为 pymongo IndexModel"""
+        return IndexModel(spec._keys_arg, name=spec.name, **spec._options)
+
+    async def _create_collection_indexes(
+        self,
+        collection: str,
+        specs: List[IndexSpec],
+        existing_indexes: Any,
+        force: bool,
+    ) -> List[Tuple[str, str]]:
+        """
+        创建同一集合上的索引（一次 createIndexes 命令）
+
+        批量命令中任一索引失败时整条命令失败，此时逐个重试以定位失败的索引
+
+        Args:
+            existing_indexes: 该集合的 index_information() 结果（查询失败时为异常对象）
+
+        Returns:
+            [(索引名, "created" / "existing" / "failed")]
+        """
+        if isinstance(existing_indexes, BaseException):
+            logger.error(f"❌ Failed to read indexes of {collection}: {existing_indexes}")
+            return [(spec.name, "failed") for spec in specs]
+
+        outcomes: List[Tuple[str, str]] = []
+        to_create: List[IndexSpec] = []
+        for spec in specs:
+            if spec.name in existing_indexes and not force:
+                logger.debug(f"⏭️  Index already exists: {collection}.{spec.name}")
+                outcomes.append((spec.name, "existing"))
+            else:
+                to_create.append(spec)
+
+        if not to_create:
+            return outcomes
+
+        if len(to_create) == 1:
+            outcomes.append((to_create[0].name, await self._create_one(to_create[0])))
+            return outcomes
+
+        try:
+            await self._db[collection].create_indexes(
+                [self._index_model(spec) for spec in to_create]
+            )
+        except OperationFailure as e:
+            logger.warning(f"⚠️ Bulk index creation on {collection} failed, retrying one by one: {e}")
+            buckets = await asyncio.gather(*(self._create_one(spec) for spec in to_create))
+            outcomes.extend(zip((spec.name for spec in to_create), buckets))
+            return outcomes
+
+        for spec in to_create:
+            logger.info(f"✅ Created index: {collection}.{spec.name}")
+            outcomes.append((spec.name, "created"))
+        return outcomes
+
+    async def _create_one(self, spec: IndexSpec) -> str:
+        """
+        创建单个索引
+
+        Returns:
+            "created" / "failed"
+        """
+        try:
+            await self._db[spec.collection].create_indexes([self._index_model(spec)])
+            logger.info(f"✅ Created index: {spec.collection}.{spec.name}")
+            return "created"
+
+        except OperationFailure as e:
+            logger.error(f"❌ Failed to create index {spec.collection}.{spec.name}: {e}")
+            return "failed"
+        except Exception as e:
+            logger.error(f"❌ Unexpected error creating index {spec.collection}.{spec.name}: {e}")
+            return "failed"
+
     async def drop_index(self, collection: str, index_name: str) -> bool:
         """删除指定索引"""
         try:
             coll = self._db[collection]
             await coll.drop_index(index_name)
+            self._idx_info_cache.pop(collection, None)
+            self._explain_cache.clear()
+            await self._cache_delete(_COLLECTION_INDEXES_CACHE_KEY.format(collection=collection))
             logger.info(f"🗑️  Dropped index: {collection}.{index_name}")
             return True
         except Exception as e:
             logger.error(f"❌ Failed to drop index {collection}.{index_name}: {e}")
             return False
 
+    async def drop_redundant_indexes(self) -> Dict[str, bool]:
+        """
+        删除已从 INDEX_SPECS 移除的冗余索引（一次性迁移）
+
+        Returns:
+            "集合.索引名" -> 是否已删除（不存在的索引视为已删除）
+        """
+        indexes_by_collection = await self._get_indexes_cached(
+            list(dict.fromkeys(coll for coll, _ in self.REDUNDANT_INDEXES))
+        )
+
+        async def _drop(collection: str, index_name: str) -> bool:
+            indexes = indexes_by_collection[collection]
+            if not isinstance(indexes, BaseException) and index_name not in indexes:
+                return True
+            return await self.drop_index(collection, index_name)
+
+        outcomes = await asyncio.gather(
+            *(_drop(coll, name) for coll, name in self.REDUNDANT_INDEXES)
+        )
+        return {
+            f"{coll}.{name}": dropped
+            for (coll, name), dropped in zip(self.REDUNDANT_INDEXES, outcomes)
+        }
+
     async def get_collection_indexes(self, collection: str) -> List[Dict[str, Any]]:
-        """获取集合的所有索引"""
+        """获取集合的所有索引（Redis 缓存 5 分钟，创建/删除索引时失效）"""
+        cache_key = _COLLECTION_INDEXES_CACHE_KEY.format(collection=collection)
+        cached = await self._cache_get(cache_key)
+        if cached is not None:
+            return cached
+
         try:
             coll = self._db[collection]
             indexes = await coll.index_information()
-            return [
+            result = [
                 {
                     "name": name,
                     "keys": spec.get("key", {}),
                     "unique": spec.get("unique", False),
                     "sparse": spec.get("sparse", False),
                     "ttl": spec.get("expireAfterSeconds"),
+                    "partial_filter": spec.get("partialFilterExpression"),
                 }
                 for name, spec in indexes.items()
             ]
@@ -352,29 +615,45 @@ class DatabaseIndexManager:
             logger.error(f"❌ Failed to get indexes for {collection}: {e}")
             return []
 
+        await self._cache_set(cache_key, result, _COLLECTION_INDEXES_CACHE_TTL)
+        return result
+
     async def analyze_index_usage(self) -> Dict[str, Any]:
         """
         分析索引使用情况
 
+        结果在 Redis 中缓存 30 秒，不主动失效
+
         Returns:
             索引使用统计
         """
+        cached = await self._cache_get(_INDEX_USAGE_CACHE_KEY)
+        if cached is not None:
+            return cached
+
         stats = {}
 
+        collection_names = self._spec_collections()
+        # 索引信息与集合统计各按集合查询一次，两组请求同时发出
+        indexes_by_collection, coll_stats_by_collection = await asyncio.gather(
+            self._get_indexes_cached(collection_names),
+            self._get_coll_stats(collection_names),
+        )
+
         for spec in self.INDEX_SPECS:
             try:
-                coll = self._db[spec.collection]
-
-                # 获取索引信息
-                indexes = await coll.index_information()
+                indexes = indexes_by_collection[spec.collection]
+                if isinstance(indexes, BaseException):
+                    raise indexes
 
                 if spec.name not in indexes:
                     continue
 
                 index_info = indexes[spec.name]
 
-                # 获取集合统计
-                coll_stats = await self._db.command("collstats", spec.collection)
+                coll_stats = coll_stats_by_collection[spec.collection]
+                if isinstance(coll_stats, BaseException):
+                    raise coll_stats
 
                 stats[f"{spec.collection}.{spec.name}"] = {
                     "size": index_info.get("size", 0),
@@ -385,22 +664,39 @@ class DatabaseIndexManager:
             except Exception as e:
                 logger.warning(f"⚠️ Failed to analyze index {spec.collection}.{spec.name}: {e}")
 
+        await self._cache_set(_INDEX_USAGE_CACHE_KEY, stats, _INDEX_USAGE_CACHE_TTL)
         return stats
 
-    async def get_optimization_suggestions(self) -> List[Dict[str, Any]]:
+    async def get_optimization_suggestions(
+        self,
+        unused_min_age_days: int = 7,
+    ) -> List[Dict[str, Any]]:
         """
         获取索引优化建议
 
+        Args:
+            unused_min_age_days: 索引统计周期超过该天数且无访问时才判定为未使用
+
         Returns:
             优化建议列表
         """
         suggestions = []
 
-        # 检查缺失的索引
+        collection_names = self._spec_collections()
+        indexes_by_collection, index_stats_by_collection = await asyncio.gather(
+            self._get_indexes_cached(collection_names, max_age=_INDEX_INFO_TTL),
+            self._get_index_stats(collection_names),
+        )
+
+        # 检查缺失的索引（跳过当前服务端版本不支持的索引）
+        server_version = await self._get_server_version()
         for spec in self.INDEX_SPECS:
+            if not self._is_supported(spec, server_version):
+                continue
             try:
-                coll = self._db[spec.collection]
-                indexes = await coll.index_information()
+                indexes = indexes_by_collection[spec.collection]
+                if isinstance(indexes, BaseException):
+                    raise indexes
 
                 if spec.name not in indexes:
                     suggestions.append({
@@ -415,11 +711,121 @@ class DatabaseIndexManager:
             except Exception as e:
                 logger.warning(f"⚠️ Failed to check index {spec.collection}.{spec.name}: {e}")
 
-        # 检查未使用的索引
-        # TODO: 实现基于 $indexStats 的未使用索引检测
+        for collection in collection_names:
+            indexes = indexes_by_collection[collection]
+            if isinstance(indexes, BaseException):
+                continue
 
-        # 检查重复的索引
-        # TODO: 实现重复索引检测
+            # 检查未使用的索引
+            index_stats = index_stats_by_collection[collection]
+            if isinstance(index_stats, BaseException):
+                logger.warning(f"⚠️ Failed to get $indexStats for {collection}: {index_stats}")
+            else:
+                suggestions.extend(
+                    self._find_unused_indexes(collection, indexes, index_stats, unused_min_age_days)
+                )
+
+            # 检查重复的索引
+            suggestions.extend(self._find_redundant_indexes(collection, indexes))
+
+        return suggestions
+
+    async def _get_index_stats(self, collection_names: List[str]) -> Dict[str, Any]:
+        """
+        并发获取各集合的 $indexStats
+
+        Returns:
+            集合名 -> {索引名: $indexStats 文档}（查询失败时为异常对象）
+        """
+
+        async def _one(name: str) -> Dict[str, Dict[str, Any]]:
+            cursor = self._db[name].aggregate([{"$indexStats": {}}])
+            return {doc["name"]: doc for doc in await cursor.to_list(length=None)}
+
+        results = await asyncio.gather(
+            *(_one(name) for name in collection_names),
+            return_exceptions=True,
+        )
+        return dict(zip(collection_names, results))
+
+    @staticmethod
+    def _is_protected_index(name: str, info: Dict[str, Any]) -> bool:
+        """_id、唯一约束和 TTL 索引承担数据约束职责，不参与未使用/冗余判断"""
+        return (
+            name == "_id_"
+            or info.get("unique", False)
+            or "expireAfterSeconds" in info
+        )
+
+    def _find_unused_indexes(
+        self,
+        collection: str,
+        indexes: Dict[str, Any],
+        index_stats: Dict[str, Dict[str, Any]],
+        min_age_days: int,
+    ) -> List[Dict[str, Any]]:
+        """根据 $indexStats 的访问计数找出统计周期内从未被使用的索引"""
+        suggestions = []
+        now = datetime.utcnow()
+        min_age = timedelta(days=min_age_days)
+
+        for name, stat in index_stats.items():
+            info = indexes.get(name)
+            if info is None or self._is_protected_index(name, info):
+                continue
+
+            accesses = stat.get("accesses", {})
+            since = accesses.get("since")
+            if accesses.get("ops", 0) > 0 or since is None:
+                continue
+            if since.tzinfo is not None:
+                since = since.replace(tzinfo=None) - since.utcoffset()
+            if now - since < min_age:
+                continue
+
+            suggestions.append({
+                "type": "unused_index",
+                "priority": "medium",
+                "collection": collection,
+                "index_name": name,
+                "message": f"Index {name} on {collection} has not been used since {since.isoformat()}",
+                "action": "drop_index",
+            })
+
+        return suggestions
+
+    def _find_redundant_indexes(
+        self,
+        collection: str,
+        indexes: Dict[str, Any],
+    ) -> List[Dict[str, Any]]:
+        """找出键序列与其他索引相同或是其前缀的普通 B 树索引"""
+        suggestions = []
+
+        candidates = [
+            (name, tuple(info.get("key", [])))
+            for name, info in indexes.items()
+            if not self._is_protected_index(name, info)
+            and "partialFilterExpression" not in info
+            and all(direction in (1, -1) for _, direction in info.get("key", []))
+        ]
+        # 按键序列排序后，前缀/重复关系只需检查相邻的更长索引
+        candidates.sort(key=lambda item: (item[1], item[0]))
+
+        for i, (name, keys) in enumerate(candidates):
+            for other_name, other_keys in candidates[i + 1:]:
+                if other_keys[:len(keys)] != keys:
+                    break
+                suggestions.append({
+                    "type": "redundant_index",
+                    "priority": "low",
+                    "collection": collection,
+                    "index_name": name,
+                    "covered_by": other_name,
+                    "message": f"Index {name} on {collection} is a prefix of {other_name}",
+                    "action": "drop_index",
+                })
+                break
 
         return suggestions
 
@@ -427,38 +833,70 @@ class DatabaseIndexManager:
         self,
         collection: str,
         filter: Dict[str, Any],
+        projection: Optional[Dict[str, Any]] = None,
+        execution_stats: bool = True,
     ) -> Dict[str, Any]:
         """
         分析查询性能
 
+        相同查询形状的结果缓存 60 秒，避免仪表盘轮询时反复触发查询规划
+
         Args:
             collection: 集合名
             filter: 查询条件
+            projection: 投影（用于验证覆盖索引）
+            execution_stats: 为 False 时只获取获胜计划（queryPlanner 模式，不实际执行查询）
 
         Returns:
             查询性能分析结果
         """
+        verbosity = "executionStats" if execution_stats else "queryPlanner"
+        cache_key = (
+            collection,
+            json.dumps(filter, sort_keys=True, default=str),
+            json.dumps(projection, sort_keys=True, default=str),
+            verbosity,
+        )
+        now = time.monotonic()
+        cached = self._explain_cache.get(cache_key)
+        if cached is not None and now - cached[0] < _EXPLAIN_CACHE_TTL:
+            return cached[1]
+
         try:
-            coll = self._db[collection]
+            find_cmd: Dict[str, Any] = {"find": collection, "filter": filter}
+            if projection is not None:
+                find_cmd["projection"] = projection
 
             # 使用 explain 分析查询
-            plan = await coll.find(filter).explain()
+            plan = await self._db.command({"explain": find_cmd, "verbosity": verbosity})
 
-            return {
+            exec_stats = plan.get("executionStats", {})
+            docs_examined = exec_stats.get("totalDocsExamined", 0)
+            keys_examined = exec_stats.get("totalKeysExamined", 0)
+
+            result = {
                 "collection": collection,
                 "filter": filter,
                 "wins": plan.get("queryPlanner", {}).get("winningPlan", {}),
                 "rejected_plans": plan.get("queryPlanner", {}).get("rejectedPlans", []),
-                "execution_stats": plan.get("executionStats", {}),
-                "docs_examined": plan.get("executionStats", {}).get("totalDocsExamined", 0),
-                "keys_examined": plan.get("executionStats", {}).get("totalKeysExamined", 0),
-                "execution_time_ms": plan.get("executionStats", {}).get("executionTimeMillis", 0),
+                "execution_stats": exec_stats,
+                "docs_examined": docs_examined,
+                "keys_examined": keys_examined,
+                "execution_time_ms": exec_stats.get("executionTimeMillis", 0),
+                # 扫描了索引键却未读取文档，说明查询被索引覆盖
+                "covered": keys_examined > 0 and docs_examined == 0,
             }
+            self._explain_cache[cache_key] = (now, result)
+            return result
 
         except Exception as e:
             logger.error(f"❌ Failed to analyze query performance: {e}")
             return {}
 
+    def invalidate_explain_cache(self):
+        """清空 explain 结果缓存"""
+        self._explain_cache.clear()
+
     async def verify_indexes(self) -> Dict[str, bool]:
         """
         验证所有索引是否正确创建
@@ -468,10 +906,18 @@ class DatabaseIndexManager:
         """
         results = {}
 
+        indexes_by_collection, server_version = await asyncio.gather(
+            self._get_indexes_cached(self._spec_collections(), max_age=_INDEX_INFO_TTL),
+            self._get_server_version(),
+        )
+
         for spec in self.INDEX_SPECS:
+            if not self._is_supported(spec, server_version):
+                continue
             try:
-                coll = self._db[spec.collection]
-                indexes = await coll.index_information()
+                indexes = indexes_by_collection[spec.collection]
+                if isinstance(indexes, BaseException):
+                    raise indexes
                 results[f"{spec.collection}.{spec.name}"] = spec.name in indexes
             except Exception as e:
                 logger.warning(f"⚠️ Failed to verify index {spec.collection}.{spec.name}: {e}")
@@ -479,24 +925,72 @@ class DatabaseIndexManager:
 
         return results
 
-    async def compact_collections(self) -> Dict[str, Any]:
+    @staticmethod
+    def _reusable_bytes(coll_stats: Dict[str, Any]) -> int:
+        """集合数据文件中可回收的字节数（优先使用 WiredTiger 统计）"""
+        block_manager = coll_stats.get("wiredTiger", {}).get("block-manager", {})
+        reusable = block_manager.get("file bytes available for reuse")
+        if reusable is not None:
+            return int(reusable)
+        return max(0, int(coll_stats.get("storageSize", 0)) - int(coll_stats.get("size", 0)))
+
+    async def compact_collections(
+        self,
+        dry_run: bool = False,
+        min_free_ratio: float = 0.2,
+    ) -> Dict[str, Any]:
         """
         压缩集合以回收空间
 
+        只压缩可回收空间占存储大小比例超过 min_free_ratio 的集合；
+        compact 会阻塞集合读写，因此候选集合逐个串行执行
+
+        Args:
+            dry_run: 仅返回候选集合，不执行压缩（便于运维自行安排时间）
+            min_free_ratio: 可回收空间占 storageSize 的最小比例
+
         Returns:
             压缩结果
         """
         results = {
+            "candidates": [],
             "success": [],
             "failed": [],
+            "skipped": [],
         }
 
-        # 获取所有集合名
+        # 获取所有集合名及其存储统计
         collections = await self._db.list_collection_names()
+        coll_stats = await self._get_coll_stats(collections)
 
+        candidates: List[Tuple[str, int]] = []
         for coll_name in collections:
+            stats = coll_stats[coll_name]
+            if isinstance(stats, BaseException):
+                logger.warning(f"⚠️ Failed to get stats for {coll_name}: {stats}")
+                results["skipped"].append(coll_name)
+                continue
+
+            storage_size = stats.get("storageSize", 0)
+            reusable = self._reusable_bytes(stats)
+            if storage_size > 0 and reusable / storage_size > min_free_ratio:
+                candidates.append((coll_name, reusable))
+            else:
+                results["skipped"].append(coll_name)
+
+        # 可回收空间大的优先
+        candidates.sort(key=lambda item: item[1], reverse=True)
+        results["candidates"] = [
+            {"collection": name, "reusable_bytes": reusable} for name, reusable in candidates
+        ]
+
+        if dry_run:
+            return results
+
+        # compact 持有锁，不能并发执行
+        for coll_name, _ in candidates:
             try:
-                await self._db.command("compact", coll_name)
+                await self._db.command({"compact": coll_name, "force": True})
                 results["success"].append(coll_name)
                 logger.info(f"✅ Compacted collection: {coll_name}")
             except Exception as e:
@@ -540,6 +1034,13 @@ async def verify_database_indexes() -> Dict[str, bool]:
     return await manager.verify_indexes()
 
 
+async def drop_redundant_database_indexes(db: Any = None) -> Dict[str, bool]:
+    """删除 REDUNDANT_INDEXES 中列出的冗余索引（db 为空时使用应用的默认数据库）"""
+    manager = get_index_manager()
+    await manager.initialize(db)
+    return await manager.drop_redundant_indexes()
+
+
 async def get_index_optimization_suggestions() -> List[Dict[str, Any]]:
     """获取索引优化建议"""
     manager = get_index_manager()
@@ -4,10 +4,16 @@ TACN v2.0 - Integrations Module
 Provides bridges to TypeScript and Rust services from Python.
 """
 
-from .typescript_bridge import TypeScriptServiceBridge, get_ts_bridge, initialize_ts_bridge
+from .typescript_bridge import (
+    TypeScriptServiceBridge,
+    TypeScriptServiceError,
+    get_ts_bridge,
+    initialize_ts_bridge,
+)
 
 __all__ = [
     "TypeScriptServiceBridge",
+    "TypeScriptServiceError",
     "get_ts_bridge",
     "initialize_ts_bridge",
 ]
@@ -5,23 +5,64 @@ Provides Python integration with TypeScript service layer.
 This is the bridge that allows FastAPI to call TS services.
 """
 
-import subprocess
 import json
+import os
+import socket
 import asyncio
+import itertools
+import tempfile
 from pathlib import Path
 from typing import Any, Dict, Optional
 import logging
 
+import httpx
+
+try:
+    import orjson
+except ImportError:  # orjson 不可用时回退到标准库 json
+    orjson = None
+
 logger = logging.getLogger(__name__)
 
 
+def _dumps(value: Any) -> bytes:
+    """Serialize a message to UTF-8 JSON bytes (orjson when available)."""
+    if orjson is not None:
+        return orjson.dumps(value)
+    return json.dumps(value, ensure_ascii=False).encode()
+
+
+def _loads(raw: bytes) -> Any:
+    """Parse JSON bytes without decoding to str first (orjson when available)."""
+    if orjson is not None:
+        return orjson.loads(raw)
+    return json.loads(raw)
+
+
+class TypeScriptServiceError(RuntimeError):
+    """Error raised by a TypeScript service method (the worker itself is healthy)."""
+
+
 class TypeScriptServiceBridge:
     """
     Bridge to call TypeScript services from Python.
 
-    Uses Node.js subprocess to execute compiled TS services.
+    Service calls go to a long-lived Node.js worker (ts_services/bridge_server.js),
+    so V8 startup and module loading are paid once instead of per call. The
+    worker is restarted on the next call if it exits.
+
+    Where UNIX domain sockets are available the worker serves HTTP on a local
+    socket and calls go through a pooled httpx client, so many calls can be in
+    flight over separate keep-alive connections. Elsewhere (Windows) calls fall
+    back to newline-delimited JSON-RPC over the worker's stdin/stdout.
     """
 
+    # Max size of a single response line from the worker
+    _STREAM_LIMIT = 16 * 1024 * 1024
+
+    # Seconds to wait for the worker to start listening
+    _STARTUP_TIMEOUT = 10.0
+
     def __init__(self, ts_services_path: str = None):
         """
         Initialize the TypeScript bridge.
@@ -36,8 +77,30 @@ class TypeScriptServiceBridge:
 
         self.ts_services_path = Path(ts_services_path)
         self.build_path = self.ts_services_path / "build"
+        self.server_script = self.ts_services_path / "bridge_server.js"
         self.node_path = "node"
-        self._process: Optional[subprocess.Popen] = None
+        self._process: Optional[asyncio.subprocess.Process] = None
+        self._reader_task: Optional[asyncio.Task] = None
+        self._stderr_task: Optional[asyncio.Task] = None
+        self._pending: Dict[int, asyncio.Future] = {}
+        self._ids = itertools.count(1)
+        self._start_lock = asyncio.Lock()
+        self._write_lock = asyncio.Lock()
+
+        # HTTP-over-UDS transport (None -> stdio JSON-RPC)
+        self.socket_path: Optional[str] = None
+        if hasattr(socket, "AF_UNIX") and os.name != "nt":
+            self.socket_path = os.getenv(
+                "TS_BRIDGE_SOCKET",
+                os.path.join(tempfile.gettempdir(), f"tacn-ts-{os.getpid()}.sock"),
+            )
+        self._client: Optional[httpx.AsyncClient] = None
+
+        # Backpressure: cap in-flight calls so a burst cannot pile up unbounded
+        # work (and memory) inside the Node worker
+        self._max_inflight = int(os.getenv("TS_BRIDGE_MAX_INFLIGHT", "32"))
+        self._sem = asyncio.Semaphore(self._max_inflight)
+        self._default_timeout = float(os.getenv("TS_BRIDGE_TIMEOUT", "10"))
 
     async def initialize(self):
         """Initialize the TypeScript service bridge."""
@@ -47,13 +110,149 @@ class TypeScriptServiceBridge:
                 f"Run 'cd ts_services && npm run build' first."
             )
 
+        await self._ensure_process()
         logger.info(f"TypeScript bridge initialized: {self.build_path}")
 
+    def _is_running(self, process: Optional[asyncio.subprocess.Process]) -> bool:
+        """Whether the worker is alive and (in HTTP mode) its client is connected."""
+        return (
+            process is not None
+            and process.returncode is None
+            and (self.socket_path is None or self._client is not None)
+        )
+
+    async def _ensure_process(self) -> asyncio.subprocess.Process:
+        """Start the bridge worker if it is not running (or restart it if it exited)."""
+        process = self._process
+        if self._is_running(process):
+            return process
+
+        async with self._start_lock:
+            process = self._process
+            if self._is_running(process):
+                return process
+            self._process = None
+            return await self._start_process()
+
+    async def _start_process(self) -> asyncio.subprocess.Process:
+        """
+        Spawn the worker and wait until it can serve calls.
+
+        The worker is only published on self._process once it is ready, so a
+        startup that fails or is cancelled never leaves a half-started worker
+        behind for later calls to use.
+        """
+        args = [str(self.server_script)]
+        if self.socket_path:
+            args += ["--socket", self.socket_path]
+
+        process = await asyncio.create_subprocess_exec(
+            self.node_path,
+            *args,
+            cwd=str(self.ts_services_path),
+            stdin=asyncio.subprocess.PIPE,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+            limit=self._STREAM_LIMIT,
+        )
+        # Only the HTTP mode announces readiness on stdout: True once listening,
+        # False if the worker exits first
+        ready = asyncio.get_running_loop().create_future() if self.socket_path else None
+        self._reader_task = asyncio.create_task(self._reader_loop(process, ready))
+        self._stderr_task = asyncio.create_task(self._stderr_loop(process))
+
+        try:
+            if ready is not None:
+                if not await asyncio.wait_for(asyncio.shield(ready), self._STARTUP_TIMEOUT):
+                    raise RuntimeError(f"worker exited with code {process.returncode}")
+                if self._client is None:
+                    self._client = httpx.AsyncClient(
+                        transport=httpx.AsyncHTTPTransport(
+                            uds=self.socket_path,
+                            limits=httpx.Limits(
+                                max_connections=self._max_inflight,
+                                max_keepalive_connections=self._max_inflight,
+                            ),
+                        ),
+                        base_url="http://ts-bridge",
+                        timeout=None,
+                    )
+        except BaseException as e:
+            if process.returncode is None:
+                process.kill()
+            if isinstance(e, asyncio.CancelledError):
+                raise
+            raise RuntimeError(f"TypeScript bridge worker failed to start: {e!r}") from e
+
+        self._process = process
+        logger.info(f"TypeScript bridge worker started (pid={process.pid})")
+        return process
+
+    async def _reader_loop(
+        self,
+        process: asyncio.subprocess.Process,
+        ready: Optional[asyncio.Future] = None,
+    ):
+        """Resolve pending calls from worker responses until the worker exits."""
+        try:
+            while True:
+                line = await process.stdout.readline()
+                if not line:
+                    break
+                try:
+                    message = _loads(line)
+                except ValueError:
+                    logger.warning(f"TypeScript bridge: invalid response line: {line[:200]!r}")
+                    continue
+
+                if message.get("ready"):
+                    if ready is not None and not ready.done():
+                        ready.set_result(True)
+                    continue
+
+                future = self._pending.pop(message.get("id"), None)
+                if future is None or future.done():
+                    continue
+                if message.get("ok"):
+                    future.set_result(message.get("data"))
+                else:
+                    future.set_exception(
+                        TypeScriptServiceError(message.get("error", "Unknown error"))
+                    )
+        except Exception as e:
+            logger.error(f"TypeScript bridge reader failed: {e}")
+        finally:
+            # Release our end of the stdin pipe so the exited worker's transport can close
+            if process.stdin is not None and not process.stdin.is_closing():
+                process.stdin.close()
+            if ready is not None and not ready.done():
+                ready.set_result(False)
+            if self._process is process:
+                # The next call restarts the worker
+                self._process = None
+                self._fail_pending(RuntimeError("TypeScript bridge worker exited"))
+
+    async def _stderr_loop(self, process: asyncio.subprocess.Process):
+        """Forward worker stderr to the log (also keeps the pipe from filling up)."""
+        while True:
+            line = await process.stderr.readline()
+            if not line:
+                break
+            logger.warning(f"TypeScript bridge: {line.decode(errors='replace').rstrip()}")
+
+    def _fail_pending(self, error: Exception):
+        """Fail all in-flight calls."""
+        pending, self._pending = self._pending, {}
+        for future in pending.values():
+            if not future.done():
+                future.set_exception(error)
+
     async def call_service(
         self,
         service: str,
         method: str,
-        params: Dict[str, Any] = None
+        params: Dict[str, Any] = None,
+        timeout: Optional[float] = None,
     ) -> Any:
         """
         Call a TypeScript service method.
@@ -61,70 +260,98 @@ class TypeScriptServiceBridge:
         Args:
             service: Service name (e.g., 'TrendAnalysisService')
             method: Method name (e.g., 'analyze')
-            params: Method parameters
+            params: Method parameters (a list is spread as positional arguments)
+            timeout: Seconds to wait for the response (defaults to TS_BRIDGE_TIMEOUT, 10s)
 
         Returns:
             Result from TypeScript service
+
+        Raises:
+            TypeScriptServiceError: The service method failed
+            RuntimeError: The worker could not be started or exited mid-call
         """
         if params is None:
             params = {}
+        if timeout is None:
+            timeout = self._default_timeout
 
-        # Create a temporary Node.js script to call the service
-        script = f"""
-const {{ {service} }} = require('./build/domain/analysis/trend-analysis.service');
-
-async function main() {{
-    try {{
-        const svc = new {service}();
-        const result = await svc.{method}({json.dumps(params)});
-        console.log(JSON.stringify({{ success: true, data: result }}));
-    }} catch (error) {{
-        console.log(JSON.stringify({{ success: false, error: error.message }}));
-    }}
-}}
-
-main();
-"""
-
-        # Run the script
-        result = await self._run_node_script(script)
-        return result
+        async with self._sem:
+            try:
+                return await asyncio.wait_for(
+                    self._request(service, method, params), timeout=timeout
+                )
+            except asyncio.TimeoutError:
+                logger.warning(f"TypeScript bridge call timed out: {service}.{method} ({timeout}s)")
+                await self._check_worker()
+                raise
 
-    async def _run_node_script(self, script: str) -> Any:
-        """Run a Node.js script and return the result."""
+    async def _check_worker(self):
+        """Heartbeat after a timeout: restart the worker if it no longer answers a ping."""
         try:
-            process = await asyncio.create_subprocess_exec(
-                self.node_path,
-                "--eval",
-                script,
-                cwd=str(self.build_path),
-                stdout=asyncio.subprocess.PIPE,
-                stderr=asyncio.subprocess.PIPE,
-            )
+            await asyncio.wait_for(self._request("__bridge__", "ping", {}), timeout=2.0)
+        except Exception:
+            process = self._process
+            if process is not None and process.returncode is None:
+                logger.error("TypeScript bridge worker missed heartbeat, restarting")
+                process.kill()
 
-            stdout, stderr = await process.communicate()
-
-            if process.returncode != 0:
-                logger.error(f"Node.js script failed: {stderr.decode()}")
-                raise RuntimeError(f"TypeScript service error: {stderr.decode()}")
+    async def _request(
+        self,
+        service: str,
+        method: str,
+        params: Any,
+    ) -> Any:
+        """Send one request to the worker and wait for its response."""
+        process = await self._ensure_process()
+        if self.socket_path:
+            return await self._request_http(service, method, params)
 
-            result = json.loads(stdout.decode())
-            if not result.get("success"):
-                raise RuntimeError(result.get("error", "Unknown error"))
+        request_id = next(self._ids)
+        future = asyncio.get_running_loop().create_future()
+        self._pending[request_id] = future
 
-            return result.get("data")
+        line = _dumps(
+            {"id": request_id, "service": service, "method": method, "params": params}
+        )
+        try:
+            async with self._write_lock:
+                process.stdin.write(line + b"\n")
+                await process.stdin.drain()
+            return await future
+        finally:
+            self._pending.pop(request_id, None)
 
-        except Exception as e:
-            logger.error(f"Failed to run Node.js script: {e}")
-            raise
+    async def _request_http(
+        self,
+        service: str,
+        method: str,
+        params: Any,
+    ) -> Any:
+        """Call the worker's HTTP endpoint over the UNIX socket."""
+        client = self._client
+        if client is None:
+            raise RuntimeError("TypeScript bridge worker is not running")
+        try:
+            response = await client.post(
+                f"/svc/{service}/{method}",
+                content=_dumps(params),
+                headers={"Content-Type": "application/json"},
+            )
+        except httpx.TransportError as e:
+            # The worker died mid-call; the reader loop clears it so the next call restarts it
+            raise RuntimeError(f"TypeScript bridge worker unavailable: {e!r}") from e
+        response.raise_for_status()
+        message = _loads(response.content)
+        if not message.get("ok"):
+            raise TypeScriptServiceError(message.get("error", "Unknown error"))
+        return message.get("data")
 
     async def health_check(self) -> Dict[str, Any]:
         """Check if TypeScript services are available."""
         try:
-            script = """
-console.log(JSON.stringify({ success: true, version: '2.0.0' }));
-"""
-            result = await self._run_node_script(script)
+            result = await asyncio.wait_for(
+                self._request("__bridge__", "ping", {}), timeout=5.0
+            )
             return {
                 "status": "healthy",
                 "version": result.get("version"),
@@ -136,6 +363,24 @@ console.log(JSON.stringify({ success: true, version: '2.0.0' }));
                 "error": str(e)
             }
 
+    async def close(self):
+        """Stop the bridge worker."""
+        process, self._process = self._process, None
+        if process is not None and process.returncode is None:
+            process.stdin.close()
+            try:
+                await asyncio.wait_for(process.wait(), timeout=5.0)
+            except asyncio.TimeoutError:
+                process.kill()
+                await process.wait()
+        for task in (self._reader_task, self._stderr_task):
+            if task is not None:
+                task.cancel()
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+        self._fail_pending(RuntimeError("TypeScript bridge closed"))
+
 
 # Global bridge instance
 _ts_bridge: Optional[TypeScriptServiceBridge] = None
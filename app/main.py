@@ -275,11 +275,11 @@ async def lifespan(app: FastAPI):
     # 🔥 Phase 3-05: 缓存系统初始化 (cache_manager, cache_warming)
     try:
         from app.core.cache_manager import init_cache_manager
-        from app.core.cache_warming import warmup_cache
+        from app.core.cache_warming import start_cache_warmup
         await init_cache_manager()
         logger.info("✅ 缓存管理器初始化完成")
-        # 异步预热缓存（不阻塞启动）
-        asyncio.create_task(warmup_cache())
+        # 先从快照恢复缓存，再异步执行完整预热（不阻塞启动）
+        await start_cache_warmup()
     except Exception as e:
         logger.warning(f"⚠️ 缓存系统初始化失败（跳过）: {e}")
 
@@ -659,6 +659,19 @@ async def lifespan(app: FastAPI):
         except Exception as e:
             logger.warning(f"UserService cleanup error: {e}")
 
+        # 停止 TypeScript 桥接常驻进程
+        try:
+            from app.integrations.typescript_bridge import get_ts_bridge
+            await get_ts_bridge().close()
+        except Exception as e:
+            logger.warning(f"TypeScript bridge cleanup error: {e}")
+
+        # 关闭缠论图表渲染进程池
+        try:
+            chanlun_router.shutdown_chart_executor()
+        except Exception as e:
+            logger.warning(f"Chanlun chart executor cleanup error: {e}")
+
         await close_db()
         logger.info("TradingAgents FastAPI backend stopped")
 
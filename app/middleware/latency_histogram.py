@@ -0,0 +1,75 @@
+"""
+请求延迟直方图
+
+性能监控中间件共用的分位数统计结构
+"""
+import bisect
+import itertools
+import math
+from array import array
+from typing import List, Sequence
+
+# 直方图的记录上限（毫秒），超出按上限计
+HISTOGRAM_MAX_MS = 60000
+
+
+class LatencyHistogram:
+    """
+    延迟直方图（HDR 风格的对数-线性分桶）
+
+    以微秒为单位：128µs 以内逐微秒计数，之后每个 2 的幂区间
+    划分为 64 个等宽子桶（相对误差 < 1%）。0–60s 共约 1.3k 个桶，计数存放在
+    array('I') 中（约 5KB）；记录为 O(1)，查询为一次前缀和 + 二分，不保存样本、不排序
+    """
+
+    _SUB_BUCKET_BITS = 7
+    _SUB_BUCKETS = 1 << _SUB_BUCKET_BITS
+    _HALF = _SUB_BUCKETS >> 1
+
+    def __init__(self, max_ms: float = HISTOGRAM_MAX_MS):
+        self._max_us = int(max_ms * 1000)
+        self.counts = array("I", bytes(4 * (self._index(self._max_us) + 1)))
+        self.total = 0
+
+    @classmethod
+    def _index(cls, value_us: int) -> int:
+        shift = value_us.bit_length() - cls._SUB_BUCKET_BITS
+        if shift <= 0:
+            return value_us
+        return shift * cls._HALF + (value_us >> shift)
+
+    @classmethod
+    def _value_at(cls, index: int) -> float:
+        """桶的代表值（桶区间中点，微秒）"""
+        if index < cls._SUB_BUCKETS:
+            return float(index)
+        shift = (index - cls._SUB_BUCKETS) // cls._HALF + 1
+        low = (index - shift * cls._HALF) << shift
+        return low + ((1 << shift) - 1) / 2
+
+    def record(self, value_ms: float):
+        """记录一个样本（毫秒）"""
+        value_us = min(int(value_ms * 1000), self._max_us)
+        self.counts[self._index(max(value_us, 0))] += 1
+        self.total += 1
+
+    def percentile(self, p: float) -> float:
+        """返回第 p 百分位数（毫秒），无样本时返回 0.0"""
+        return self.percentiles((p,))[0]
+
+    def percentiles(self, ps: Sequence[float]) -> List[float]:
+        """一次计算多个百分位数（毫秒），无样本时均为 0.0"""
+        if self.total == 0:
+            return [0.0] * len(ps)
+
+        cumulative = list(itertools.accumulate(self.counts))
+        results = []
+        for p in ps:
+            target = max(1, math.ceil(self.total * min(max(p, 0.0), 100.0) / 100))
+            results.append(self._value_at(bisect.bisect_left(cumulative, target)) / 1000)
+        return results
+
+    def reset(self):
+        """清空所有样本"""
+        self.counts = array("I", bytes(4 * len(self.counts)))
+        self.total = 0
@@ -4,10 +4,12 @@
 """
 import time
 import logging
-from typing import Callable, Dict, Any
+import threading
+from typing import Callable, Dict, Any, Optional, Tuple
 from fastapi import Request, Response
 from starlette.middleware.base import BaseHTTPMiddleware
-import json
+
+from .latency_histogram import LatencyHistogram
 
 logger = logging.getLogger(__name__)
 
@@ -15,14 +17,25 @@ logger = logging.getLogger(__name__)
 SLOW_QUERY_THRESHOLD = 1000  # 1秒
 VERY_SLOW_QUERY_THRESHOLD = 3000  # 3秒
 
-# 性能统计数据
-_performance_stats = {
-    "total_requests": 0,
-    "total_time": 0.0,
-    "slow_queries": 0,
-    "very_slow_queries": 0,
-    "errors": 0
-}
+# 阈值的纳秒表示，计时全程使用整数纳秒
+_SLOW_QUERY_THRESHOLD_NS = SLOW_QUERY_THRESHOLD * 1_000_000
+_VERY_SLOW_QUERY_THRESHOLD_NS = VERY_SLOW_QUERY_THRESHOLD * 1_000_000
+
+
+def _empty_stats() -> Dict[str, int]:
+    return {
+        "total_requests": 0,
+        "total_time_ns": 0,
+        "slow_queries": 0,
+        "very_slow_queries": 0,
+        "errors": 0
+    }
+
+
+# 性能统计数据（处理器可能运行在线程池中，更新时需持有锁）
+_performance_stats = _empty_stats()
+_latency_histogram = LatencyHistogram()
+_stats_lock = threading.Lock()
 
 
 class PerformanceMonitorMiddleware(BaseHTTPMiddleware):
@@ -36,38 +49,55 @@ class PerformanceMonitorMiddleware(BaseHTTPMiddleware):
     4. 添加性能响应头
     """
 
+    # 跳过监控的路径前缀（健康检查、指标、静态资源等高频低价值请求）
+    _SKIP_PREFIXES = ("/health", "/livez", "/readyz", "/metrics", "/static/", "/favicon.ico")
+
+    def __init__(self, app, skip_prefixes: Optional[Tuple[str, ...]] = None):
+        super().__init__(app)
+        self.skip_prefixes = tuple(skip_prefixes) if skip_prefixes is not None else self._SKIP_PREFIXES
+
     async def dispatch(self, request: Request, call_next: Callable) -> Response:
         """处理请求并记录性能数据"""
-        # 记录开始时间
-        start_time = time.time()
+        if request.url.path.startswith(self.skip_prefixes):
+            return await call_next(request)
+
+        # 记录开始时间（单调时钟，整数纳秒）
+        start = time.perf_counter_ns()
 
         # 调用下一个中间件
         response = await call_next(request)
 
         # 计算处理时间
-        process_time = (time.time() - start_time) * 1000  # 毫秒
+        process_time_ns = time.perf_counter_ns() - start
+        is_slow = process_time_ns > _SLOW_QUERY_THRESHOLD_NS
+        is_error = response.status_code >= 400
 
         # 更新统计数据
-        _performance_stats["total_requests"] += 1
-        _performance_stats["total_time"] += process_time
-        if process_time > SLOW_QUERY_THRESHOLD:
-            _performance_stats["slow_queries"] += 1
-        if process_time > VERY_SLOW_QUERY_THRESHOLD:
-            _performance_stats["very_slow_queries"] += 1
-
-        # 添加性能响应头
+        with _stats_lock:
+            stats = _performance_stats
+            stats["total_requests"] += 1
+            stats["total_time_ns"] += process_time_ns
+            _latency_histogram.record(process_time_ns / 1_000_000)
+            if is_slow:
+                stats["slow_queries"] += 1
+                if process_time_ns > _VERY_SLOW_QUERY_THRESHOLD_NS:
+                    stats["very_slow_queries"] += 1
+            if is_error:
+                stats["errors"] += 1
+
+        # 添加性能响应头（仅在此处换算为毫秒）
+        process_time = process_time_ns / 1_000_000
         response.headers["X-Process-Time"] = f"{process_time:.2f}"
 
         # 记录慢查询
-        if process_time > SLOW_QUERY_THRESHOLD:
+        if is_slow:
             logger.warning(
                 f"慢查询检测: {request.method} {request.url.path} "
                 f"耗时 {process_time:.2f}ms > {SLOW_QUERY_THRESHOLD}ms"
             )
 
         # 记录错误
-        if response.status_code >= 400:
-            _performance_stats["errors"] += 1
+        if is_error:
             logger.error(
                 f"API错误: {request.method} {request.url.path} "
                 f"状态码 {response.status_code}"
@@ -78,34 +108,32 @@ class PerformanceMonitorMiddleware(BaseHTTPMiddleware):
     @classmethod
     def get_stats(cls) -> Dict[str, Any]:
         """获取性能统计数据"""
-        stats = _performance_stats.copy()
+        with _stats_lock:
+            stats = _performance_stats.copy()
+            has_samples = _latency_histogram.total > 0
+            p95_ms, p99_ms = _latency_histogram.percentiles((95, 99))
 
-        if stats["total_requests"] > 0:
-            avg_time = stats["total_time"] / stats["total_requests"]
-        else:
-            avg_time = 0
+        total = stats["total_requests"]
+        total_time_ms = stats["total_time_ns"] / 1_000_000
 
         return {
             **stats,
-            "avg_time_ms": avg_time,
-            "p95_time_ms": None,  # TODO: 实现百分位数
-            "p99_time_ms": None,  # TODO: 实现百分位数
-            "slow_query_rate": _performance_stats["slow_queries"] / stats["total_requests"] if stats["total_requests"] > 0 else 0,
-            "very_slow_query_rate": _performance_stats["very_slow_queries"] / stats["total_requests"] if stats["total_requests"] > 0 else 0,
-            "error_rate": _performance_stats["errors"] / stats["total_requests"] if stats["total_requests"] > 0 else 0
+            "total_time": total_time_ms,
+            "avg_time_ms": total_time_ms / total if total > 0 else 0,
+            "p95_time_ms": p95_ms if has_samples else None,
+            "p99_time_ms": p99_ms if has_samples else None,
+            "slow_query_rate": stats["slow_queries"] / total if total > 0 else 0,
+            "very_slow_query_rate": stats["very_slow_queries"] / total if total > 0 else 0,
+            "error_rate": stats["errors"] / total if total > 0 else 0
         }
 
     @classmethod
     def reset_stats(cls):
         """重置统计数据"""
         global _performance_stats
-        _performance_stats = {
-            "total_requests": 0,
-            "total_time": 0.0,
-            "slow_queries": 0,
-            "very_slow_queries": 0,
-            "errors": 0
-        }
+        with _stats_lock:
+            _performance_stats = _empty_stats()
+            _latency_histogram.reset()
 
 
 def get_performance_stats() -> Dict[str, Any]:
@@ -9,17 +9,22 @@ Phase 3-07: Performance Monitoring Dashboard - Enhanced Monitor
 - 时间序列数据存储
 - 实时指标导出
 """
+import heapq
+import io
 import time
 import logging
-from typing import Callable, Dict, Any, List, Optional
+from array import array
+from typing import Dict, Any, List, Optional, Sequence, Tuple
 from collections import defaultdict, deque
-from datetime import datetime, timedelta
+from datetime import datetime
 from dataclasses import dataclass, field
 from enum import Enum
+from operator import attrgetter
 import asyncio
 
-from fastapi import Request, Response
-from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from .latency_histogram import LatencyHistogram
 
 logger = logging.getLogger(__name__)
 
@@ -27,12 +32,19 @@ logger = logging.getLogger(__name__)
 SLOW_QUERY_THRESHOLD = 1000  # 1秒
 VERY_SLOW_QUERY_THRESHOLD = 3000  # 3秒
 
-# 百分位数计算窗口大小
-PERCENTILE_WINDOW_SIZE = 1000
+# 未匹配任何路由的请求统一使用的端点路径
+UNMATCHED_ROUTE = "<unmatched>"
+
+# 状态码计数数组长度（覆盖 0-599）
+HTTP_STATUS_LIMIT = 600
 
 # 时间序列保留时长
 TIMESERIES_RETENTION_HOURS = 24
 
+# 待聚合请求队列上限（超出时丢弃最旧记录）与后台聚合间隔（秒）
+RECORD_QUEUE_MAXLEN = 100000
+RECORD_DRAIN_INTERVAL = 0.1
+
 
 class MetricType(Enum):
     """指标类型"""
@@ -49,7 +61,7 @@ class MetricValue:
     labels: Dict[str, str] = field(default_factory=dict)
 
 
-@dataclass
+@dataclass(slots=True)
 class EndpointStats:
     """端点统计"""
     path: str
@@ -59,8 +71,17 @@ class EndpointStats:
     error_count: int = 0
     slow_count: int = 0
     very_slow_count: int = 0
-    response_times: deque = field(default_factory=lambda: deque(maxlen=PERCENTILE_WINDOW_SIZE))
-    status_codes: Dict[int, int] = field(default_factory=dict)
+    histogram: LatencyHistogram = field(default_factory=LatencyHistogram)
+    # 按状态码下标计数（HTTP 状态码范围 100-599）
+    status_counts: array = field(default_factory=lambda: array("I", bytes(4 * HTTP_STATUS_LIMIT)))
+    # to_dict() 结果缓存，add_request 时失效
+    _dict_cache: Optional[Dict[str, Any]] = field(default=None, init=False, repr=False, compare=False)
+    _dirty: bool = field(default=True, init=False, repr=False, compare=False)
+
+    @property
+    def status_codes(self) -> Dict[int, int]:
+        """非零的状态码计数"""
+        return {code: n for code, n in enumerate(self.status_counts) if n}
 
     @property
     def avg_time(self) -> float:
@@ -76,9 +97,10 @@ class EndpointStats:
 
     def add_request(self, process_time: float, status_code: int):
         """添加请求记录"""
+        self._dirty = True
         self.request_count += 1
         self.total_time += process_time
-        self.response_times.append(process_time)
+        self.histogram.record(process_time)
 
         if status_code >= 400:
             self.error_count += 1
@@ -88,61 +110,47 @@ class EndpointStats:
         if process_time > VERY_SLOW_QUERY_THRESHOLD:
             self.very_slow_count += 1
 
-        self.status_codes[status_code] = self.status_codes.get(status_code, 0) + 1
+        if 0 <= status_code < HTTP_STATUS_LIMIT:
+            self.status_counts[status_code] += 1
 
     def get_percentile(self, p: float) -> float:
         """计算百分位数"""
-        if not self.response_times:
-            return 0.0
+        return self.histogram.percentiles((p,))[0]
 
-        sorted_times = sorted(self.response_times)
-        index = int(len(sorted_times) * p / 100)
-        return sorted_times[min(index, len(sorted_times) - 1)]
+    def get_percentiles(self, ps: Sequence[float]) -> List[float]:
+        """一次计算多个百分位数"""
+        return self.histogram.percentiles(ps)
 
     def to_dict(self) -> Dict[str, Any]:
-        """转换为字典"""
-        return {
+        """转换为字典（无新请求时复用上次结果）"""
+        if not self._dirty and self._dict_cache is not None:
+            return dict(self._dict_cache)
+
+        p50, p95, p99, p999 = self.get_percentiles((50, 95, 99, 99.9))
+        self._dict_cache = {
             "path": self.path,
             "method": self.method,
             "request_count": self.request_count,
             "avg_time_ms": self.avg_time,
-            "p50_ms": self.get_percentile(50),
-            "p95_ms": self.get_percentile(95),
-            "p99_ms": self.get_percentile(99),
-            "p99_9_ms": self.get_percentile(99.9),
+            "p50_ms": p50,
+            "p95_ms": p95,
+            "p99_ms": p99,
+            "p99_9_ms": p999,
             "error_rate": self.error_rate,
             "slow_rate": self.slow_rate,
             "status_codes": self.status_codes,
         }
+        self._dirty = False
+        return dict(self._dict_cache)
 
 
-class PercentileCalculator:
-    """百分位数计算器（使用近似算法）"""
-
-    def __init__(self, max_size: int = 10000):
-        self.max_size = max_size
-        self.values: List[float] = []
-
-    def add(self, value: float):
-        """添加值"""
-        self.values.append(value)
-        if len(self.values) > self.max_size:
-            # 随机采样以保持大小
-            import random
-            self.values = random.sample(self.values, self.max_size)
-
-    def get_percentile(self, p: float) -> float:
-        """获取百分位数"""
-        if not self.values:
-            return 0.0
-
-        sorted_values = sorted(self.values)
-        index = int(len(sorted_values) * p / 100)
-        return sorted_values[min(index, len(sorted_values) - 1)]
-
-    def clear(self):
-        """清空"""
-        self.values.clear()
+# 可直接按 EndpointStats 属性排序的 to_dict() 字段
+_ENDPOINT_SORT_ATTRS = {
+    "request_count": "request_count",
+    "avg_time_ms": "avg_time",
+    "error_rate": "error_rate",
+    "slow_rate": "slow_rate",
+}
 
 
 class EnhancedPerformanceMonitor:
@@ -157,86 +165,177 @@ class EnhancedPerformanceMonitor:
     5. 实时指标导出
     """
 
+    __slots__ = (
+        "total_requests",
+        "total_time",
+        "errors",
+        "slow_queries",
+        "very_slow_queries",
+        "_endpoints",
+        "_key_cache",
+        "_histogram",
+        "_timeseries",
+        "_start_monotonic",
+        "_last_snapshot",
+        "_queue",
+        "_drain_task",
+        "_lock",
+    )
+
     def __init__(self):
         # 全局统计
-        self._global = {
-            "total_requests": 0,
-            "total_time": 0.0,
-            "errors": 0,
-            "slow_queries": 0,
-            "very_slow_queries": 0,
-        }
+        self._reset_counters()
 
         # 端点统计
         self._endpoints: Dict[str, EndpointStats] = {}
+        self._key_cache: Dict[Tuple[str, str], str] = {}
 
-        # 百分位数计算器
-        self._percentile_calc = PercentileCalculator(max_size=10000)
+        # 全局延迟直方图（百分位数）
+        self._histogram = LatencyHistogram()
 
         # 时间序列数据（环形缓冲区）
         self._timeseries: deque = deque(maxlen=TIMESERIES_RETENTION_HOURS * 60)  # 每分钟一个点
 
-        # 开始时间
-        self._start_time = datetime.now()
+        # 开始时间（单调时钟，仅用于计算运行时长）
+        self._start_monotonic = time.monotonic()
+
+        # 待聚合的请求记录 (method, path, process_time, status_code)
+        self._queue: deque = deque(maxlen=RECORD_QUEUE_MAXLEN)
+        self._drain_task: Optional[asyncio.Task] = None
 
         # 锁
         self._lock = asyncio.Lock()
 
+    def _reset_counters(self):
+        """清零全局计数"""
+        self.total_requests = 0
+        self.total_time = 0.0
+        self.errors = 0
+        self.slow_queries = 0
+        self.very_slow_queries = 0
+        # 上次聚合时间序列时的 (请求数, 总耗时, 错误数)
+        self._last_snapshot: Tuple[int, float, int] = (0, 0.0, 0)
+
     def _make_endpoint_key(self, method: str, path: str) -> str:
-        """生成端点键"""
-        return f"{method}:{path}"
+        """生成端点键（按 (method, path) 缓存，路由集合有限）"""
+        key = self._key_cache.get((method, path))
+        if key is None:
+            key = self._key_cache[(method, path)] = f"{method}:{path}"
+        return key
 
-    async def record_request(
+    def record_request(
         self,
         method: str,
         path: str,
         process_time: float,
         status_code: int,
     ):
-        """记录请求"""
-        async with self._lock:
-            # 更新全局统计
-            self._global["total_requests"] += 1
-            self._global["total_time"] += process_time
-            self._percentile_calc.add(process_time)
-
-            if status_code >= 400:
-                self._global["errors"] += 1
-            if process_time > SLOW_QUERY_THRESHOLD:
-                self._global["slow_queries"] += 1
-            if process_time > VERY_SLOW_QUERY_THRESHOLD:
-                self._global["very_slow_queries"] += 1
+        """
+        记录请求
+
+        事件循环单线程且函数内无 await，计数更新不会被其他协程打断，无需加锁
+        """
+        self._apply_batch([(method, path, process_time, status_code)])
+
+    def enqueue_request(
+        self,
+        method: str,
+        path: str,
+        process_time: float,
+        status_code: int,
+    ):
+        """
+        将请求记录放入队列，由后台任务批量聚合
 
+        请求路径上只做一次 O(1) 追加，需在事件循环中调用
+        """
+        self._queue.append((method, path, process_time, status_code))
+        if self._drain_task is None or self._drain_task.done():
+            self._drain_task = asyncio.create_task(self._drain_loop())
+
+    async def _drain_loop(self):
+        """队列聚合循环"""
+        while True:
+            try:
+                await asyncio.sleep(RECORD_DRAIN_INTERVAL)
+                self._drain()
+            except asyncio.CancelledError:
+                break
+            except Exception as e:
+                logger.error(f"Error in drain loop: {e}")
+
+    def _drain(self):
+        """聚合队列中的全部记录"""
+        if not self._queue:
+            return
+        batch = list(self._queue)
+        self._queue.clear()
+        self._apply_batch(batch)
+
+    def _apply_batch(self, batch: List[Tuple[str, str, float, int]]):
+        """批量更新统计，同一端点的记录只查找一次"""
+        grouped: Dict[Tuple[str, str], List[Tuple[float, int]]] = defaultdict(list)
+        for method, path, process_time, status_code in batch:
+            grouped[(method, path)].append((process_time, status_code))
+
+        errors = slow = very_slow = 0
+        batch_time = 0.0
+        histogram_record = self._histogram.record
+        for (method, path), records in grouped.items():
             # 更新端点统计
             key = self._make_endpoint_key(method, path)
-            if key not in self._endpoints:
-                self._endpoints[key] = EndpointStats(
+            endpoint = self._endpoints.get(key)
+            if endpoint is None:
+                endpoint = self._endpoints[key] = EndpointStats(
                     path=path,
                     method=method,
                 )
 
-            self._endpoints[key].add_request(process_time, status_code)
+            for process_time, status_code in records:
+                endpoint.add_request(process_time, status_code)
+                histogram_record(process_time)
+                batch_time += process_time
+
+                if status_code >= 400:
+                    errors += 1
+                if process_time > SLOW_QUERY_THRESHOLD:
+                    slow += 1
+                if process_time > VERY_SLOW_QUERY_THRESHOLD:
+                    very_slow += 1
+
+        # 更新全局统计
+        self.total_requests += len(batch)
+        self.total_time += batch_time
+        self.errors += errors
+        self.slow_queries += slow
+        self.very_slow_queries += very_slow
 
     async def get_global_stats(self) -> Dict[str, Any]:
         """获取全局统计"""
         async with self._lock:
-            total = self._global["total_requests"]
+            self._drain()
+            total = self.total_requests
+            errors = self.errors
+            slow = self.slow_queries
+            very_slow = self.very_slow_queries
+            p50, p95, p99, p999 = self._histogram.percentiles((50, 95, 99, 99.9))
+            uptime = time.monotonic() - self._start_monotonic
 
             return {
-                "uptime_seconds": (datetime.now() - self._start_time).total_seconds(),
+                "uptime_seconds": uptime,
                 "total_requests": total,
-                "avg_time_ms": self._global["total_time"] / total if total > 0 else 0,
-                "p50_ms": self._percentile_calc.get_percentile(50),
-                "p95_ms": self._percentile_calc.get_percentile(95),
-                "p99_ms": self._percentile_calc.get_percentile(99),
-                "p99_9_ms": self._percentile_calc.get_percentile(99.9),
-                "errors": self._global["errors"],
-                "error_rate": self._global["errors"] / total if total > 0 else 0,
-                "slow_queries": self._global["slow_queries"],
-                "slow_query_rate": self._global["slow_queries"] / total if total > 0 else 0,
-                "very_slow_queries": self._global["very_slow_queries"],
-                "very_slow_query_rate": self._global["very_slow_queries"] / total if total > 0 else 0,
-                "requests_per_second": total / (datetime.now() - self._start_time).total_seconds() if total > 0 else 0,
+                "avg_time_ms": self.total_time / total if total > 0 else 0,
+                "p50_ms": p50,
+                "p95_ms": p95,
+                "p99_ms": p99,
+                "p99_9_ms": p999,
+                "errors": errors,
+                "error_rate": errors / total if total > 0 else 0,
+                "slow_queries": slow,
+                "slow_query_rate": slow / total if total > 0 else 0,
+                "very_slow_queries": very_slow,
+                "very_slow_query_rate": very_slow / total if total > 0 else 0,
+                "requests_per_second": total / uptime if total > 0 else 0,
             }
 
     async def get_endpoint_stats(
@@ -247,30 +346,30 @@ class EnhancedPerformanceMonitor:
     ) -> List[Dict[str, Any]]:
         """获取端点统计"""
         async with self._lock:
-            stats = [
-                ep.to_dict() for ep in self._endpoints.values()
+            self._drain()
+            endpoints = [
+                ep for ep in self._endpoints.values()
                 if path_filter is None or path_filter in ep.path
             ]
 
             # 排序
             reverse = sort_by != "avg_time_ms"  # 时间升序，其他降序
-            stats.sort(key=lambda x: x.get(sort_by, 0), reverse=reverse)
+            attr = _ENDPOINT_SORT_ATTRS.get(sort_by)
+            if attr is None:
+                stats = [ep.to_dict() for ep in endpoints]
+                stats.sort(key=lambda x: x.get(sort_by, 0), reverse=reverse)
+                return stats[:limit]
 
-            return stats[:limit]
+            # 按属性取前 limit 个，只序列化入选的端点
+            select = heapq.nlargest if reverse else heapq.nsmallest
+            return [ep.to_dict() for ep in select(limit, endpoints, key=attrgetter(attr))]
 
     async def get_slowest_endpoints(self, limit: int = 10) -> List[Dict[str, Any]]:
         """获取最慢的端点"""
         async with self._lock:
-            stats = [
-                {
-                    **ep.to_dict(),
-                    "avg_time_ms": ep.avg_time,
-                }
-                for ep in self._endpoints.values()
-            ]
-
-            stats.sort(key=lambda x: x["avg_time_ms"], reverse=True)
-            return stats[:limit]
+            self._drain()
+            top = heapq.nlargest(limit, self._endpoints.values(), key=attrgetter("avg_time"))
+            return [ep.to_dict() for ep in top]
 
     async def get_top_endpoints(self, limit: int = 10) -> List[Dict[str, Any]]:
         """获取请求量最高的端点"""
@@ -279,13 +378,13 @@ class EnhancedPerformanceMonitor:
     async def get_error_endpoints(self, limit: int = 10) -> List[Dict[str, Any]]:
         """获取错误率最高的端点"""
         async with self._lock:
-            stats = [
-                ep.to_dict() for ep in self._endpoints.values()
-                if ep.error_count > 0
-            ]
-
-            stats.sort(key=lambda x: x["error_rate"], reverse=True)
-            return stats[:limit]
+            self._drain()
+            top = heapq.nlargest(
+                limit,
+                (ep for ep in self._endpoints.values() if ep.error_count > 0),
+                key=attrgetter("error_rate"),
+            )
+            return [ep.to_dict() for ep in top]
 
     async def get_timeseries(
         self,
@@ -293,12 +392,11 @@ class EnhancedPerformanceMonitor:
     ) -> List[Dict[str, Any]]:
         """获取时间序列数据"""
         async with self._lock:
-            now = datetime.now()
-            cutoff = now - timedelta(minutes=minutes)
+            cutoff = time.time() - minutes * 60
 
             return [
                 {
-                    "timestamp": ts["timestamp"].isoformat(),
+                    "timestamp": datetime.fromtimestamp(ts["timestamp"]).isoformat(),
                     "requests": ts["requests"],
                     "avg_time_ms": ts["avg_time"],
                     "errors": ts["errors"],
@@ -308,74 +406,113 @@ class EnhancedPerformanceMonitor:
             ]
 
     async def aggregate_timeseries(self):
-        """聚合时间序列数据（每分钟调用一次）"""
+        """聚合时间序列数据（每分钟调用一次，记录本周期的增量）"""
         async with self._lock:
-            if self._global["total_requests"] == 0:
+            self._drain()
+            if self.total_requests == 0:
                 return
 
+            last_requests, last_time, last_errors = self._last_snapshot
+            requests = self.total_requests - last_requests
             self._timeseries.append({
-                "timestamp": datetime.now(),
-                "requests": self._global["total_requests"],
-                "avg_time": self._global["total_time"] / self._global["total_requests"],
-                "errors": self._global["errors"],
+                "timestamp": time.time(),
+                "requests": requests,
+                "avg_time": (self.total_time - last_time) / requests if requests else 0.0,
+                "errors": self.errors - last_errors,
             })
+            self._last_snapshot = (self.total_requests, self.total_time, self.errors)
 
     async def reset_stats(self):
         """重置统计"""
         async with self._lock:
-            self._global = {
-                "total_requests": 0,
-                "total_time": 0.0,
-                "errors": 0,
-                "slow_queries": 0,
-                "very_slow_queries": 0,
-            }
+            self._queue.clear()
+            self._reset_counters()
             self._endpoints.clear()
-            self._percentile_calc.clear()
-            self._start_time = datetime.now()
+            self._histogram.reset()
+            self._start_monotonic = time.monotonic()
 
     async def get_prometheus_metrics(self) -> str:
-        """导出 Prometheus 格式指标"""
-        global_stats = await self.get_global_stats()
-        endpoint_stats = await self.get_endpoint_stats(limit=100)
-
-        lines = [
-            "# HELP http_requests_total Total number of HTTP requests",
-            "# TYPE http_requests_total counter",
-            f"http_requests_total {global_stats['total_requests']}",
-            "",
-            "# HELP http_request_duration_seconds HTTP request duration",
-            "# TYPE http_request_duration_seconds histogram",
-            f"http_request_duration_seconds_avg {global_stats['avg_time_ms'] / 1000}",
-            f"http_request_duration_seconds_p50 {global_stats['p50_ms'] / 1000}",
-            f"http_request_duration_seconds_p95 {global_stats['p95_ms'] / 1000}",
-            f"http_request_duration_seconds_p99 {global_stats['p99_ms'] / 1000}",
-            "",
-            "# HELP http_errors_total Total number of HTTP errors",
-            "# TYPE http_errors_total counter",
-            f"http_errors_total {global_stats['errors']}",
-        ]
-
-        # 端点指标
-        for ep in endpoint_stats:
-            labels = f'method="{ep["method"]}",path="{ep["path"]}"'
-            lines.extend([
-                f'http_endpoint_requests_total{{{labels}}} {ep["request_count"]}',
-                f'http_endpoint_duration_seconds_avg{{{labels}}} {ep["avg_time_ms"] / 1000}',
-                f'http_endpoint_errors_total{{{labels}}} {ep.get("error_count", 0)}',
-            ])
-
-        return "\n".join(lines)
-
-
-class PerformanceMonitorMiddleware(BaseHTTPMiddleware):
+        """
+        导出 Prometheus 格式指标
+
+        直接读取计数与 EndpointStats 属性写入缓冲区，不经过 to_dict()
+        """
+        async with self._lock:
+            self._drain()
+            total = self.total_requests
+            p50, p95, p99 = self._histogram.percentiles((50, 95, 99))
+
+            buf = io.StringIO()
+            write = buf.write
+            write(
+                "# HELP http_requests_total Total number of HTTP requests\n"
+                "# TYPE http_requests_total counter\n"
+                f"http_requests_total {total}\n"
+                "\n"
+                "# HELP http_request_duration_seconds HTTP request duration\n"
+                "# TYPE http_request_duration_seconds summary\n"
+                f'http_request_duration_seconds{{quantile="0.5"}} {p50 / 1000}\n'
+                f'http_request_duration_seconds{{quantile="0.95"}} {p95 / 1000}\n'
+                f'http_request_duration_seconds{{quantile="0.99"}} {p99 / 1000}\n'
+                f"http_request_duration_seconds_sum {self.total_time / 1000}\n"
+                f"http_request_duration_seconds_count {total}\n"
+                "\n"
+                "# HELP http_errors_total Total number of HTTP errors\n"
+                "# TYPE http_errors_total counter\n"
+                f"http_errors_total {self.errors}\n"
+            )
+
+            # 端点指标（请求量最高的 100 个，按路由模板标记）；同一指标的样本需连续输出
+            top = heapq.nlargest(100, self._endpoints.values(), key=attrgetter("request_count"))
+            labels = [f'method="{ep.method}",path="{ep.path}"' for ep in top]
+
+            write(
+                "\n# HELP http_endpoint_requests_total HTTP requests per route and status\n"
+                "# TYPE http_endpoint_requests_total counter\n"
+            )
+            for ep, label in zip(top, labels):
+                for code, n in ep.status_codes.items():
+                    write(f'http_endpoint_requests_total{{{label},status="{code}"}} {n}\n')
+
+            write(
+                "\n# HELP http_endpoint_duration_seconds_avg Average HTTP request duration per route\n"
+                "# TYPE http_endpoint_duration_seconds_avg gauge\n"
+            )
+            for ep, label in zip(top, labels):
+                write(f"http_endpoint_duration_seconds_avg{{{label}}} {ep.avg_time / 1000}\n")
+
+            write(
+                "\n# HELP http_endpoint_errors_total HTTP error responses per route\n"
+                "# TYPE http_endpoint_errors_total counter\n"
+            )
+            for ep, label in zip(top, labels):
+                write(f"http_endpoint_errors_total{{{label}}} {ep.error_count}\n")
+
+            return buf.getvalue()
+
+
+class PerformanceMonitorMiddleware:
     """
     性能监控中间件（增强版）
+
+    纯 ASGI 实现：包装 send 在 http.response.start 时取状态码并写入
+    X-Process-Time 响应头，不构造 Request/Response，避免 BaseHTTPMiddleware
+    的 call_next 开销
     """
 
-    def __init__(self, app, monitor: Optional[EnhancedPerformanceMonitor] = None):
-        super().__init__(app)
-        self.monitor = monitor or EnhancedPerformanceMonitor()
+    # 跳过监控的路径前缀（健康检查、指标、静态资源等高频低价值请求）
+    _SKIP_PREFIXES = ("/health", "/livez", "/readyz", "/metrics", "/static/", "/favicon.ico")
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        monitor: Optional[EnhancedPerformanceMonitor] = None,
+        skip_prefixes: Optional[Tuple[str, ...]] = None,
+    ):
+        self.app = app
+        self.skip_prefixes = tuple(skip_prefixes) if skip_prefixes is not None else self._SKIP_PREFIXES
+        # 默认写入全局监控实例，/api/monitoring 下的统计与 /metrics 导出读取的正是它
+        self.monitor = monitor or get_performance_monitor()
 
         # 启动时间序列聚合任务
         asyncio.create_task(self._aggregate_loop())
@@ -391,31 +528,52 @@ class PerformanceMonitorMiddleware(BaseHTTPMiddleware):
             except Exception as e:
                 logger.error(f"Error in aggregate loop: {e}")
 
-    async def dispatch(self, request: Request, call_next: Callable) -> Response:
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
         """处理请求并记录性能数据"""
-        start_time = time.time()
-        response = await call_next(request)
-        process_time = (time.time() - start_time) * 1000  # 毫秒
-
-        # 记录请求
-        await self.monitor.record_request(
-            method=request.method,
-            path=request.url.path,
-            process_time=process_time,
-            status_code=response.status_code,
-        )
-
-        # 添加性能响应头
-        response.headers["X-Process-Time"] = f"{process_time:.2f}"
-
-        # 记录慢查询
-        if process_time > SLOW_QUERY_THRESHOLD:
-            logger.warning(
-                f"慢查询检测: {request.method} {request.url.path} "
-                f"耗时 {process_time:.2f}ms > {SLOW_QUERY_THRESHOLD}ms"
-            )
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        # 跳过的路径不计时、不加响应头，也不进入统计
+        if scope["path"].startswith(self.skip_prefixes):
+            await self.app(scope, receive, send)
+            return
+
+        start_time = time.perf_counter()
+        method = scope["method"]
+
+        async def send_wrapper(message: Message):
+            if message["type"] == "http.response.start":
+                process_time = (time.perf_counter() - start_time) * 1000  # 毫秒
+
+                # 路由匹配后使用路径模板（如 /users/{id}），避免路径参数导致端点数膨胀；
+                # 未匹配路由的请求（404、扫描器等）归入同一个端点，防止统计无界增长
+                route = scope.get("route")
+                path = getattr(route, "path", None) or UNMATCHED_ROUTE
+
+                # 添加性能响应头
+                headers = list(message.get("headers", []))
+                headers.append((b"x-process-time", f"{process_time:.2f}".encode("latin-1")))
+                message["headers"] = headers
+
+                # 记录请求（仅入队，由后台任务聚合）
+                self.monitor.enqueue_request(
+                    method=method,
+                    path=path,
+                    process_time=process_time,
+                    status_code=message["status"],
+                )
+
+                # 记录慢查询
+                if process_time > SLOW_QUERY_THRESHOLD:
+                    logger.warning(
+                        f"慢查询检测: {method} {scope['path']} "
+                        f"耗时 {process_time:.2f}ms > {SLOW_QUERY_THRESHOLD}ms"
+                    )
+
+            await send(message)
 
-        return response
+        await self.app(scope, receive, send_wrapper)
 
 
 # 全局监控实例
@@ -6,16 +6,16 @@ All repositories should inherit from these base classes.
 """
 
 from abc import ABC, abstractmethod
-from typing import Generic, TypeVar, Optional, List, Dict, Any
+from typing import AsyncIterator, Generic, TypeVar, Optional, List, Dict, Any
 from dataclasses import dataclass
 from datetime import datetime
 import logging
 
 from motor.motor_asyncio import AsyncIOMotorClient
-from pymongo import MongoClient
 from bson import ObjectId
+from pymongo import InsertOne, UpdateOne
 
-from app.core.database import get_mongo_db
+from app.core.database import get_mongo_db, get_mongo_db_sync
 
 
 T = TypeVar('T')
@@ -100,6 +100,10 @@ class Repository(ABC, Generic[T]):
         Returns:
             Entity or None if not found
         """
+        # Malformed ids (e.g. from URLs) are a plain miss, not an error
+        if not ObjectId.is_valid(id):
+            return None
+
         try:
             document = await self.collection.find_one({'_id': ObjectId(id)})
             if document:
@@ -128,37 +132,81 @@ class Repository(ABC, Generic[T]):
             self._logger.error(f'Failed to find one: {e}')
             raise
 
+    def _find_cursor(
+        self,
+        filters: Optional[Dict[str, Any]] = None,
+        skip: int = 0,
+        limit: int = 0,
+        sort: Optional[List[tuple]] = None,
+        projection: Optional[Dict[str, int]] = None,
+    ):
+        """Build a find cursor with skip/limit/sort/projection applied"""
+        cursor = self.collection.find(filters or {}, projection=projection)
+
+        if skip:
+            cursor = cursor.skip(skip)
+        if limit:
+            cursor = cursor.limit(limit)
+        if sort:
+            cursor = cursor.sort(sort)
+        return cursor
+
     async def find(
         self,
         filters: Optional[Dict[str, Any]] = None,
         skip: int = 0,
         limit: int = 0,
         sort: Optional[List[tuple]] = None,
+        projection: Optional[Dict[str, int]] = None,
     ) -> List[T]:
         """
         Find entities by filters.
 
+        Documents are converted as they arrive from the cursor rather than
+        materialized into a list first.
+
         Args:
             filters: Filter criteria
             skip: Number of documents to skip
             limit: Maximum number of documents to return
             sort: Sort specification [(field, direction), ...]
+            projection: Fields to return from the server
 
         Returns:
             List of entities
         """
         try:
-            cursor = self.collection.find(filters or {})
+            cursor = self._find_cursor(filters, skip, limit, sort, projection)
+            return [self._to_entity(doc) async for doc in cursor]
+        except Exception as e:
+            self._logger.error(f'Failed to find: {e}')
+            raise
+
+    async def find_iter(
+        self,
+        filters: Optional[Dict[str, Any]] = None,
+        skip: int = 0,
+        limit: int = 0,
+        sort: Optional[List[tuple]] = None,
+        projection: Optional[Dict[str, int]] = None,
+    ) -> AsyncIterator[T]:
+        """
+        Stream entities by filters, one cursor batch in memory at a time.
 
-            if skip:
-                cursor = cursor.skip(skip)
-            if limit:
-                cursor = cursor.limit(limit)
-            if sort:
-                cursor = cursor.sort(sort)
+        Args:
+            filters: Filter criteria
+            skip: Number of documents to skip
+            limit: Maximum number of documents to return
+            sort: Sort specification [(field, direction), ...]
+            projection: Fields to return from the server
 
-            documents = await cursor.to_list(length=None)
-            return [self._to_entity(doc) for doc in documents]
+        Yields:
+            Entities
+        """
+        try:
+            cursor = self._find_cursor(filters, skip, limit, sort, projection)
+            async for doc in cursor:
+                yield self._to_entity(doc)
         except Exception as e:
             self._logger.error(f'Failed to find: {e}')
             raise
@@ -182,24 +230,28 @@ class Repository(ABC, Generic[T]):
         filters = filters or {}
 
         try:
-            # Get total count
-            total = await self.collection.count_documents(filters)
-
             # Calculate pagination
             skip = (params.page - 1) * params.page_size
 
-            # Build sort specification
-            sort = None
+            # Count and fetch the page in one round-trip
+            pipeline: List[Dict[str, Any]] = [{'$match': filters}]
             if params.sort_by:
-                sort = [(params.sort_by, params.sort_order)]
-
-            # Get items
-            items = await self.find(
-                filters=filters,
-                skip=skip,
-                limit=params.page_size,
-                sort=sort,
-            )
+                pipeline.append({'$sort': {params.sort_by: params.sort_order}})
+
+            page_stages: List[Dict[str, Any]] = [{'$skip': skip}]
+            if params.page_size:
+                page_stages.append({'$limit': params.page_size})
+            pipeline.append({
+                '$facet': {
+                    'items': page_stages,
+                    'total': [{'$count': 'n'}],
+                },
+            })
+
+            result = await self.collection.aggregate(pipeline).to_list(length=1)
+            facet = result[0] if result else {'items': [], 'total': []}
+            total = facet['total'][0]['n'] if facet['total'] else 0
+            items = [self._to_entity(doc) for doc in facet['items']]
 
             return PaginatedResult(
                 items=items,
@@ -251,6 +303,47 @@ class Repository(ABC, Generic[T]):
                 self._logger.error(f'Failed to insert entity: {e}')
                 raise
 
+    async def save_many(self, entities: List[T]) -> List[T]:
+        """
+        Save entities (insert or update) in a single bulk write.
+
+        Args:
+            entities: Entities to save
+
+        Returns:
+            Saved entities, in input order
+        """
+        if not entities:
+            return []
+
+        now = datetime.utcnow()
+        ops = []
+        inserted: List[tuple] = []  # (position, document)
+        for i, entity in enumerate(entities):
+            document = self._to_document(entity)
+            entity_id = document.get('id')
+            if entity_id:
+                document['updated_at'] = now
+                ops.append(UpdateOne({'_id': ObjectId(entity_id)}, {'$set': document}))
+            else:
+                document['created_at'] = now
+                document['updated_at'] = now
+                ops.append(InsertOne(document))
+                inserted.append((i, document))
+
+        try:
+            await self.collection.bulk_write(ops, ordered=False)
+        except Exception as e:
+            self._logger.error(f'Failed to bulk save {len(ops)} entities: {e}')
+            raise
+
+        # InsertOne fills in _id on the document it was given
+        saved = list(entities)
+        for i, document in inserted:
+            document['id'] = str(document['_id'])
+            saved[i] = self._to_entity(document)
+        return saved
+
     async def delete(self, id: str) -> bool:
         """
         Delete entity by ID.
@@ -261,6 +354,9 @@ class Repository(ABC, Generic[T]):
         Returns:
             True if deleted, False if not found
         """
+        if not ObjectId.is_valid(id):
+            return False
+
         try:
             result = await self.collection.delete_one({'_id': ObjectId(id)})
             return result.deleted_count > 0
@@ -294,7 +390,13 @@ class Repository(ABC, Generic[T]):
         Returns:
             True if exists, False otherwise
         """
-        return await self.count(filters) > 0
+        try:
+            # Stop at the first match instead of counting them all
+            document = await self.collection.find_one(filters, projection={'_id': 1})
+            return document is not None
+        except Exception as e:
+            self._logger.error(f'Failed to check existence: {e}')
+            raise
 
     async def aggregate(self, pipeline: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
         """
@@ -308,7 +410,7 @@ class Repository(ABC, Generic[T]):
         """
         try:
             cursor = self.collection.aggregate(pipeline)
-            return await cursor.to_list(length=None)
+            return [doc async for doc in cursor]
         except Exception as e:
             self._logger.error(f'Failed to aggregate: {e}')
             raise
@@ -333,10 +435,9 @@ class SyncRepository(ABC, Generic[T]):
 
     @property
     def collection(self):
-        """Get MongoDB collection (sync)"""
-        # Use synchronous MongoDB client
-        client = MongoClient('mongodb://localhost:27017')
-        return client['tradingagents'][self.collection_name]
+        """Get MongoDB collection (sync, shared client)"""
+        db = get_mongo_db_sync()
+        return db[self.collection_name]
 
     @abstractmethod
     def _to_entity(self, document: Dict[str, Any]) -> T:
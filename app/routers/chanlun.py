@@ -9,20 +9,36 @@
 - K 线图表数据
 """
 
-from fastapi import APIRouter, HTTPException, Query
-from typing import Optional, List, Dict, Any
-from datetime import datetime, timedelta
+from fastapi import APIRouter, HTTPException, Query, Response
+from typing import Optional, List, Dict, Any, Callable, TypeVar
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from datetime import date, timedelta
+from functools import lru_cache
+from operator import attrgetter
+import asyncio
+import base64
+import copy
+import io
+import itertools
+import multiprocessing
+import pickle
 import sys
+import threading
+import weakref
 from pathlib import Path
 
 # 添加 chanlun 模块到路径
+# chanlun 内部使用顶层导入（Chan、Common.* 等），需要其目录在 sys.path 中；
+# 追加到末尾而非插入开头，其他模块的导入不会先去 chanlun 目录查找，也不会被其同名模块遮蔽
 chanlun_path = Path(__file__).parent.parent.parent / "chanlun"
 if str(chanlun_path) not in sys.path:
-    sys.path.insert(0, str(chanlun_path))
+    sys.path.append(str(chanlun_path))
 
 from Chan import CChan
 from ChanConfig import CChanConfig
 from Common.CEnum import AUTYPE, DATA_SRC, KL_TYPE
+from Plot.PlotMeta import CChanPlotMeta
 
 router = APIRouter()
 
@@ -43,6 +59,152 @@ DEFAULT_CONFIG = {
     "print_warning": False,
 }
 
+# K 线周期映射
+PERIOD_MAP = {
+    "day": KL_TYPE.K_DAY,
+    "week": KL_TYPE.K_WEEK,
+    "month": KL_TYPE.K_MON,
+}
+
+# 数据源映射
+SRC_MAP = {
+    "akshare": DATA_SRC.AKSHARE,
+    "baostock": DATA_SRC.BAO_STOCK,
+}
+
+# 图表 PNG 响应的缓存时长（秒）
+CHART_CACHE_MAX_AGE = 300
+
+# 缠论分析对象缓存容量
+CHAN_CACHE_SIZE = 512
+
+# 缠论计算线程池（数据拉取与笔/线段/中枢计算均为阻塞操作，不能占用事件循环）
+CHAN_MAX_WORKERS = 8
+_chan_executor = ThreadPoolExecutor(max_workers=CHAN_MAX_WORKERS, thread_name_prefix="chanlun")
+
+# 图表渲染进程池：matplotlib 渲染占用 GIL 且 pyplot 状态为全局，放到独立进程并行执行；
+# 缠论对象在主进程构建（共用 _build_chan 缓存），序列化后交给工作进程绘图
+CHART_MAX_WORKERS = 4
+_chart_executor: Optional[ProcessPoolExecutor] = None
+
+_T = TypeVar("_T")
+
+
+def _get_chart_executor() -> ProcessPoolExecutor:
+    """获取图表渲染进程池（首次使用时创建）"""
+    global _chart_executor
+    if _chart_executor is None:
+        # spawn 启动，避免在持有线程与事件循环的进程中 fork
+        _chart_executor = ProcessPoolExecutor(
+            max_workers=CHART_MAX_WORKERS,
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+    return _chart_executor
+
+
+def shutdown_chart_executor():
+    """关闭图表渲染进程池（应用关闭时调用）"""
+    global _chart_executor
+    if _chart_executor is not None:
+        _chart_executor.shutdown(wait=False, cancel_futures=True)
+        _chart_executor = None
+
+
+async def _run_blocking(executor: Executor, func: Callable[..., _T], *args) -> _T:
+    """在线程池/进程池中执行阻塞函数"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(executor, func, *args)
+
+
+async def _run_chart_task(func: Callable[..., _T], *args) -> _T:
+    """
+    在图表进程池中执行渲染函数
+
+    工作进程异常退出后进程池会变为 BrokenProcessPool 且不再可用，
+    此时丢弃旧进程池、重新创建并重试一次
+    """
+    global _chart_executor
+    executor = _get_chart_executor()
+    try:
+        return await _run_blocking(executor, func, *args)
+    except BrokenProcessPool:
+        # 并发请求可能已经重建过进程池，只重置仍指向损坏实例的情况
+        if _chart_executor is executor:
+            _chart_executor = None
+            executor.shutdown(wait=False)
+        return await _run_blocking(_get_chart_executor(), func, *args)
+
+
+# 提取结果缓存：挂在缠论对象上，对象被 _build_chan 的缓存淘汰后随之释放
+_extract_cache: "weakref.WeakKeyDictionary[CChan, Dict[tuple, Any]]" = weakref.WeakKeyDictionary()
+_extract_cache_lock = threading.Lock()
+
+
+def _extract_cached(func: Callable[..., _T], chan: CChan, *args) -> _T:
+    """
+    缓存 _extract_* 的结果
+
+    缓存的缠论对象在当天内不变，其提取结果也不变，命中时不再遍历 K 线/笔/线段/中枢
+    """
+    key = (func.__name__, *args)
+    with _extract_cache_lock:
+        per_chan = _extract_cache.setdefault(chan, {})
+        if key in per_chan:
+            return per_chan[key]
+
+    result = func(chan, *args)
+    with _extract_cache_lock:
+        per_chan[key] = result
+    return result
+
+
+@lru_cache(maxsize=None)
+def _get_default_config() -> CChanConfig:
+    """
+    缠论默认配置（进程内单例，CChan 只读取配置）
+
+    CChanConfig 解析时会逐项删除传入字典的键，因此传入副本，保持 DEFAULT_CONFIG 不变
+    """
+    return CChanConfig(dict(DEFAULT_CONFIG))
+
+
+def _get_kl_type(period: str) -> KL_TYPE:
+    """映射周期参数"""
+    return PERIOD_MAP.get(period, KL_TYPE.K_DAY)
+
+
+@lru_cache(maxsize=CHAN_CACHE_SIZE)
+def _build_chan_for_day(
+    stock_code: str,
+    period: str,
+    days: int,
+    data_source: str,
+    day: str,
+) -> CChan:
+    """按自然日缓存的缠论分析对象（day 仅作为缓存键，使时间窗口确定）"""
+    end_time = date.fromisoformat(day)
+    begin_time = end_time - timedelta(days=days)
+
+    return CChan(
+        code=stock_code,
+        begin_time=begin_time.strftime("%Y-%m-%d"),
+        end_time=end_time.strftime("%Y-%m-%d"),
+        data_src=SRC_MAP.get(data_source, DATA_SRC.AKSHARE),
+        lv_list=[_get_kl_type(period)],
+        config=_get_default_config(),
+        autype=AUTYPE.QFQ,
+    )
+
+
+def _build_chan(stock_code: str, period: str, days: int, data_source: str) -> CChan:
+    """
+    创建缠论分析对象
+
+    同一股票、周期、天数、数据源在当天内复用同一个对象，
+    避免每个请求都重新拉取数据并重算笔/线段/中枢/买卖点
+    """
+    return _build_chan_for_day(stock_code, period, days, data_source, date.today().isoformat())
+
 
 @router.get("/analysis/{stock_code}")
 async def analyze_chanlun(
@@ -62,41 +224,11 @@ async def analyze_chanlun(
     - 买卖点列表
     """
     try:
-        # 映射周期参数
-        period_map = {
-            "day": KL_TYPE.K_DAY,
-            "week": KL_TYPE.K_WEEK,
-            "month": KL_TYPE.K_MON,
-        }
-        kl_type = period_map.get(period, KL_TYPE.K_DAY)
-
-        # 映射数据源
-        src_map = {
-            "akshare": DATA_SRC.AKSHARE,
-            "baostock": DATA_SRC.BAO_STOCK,
-        }
-        src = src_map.get(data_source, DATA_SRC.AKSHARE)
-
-        # 计算时间范围
-        end_time = datetime.now()
-        begin_time = end_time - timedelta(days=days)
-
-        # 创建配置
-        config = CChanConfig(DEFAULT_CONFIG)
-
-        # 创建缠论分析对象
-        chan = CChan(
-            code=stock_code,
-            begin_time=begin_time.strftime("%Y-%m-%d"),
-            end_time=end_time.strftime("%Y-%m-%d"),
-            data_src=src,
-            lv_list=[kl_type],
-            config=config,
-            autype=AUTYPE.QFQ,
-        )
+        kl_type = _get_kl_type(period)
+        chan = await _run_blocking(_chan_executor, _build_chan, stock_code, period, days, data_source)
 
         # 提取分析结果
-        result = _extract_chan_analysis(chan, kl_type)
+        result = await _run_blocking(_chan_executor, _extract_cached, _extract_chan_analysis, chan, kl_type)
 
         return {
             "success": True,
@@ -130,36 +262,11 @@ async def get_chanlun_kline(
     - 中枢区间
     """
     try:
-        period_map = {
-            "day": KL_TYPE.K_DAY,
-            "week": KL_TYPE.K_WEEK,
-            "month": KL_TYPE.K_MON,
-        }
-        kl_type = period_map.get(period, KL_TYPE.K_DAY)
-
-        src_map = {
-            "akshare": DATA_SRC.AKSHARE,
-            "baostock": DATA_SRC.BAO_STOCK,
-        }
-        src = src_map.get(data_source, DATA_SRC.AKSHARE)
-
-        end_time = datetime.now()
-        begin_time = end_time - timedelta(days=days)
-
-        config = CChanConfig(DEFAULT_CONFIG)
-
-        chan = CChan(
-            code=stock_code,
-            begin_time=begin_time.strftime("%Y-%m-%d"),
-            end_time=end_time.strftime("%Y-%m-%d"),
-            data_src=src,
-            lv_list=[kl_type],
-            config=config,
-            autype=AUTYPE.QFQ,
-        )
+        kl_type = _get_kl_type(period)
+        chan = await _run_blocking(_chan_executor, _build_chan, stock_code, period, days, data_source)
 
         # 提取 K 线绘图数据
-        kline_data = _extract_kline_plot_data(chan, kl_type)
+        kline_data = await _run_blocking(_chan_executor, _extract_cached, _extract_kline_plot_data, chan, kl_type)
 
         return {
             "success": True,
@@ -193,49 +300,36 @@ async def get_buy_sell_points(
     - 关联中枢信息
     """
     try:
-        period_map = {
-            "day": KL_TYPE.K_DAY,
-            "week": KL_TYPE.K_WEEK,
-            "month": KL_TYPE.K_MON,
-        }
-        kl_type = period_map.get(period, KL_TYPE.K_DAY)
-
-        end_time = datetime.now()
-        begin_time = end_time - timedelta(days=days)
-
-        config = CChanConfig(DEFAULT_CONFIG)
-
-        chan = CChan(
-            code=stock_code,
-            begin_time=begin_time.strftime("%Y-%m-%d"),
-            end_time=end_time.strftime("%Y-%m-%d"),
-            data_src=DATA_SRC.AKSHARE,
-            lv_list=[kl_type],
-            config=config,
-            autype=AUTYPE.QFQ,
-        )
+        chan = await _run_blocking(_chan_executor, _build_chan, stock_code, period, days, "akshare")
 
         # 获取买卖点
         bsp_list = chan.get_latest_bsp(number=0)  # 获取所有买卖点
 
-        # 筛选类型
-        if bsp_type:
-            bsp_list = [bsp for bsp in bsp_list if bsp_type in bsp.type2str()]
-
-        # 限制数量
-        bsp_list = bsp_list[:limit]
+        # 筛选类型并限制数量：类型只解析一次，取满 limit 个即停止
+        # 按前缀匹配，如 "3" 同时匹配 3a/3b，"1" 匹配 1/1p
+        wanted = tuple(t.strip() for t in (bsp_type or "").split(",") if t.strip())
+        if wanted:
+            bsp_iter = (
+                bsp for bsp in bsp_list
+                if any(t.value.startswith(wanted) for t in bsp.type)
+            )
+        else:
+            bsp_iter = iter(bsp_list)
+        bsp_list = list(itertools.islice(bsp_iter, max(limit, 0)))
 
         # 转换为字典格式
-        bsp_data = []
-        for bsp in bsp_list:
-            bsp_data.append({
+        has_combine = bool(bsp_list) and hasattr(bsp_list[0], 'combine')
+        bsp_data = [
+            {
                 "type": bsp.type2str(),
                 "is_buy": bsp.is_buy,
                 "klu_idx": bsp.klu.idx,
                 "time": str(bsp.klu.time),
                 "price": bsp.klu.close,
-                "combination": bsp.combine.tolist() if hasattr(bsp, 'combine') else [],
-            })
+                "combination": bsp.combine.tolist() if has_combine else [],
+            }
+            for bsp in bsp_list
+        ]
 
         return {
             "success": True,
@@ -338,25 +432,32 @@ def _extract_bsp_list(bsp_list) -> List[Dict]:
     return result
 
 
+_KLU_FIELDS = attrgetter("idx", "time", "open", "high", "low", "close")
+
+
 def _extract_kline_plot_data(chan: CChan, kl_type: KL_TYPE) -> Dict[str, Any]:
     """提取 K 线绘图数据"""
     kl_data = chan[kl_type]
 
-    # 基础 K 线数据
-    klines = []
-    for klc in kl_data.lst:
-        for klu in klc.lst:
-            klines.append({
-                "idx": klu.idx,
-                "time": str(klu.time),
-                "open": klu.open,
-                "high": klu.high,
-                "low": klu.low,
-                "close": klu.close,
-                "volume": klu.trade_info.metric.get("volume"),
-                "turnover": klu.trade_info.metric.get("turnover"),
-                "turnover_rate": klu.trade_info.metric.get("turnover_rate"),
-            })
+    # 基础 K 线数据：先展平合并 K 线，再一次性取出各字段按行组装
+    klus = [klu for klc in kl_data.lst for klu in klc.lst]
+    klines = [
+        {
+            "idx": idx,
+            "time": str(time),
+            "open": open_,
+            "high": high,
+            "low": low,
+            "close": close,
+            "volume": metric.get("volume"),
+            "turnover": metric.get("turnover"),
+            "turnover_rate": metric.get("turnover_rate"),
+        }
+        for (idx, time, open_, high, low, close), metric in zip(
+            map(_KLU_FIELDS, klus),
+            (klu.trade_info.metric for klu in klus),
+        )
+    ]
 
     # 笔数据
     bi_lines = []
@@ -406,6 +507,135 @@ def _extract_kline_plot_data(chan: CChan, kl_type: KL_TYPE) -> Dict[str, Any]:
     }
 
 
+@lru_cache(maxsize=None)
+def _get_pyplot():
+    """
+    加载 pyplot（仅图表工作进程需要，首次调用后缓存）
+
+    必须在导入绘图驱动之前设置 Agg 后端
+    """
+    import matplotlib
+    matplotlib.use('Agg')  # 使用非交互式后端
+    import matplotlib.pyplot as plt
+    return plt
+
+
+@lru_cache(maxsize=None)
+def _get_plot_driver_cls():
+    """加载 chan.py 内置绘图驱动 CPlotDriver"""
+    _get_pyplot()
+    from Plot.PlotDriver import CPlotDriver
+    return CPlotDriver
+
+
+@lru_cache(maxsize=None)
+def _get_mplfinance_driver_cls():
+    """加载 mplfinance 绘图驱动（依赖 mplfinance，单独加载）"""
+    _get_pyplot()
+    from Plot.MplfinancePlotDriver import MplfinancePlotDriver
+    return MplfinancePlotDriver
+
+
+def _dump_chan_for_plot(chan: CChan) -> bytes:
+    """
+    序列化缠论对象，供图表工作进程绘图
+
+    与 chan.py 的 chan_dump_pickle 相同，先断开 K 线/合并 K 线/笔/线段的前后链表再 pickle
+    （否则递归过深）；缓存中的对象可能正被其他请求读取，因此在深拷贝上断链
+    """
+    chan = copy.deepcopy(chan)
+    for kl_list in chan.kl_datas.values():
+        for klc in kl_list.lst:
+            for klu in klc.lst:
+                klu.pre = None
+                klu.next = None
+            klc.set_pre(None)
+            klc.set_next(None)
+        for item in itertools.chain(kl_list.bi_list, kl_list.seg_list, kl_list.segseg_list):
+            item.pre = None
+            item.next = None
+    return pickle.dumps(chan, protocol=pickle.HIGHEST_PROTOCOL)
+
+
+def _load_chan_for_plot(payload: bytes) -> CChan:
+    """还原 _dump_chan_for_plot 序列化的缠论对象（在图表工作进程中执行）"""
+    chan = pickle.loads(payload)
+    chan.chan_pickle_restore()
+    return chan
+
+
+async def _get_chan_plot_payload(stock_code: str, period: str, days: int, data_source: str) -> bytes:
+    """在主进程构建（或取缓存的）缠论对象，返回供图表进程使用的序列化数据"""
+    chan = await _run_blocking(_chan_executor, _build_chan, stock_code, period, days, data_source)
+    return await _run_blocking(_chan_executor, _extract_cached, _dump_chan_for_plot, chan)
+
+
+def _render_chart_png(
+    chan_payload: bytes,
+    plot_config: Dict[str, Any],
+    plot_para: Dict[str, Any],
+) -> bytes:
+    """
+    使用内置 CPlotDriver 绘图，返回 PNG 字节
+
+    在图表进程池中执行，缠论对象由主进程构建后序列化传入
+    """
+    plt = _get_pyplot()
+    chan = _load_chan_for_plot(chan_payload)
+    try:
+        plot_driver = _get_plot_driver_cls()(
+            chan,
+            plot_config=plot_config,
+            plot_para=plot_para,
+        )
+
+        # 将图表保存到内存缓冲区
+        buf = io.BytesIO()
+        plot_driver.figure.savefig(buf, format='png', bbox_inches='tight', dpi=100)
+        return buf.getvalue()
+    finally:
+        plt.close('all')  # 关闭图表释放内存
+
+
+def _render_mplfinance_png(
+    chan_payload: bytes,
+    kl_type: KL_TYPE,
+    plot_config: Dict[str, Any],
+    plot_para: Dict[str, Any],
+) -> bytes:
+    """
+    使用 MplfinancePlotDriver 绘图，返回 PNG 字节
+
+    在图表进程池中执行，缠论对象由主进程构建后序列化传入
+    """
+    plt = _get_pyplot()
+    chan = _load_chan_for_plot(chan_payload)
+    try:
+        plot_driver = _get_mplfinance_driver_cls()(
+            chan,
+            kl_type=kl_type,
+            plot_config=plot_config,
+            plot_para=plot_para,
+        )
+        return plot_driver.to_bytes(format='png')
+    finally:
+        plt.close('all')  # 关闭图表释放内存
+
+
+def _png_response(png: bytes) -> Response:
+    """直接返回 PNG 图片（不经过 base64/JSON）"""
+    return Response(
+        content=png,
+        media_type="image/png",
+        headers={"Cache-Control": f"public, max-age={CHART_CACHE_MAX_AGE}"},
+    )
+
+
+def _png_data_uri(png: bytes) -> str:
+    """PNG 字节转 data URI（JSON 返回格式使用）"""
+    return f"data:image/png;base64,{base64.b64encode(png).decode('utf-8')}"
+
+
 @router.get("/chart/{stock_code}")
 async def get_chanlun_chart(
     stock_code: str,
@@ -414,52 +644,17 @@ async def get_chanlun_chart(
     data_source: str = Query("akshare", description="数据源"),
     width: int = Query(24, description="图表宽度（英寸）"),
     height: int = Query(10, description="图表高度（英寸）"),
+    format: str = Query("json", description="返回格式: json（base64）, png（图片）"),
 ):
     """
     获取缠论 matplotlib 图表（base64 编码）【已弃用，推荐使用 /chart-mplfinance】
 
     使用 chan.py 内置的 CPlotDriver 生成图表，返回 base64 编码的 PNG 图片数据，
-    可直接在 HTML <img> 标签中显示。
+    可直接在 HTML <img> 标签中显示。format=png 时直接返回图片。
 
     注意：此接口为旧版本，推荐使用 /chart-mplfinance 接口获得更好的图表效果。
     """
-    import io
-    import base64
-    import matplotlib
-    matplotlib.use('Agg')  # 使用非交互式后端
-    import matplotlib.pyplot as plt
-
-    from Plot.PlotDriver import CPlotDriver
-
     try:
-        period_map = {
-            "day": KL_TYPE.K_DAY,
-            "week": KL_TYPE.K_WEEK,
-            "month": KL_TYPE.K_MON,
-        }
-        kl_type = period_map.get(period, KL_TYPE.K_DAY)
-
-        src_map = {
-            "akshare": DATA_SRC.AKSHARE,
-            "baostock": DATA_SRC.BAO_STOCK,
-        }
-        src = src_map.get(data_source, DATA_SRC.AKSHARE)
-
-        end_time = datetime.now()
-        begin_time = end_time - timedelta(days=days)
-
-        config = CChanConfig(DEFAULT_CONFIG)
-
-        chan = CChan(
-            code=stock_code,
-            begin_time=begin_time.strftime("%Y-%m-%d"),
-            end_time=end_time.strftime("%Y-%m-%d"),
-            data_src=src,
-            lv_list=[kl_type],
-            config=config,
-            autype=AUTYPE.QFQ,
-        )
-
         # 绘图配置
         plot_config = {
             "plot_kline": True,
@@ -485,38 +680,24 @@ async def get_chanlun_chart(
             },
         }
 
-        # 使用内置绘图驱动器
-        plot_driver = CPlotDriver(
-            chan,
-            plot_config=plot_config,
-            plot_para=plot_para,
-        )
+        chan_payload = await _get_chan_plot_payload(stock_code, period, days, data_source)
+        png = await _run_chart_task(_render_chart_png, chan_payload, plot_config, plot_para)
 
-        # 将图表保存到内存缓冲区
-        buf = io.BytesIO()
-        plot_driver.figure.savefig(buf, format='png', bbox_inches='tight', dpi=100)
-        buf.seek(0)
-
-        # 转换为 base64
-        img_base64 = base64.b64encode(buf.read()).decode('utf-8')
-        buf.close()
-
-        # 关闭图表释放内存
-        plt.close(plot_driver.figure)
+        if format == "png":
+            return _png_response(png)
 
         return {
             "success": True,
             "data": {
                 "stock_code": stock_code,
                 "period": period,
-                "image_base64": f"data:image/png;base64,{img_base64}",
+                "image_base64": _png_data_uri(png),
             }
         }
 
     except Exception as e:
         import traceback
         traceback.print_exc()
-        plt.close('all')  # 确保关闭所有图表
         raise HTTPException(
             status_code=500,
             detail=f"生成图表失败: {str(e)}"
@@ -538,11 +719,13 @@ async def get_chanlun_chart_mplfinance(
     plot_ma: bool = Query(True, description="绘制移动平均线"),
     plot_macd: bool = Query(False, description="绘制 MACD 指标"),
     plot_kdj: bool = Query(False, description="绘制 KDJ 指标"),
+    format: str = Query("json", description="返回格式: json（base64）, png（图片）"),
 ):
     """
     获取缠论专业 K 线图表（基于 mplfinance）
 
-    使用 mplfinance 库生成专业金融图表，返回 base64 编码的 PNG 图片数据。
+    使用 mplfinance 库生成专业金融图表，返回 base64 编码的 PNG 图片数据；
+    format=png 时直接返回图片。
 
     功能特性：
     - 专业的 K 线蜡烛图（红涨绿跌）
@@ -554,46 +737,7 @@ async def get_chanlun_chart_mplfinance(
 
     替换 chan.py 原有的落后绘图功能。
     """
-    import matplotlib
-    matplotlib.use('Agg')  # 使用非交互式后端
-    import matplotlib.pyplot as plt
-
-    from Plot.MplfinancePlotDriver import MplfinancePlotDriver
-
     try:
-        # 映射周期参数
-        period_map = {
-            "day": KL_TYPE.K_DAY,
-            "week": KL_TYPE.K_WEEK,
-            "month": KL_TYPE.K_MON,
-        }
-        kl_type = period_map.get(period, KL_TYPE.K_DAY)
-
-        # 映射数据源
-        src_map = {
-            "akshare": DATA_SRC.AKSHARE,
-            "baostock": DATA_SRC.BAO_STOCK,
-        }
-        src = src_map.get(data_source, DATA_SRC.AKSHARE)
-
-        # 计算时间范围
-        end_time = datetime.now()
-        begin_time = end_time - timedelta(days=days)
-
-        # 创建缠论配置
-        config = CChanConfig(DEFAULT_CONFIG)
-
-        # 创建缠论分析对象
-        chan = CChan(
-            code=stock_code,
-            begin_time=begin_time.strftime("%Y-%m-%d"),
-            end_time=end_time.strftime("%Y-%m-%d"),
-            data_src=src,
-            lv_list=[kl_type],
-            config=config,
-            autype=AUTYPE.QFQ,
-        )
-
         # 绘图配置
         plot_config = {
             'plot_kline': True,
@@ -616,26 +760,20 @@ async def get_chanlun_chart_mplfinance(
             'ma_periods': [5, 10, 20, 60],
         }
 
-        # 使用 mplfinance 绘图驱动器
-        plot_driver = MplfinancePlotDriver(
-            chan,
-            kl_type=kl_type,
-            plot_config=plot_config,
-            plot_para=plot_para,
+        chan_payload = await _get_chan_plot_payload(stock_code, period, days, data_source)
+        png = await _run_chart_task(
+            _render_mplfinance_png, chan_payload, _get_kl_type(period), plot_config, plot_para,
         )
 
-        # 生成图表并转换为 base64
-        img_base64 = plot_driver.to_base64(format='png')
-
-        # 关闭图表释放内存
-        plt.close(plot_driver.fig)
+        if format == "png":
+            return _png_response(png)
 
         return {
             "success": True,
             "data": {
                 "stock_code": stock_code,
                 "period": period,
-                "image_base64": img_base64,
+                "image_base64": _png_data_uri(png),
                 "plot_config": plot_config,
                 "chart_engine": "mplfinance (enhanced)",
             }
@@ -644,7 +782,6 @@ async def get_chanlun_chart_mplfinance(
     except Exception as e:
         import traceback
         traceback.print_exc()
-        plt.close('all')  # 确保关闭所有图表
         raise HTTPException(
             status_code=500,
             detail=f"生成图表失败: {str(e)}"
@@ -670,36 +807,13 @@ async def get_chanlun_plot(
     - 买卖点标记
     """
     try:
-        period_map = {
-            "day": KL_TYPE.K_DAY,
-            "week": KL_TYPE.K_WEEK,
-            "month": KL_TYPE.K_MON,
-        }
-        kl_type = period_map.get(period, KL_TYPE.K_DAY)
-
-        src_map = {
-            "akshare": DATA_SRC.AKSHARE,
-            "baostock": DATA_SRC.BAO_STOCK,
-        }
-        src = src_map.get(data_source, DATA_SRC.AKSHARE)
-
-        end_time = datetime.now()
-        begin_time = end_time - timedelta(days=days)
-
-        config = CChanConfig(DEFAULT_CONFIG)
-
-        chan = CChan(
-            code=stock_code,
-            begin_time=begin_time.strftime("%Y-%m-%d"),
-            end_time=end_time.strftime("%Y-%m-%d"),
-            data_src=src,
-            lv_list=[kl_type],
-            config=config,
-            autype=AUTYPE.QFQ,
-        )
+        kl_type = _get_kl_type(period)
+        chan = await _run_blocking(_chan_executor, _build_chan, stock_code, period, days, data_source)
 
         # 提取完整的绘图数据
-        plot_data = _extract_plot_elements(chan, kl_type, x_range)
+        plot_data = await _run_blocking(
+            _chan_executor, _extract_cached, _extract_plot_elements, chan, kl_type, x_range
+        )
 
         return {
             "success": True,
@@ -717,8 +831,6 @@ async def get_chanlun_plot(
 
 def _extract_plot_elements(chan: CChan, kl_type: KL_TYPE, x_range: int) -> Dict[str, Any]:
     """使用 chan.py 的 CChanPlotMeta 提取绘图元数据"""
-    from Plot.PlotMeta import CChanPlotMeta, CBi_meta, CSeg_meta, CZS_meta, CBS_Point_meta
-
     # 使用 chan.py 的绘图元数据类提取数据
     plot_meta = CChanPlotMeta(chan[kl_type])
 
@@ -727,17 +839,19 @@ def _extract_plot_elements(chan: CChan, kl_type: KL_TYPE, x_range: int) -> Dict[
     start_idx = max(0, klu_len - x_range)
 
     # 提取K线数据
-    klines = []
-    for klc in plot_meta.klc_list:
-        for klu in klc.klu_list:
-            klines.append({
-                "idx": klu.idx,
-                "time": str(klu.time),
-                "open": float(klu.open),
-                "high": float(klu.high),
-                "low": float(klu.low),
-                "close": float(klu.close),
-            })
+    klines = [
+        {
+            "idx": idx,
+            "time": str(time),
+            "open": float(open_),
+            "high": float(high),
+            "low": float(low),
+            "close": float(close),
+        }
+        for idx, time, open_, high, low, close in map(
+            _KLU_FIELDS, (klu for klc in plot_meta.klc_list for klu in klc.klu_list)
+        )
+    ]
 
     # 提取笔数据 - 使用 CBi_meta 的结构
     bi_lines = []
@@ -5,12 +5,12 @@ New API version with TypeScript service layer integration.
 """
 
 from fastapi import APIRouter, HTTPException, Depends
-from typing import Dict, Any
+from typing import Dict, Any, List, Optional
 import logging
 import json
 import subprocess
 
-from app.integrations.typescript_bridge import get_ts_bridge
+from app.integrations.typescript_bridge import TypeScriptServiceError, get_ts_bridge
 
 logger = logging.getLogger(__name__)
 
@@ -37,8 +37,14 @@ async def services_status() -> Dict[str, Any]:
     return {
         "typescript": {
             "status": "enabled",
-            "services": ["TrendAnalysisService", "ConfigService"],
-            "bridge": "Python-Node.js subprocess"
+            "services": [
+                "TrendAnalysisService",
+                "ConfigService",
+                "AnalysisTaskRepository",
+                "AnalysisBatchRepository",
+                "RedisProgressClient",
+            ],
+            "bridge": "Python-Node.js worker (HTTP over UNIX socket, stdio fallback)"
         },
         "rust": {
             "status": "enabled",
@@ -247,11 +253,27 @@ console.log(JSON.stringify({
         else:
             return {"error": result.stderr}
 
+    except Exception as e:
+        return {"error": str(e)}
+
 
 # =============================================================================
 # 进度追踪 API - Progress Tracking
 # =============================================================================
 
+async def _call_ts(service: str, method: str, *args: Any) -> Any:
+    """
+    通过常驻 Node.js worker 调用 TypeScript 服务方法
+
+    参数以位置参数列表传递（JSON 序列化，不拼接到脚本中）；
+    服务方法自身抛出的错误转换为 400，worker 不可用等错误由调用方按 500 处理
+    """
+    try:
+        return await get_ts_bridge().call_service(service, method, list(args))
+    except TypeScriptServiceError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
 @router.get("/analysis/tasks/{task_id}")
 async def get_task_status(task_id: str) -> Dict[str, Any]:
     """
@@ -266,62 +288,22 @@ async def get_task_status(task_id: str) -> Dict[str, Any]:
         Task status information including progress, status, and result (if completed)
     """
     try:
-        # Call TypeScript repository to get task status
-        script = f"""
-const {{ getAnalysisTaskRepository }} = require('./build/repositories');
-
-async function main() {{
-    try {{
-        const repo = getAnalysisTaskRepository();
-        const task = await repo.getTaskByTaskId('{task_id}');
-
-        if (!task) {{
-            console.log(JSON.stringify({{ success: false, error: 'Task not found' }}));
-            return;
-        }}
-
-        console.log(JSON.stringify({{
-            success: true,
-            data: {{
-                taskId: task.taskId,
-                userId: task.userId,
-                symbol: task.symbol,
-                status: task.status,
-                progress: task.progress,
-                message: task.message,
-                currentStep: task.currentStep,
-                createdAt: task.createdAt,
-                startedAt: task.startedAt,
-                completedAt: task.completedAt,
-                result: task.result || null
-            }}
-        }}));
-    }} catch (error) {{
-        console.log(JSON.stringify({{ success: false, error: error.message }}));
-    }}
-}}
-
-main();
-"""
-
-        ts_bridge = get_ts_bridge()
-        result = await ts_bridge._run_node_script(script)
-
-        if not result.get("success"):
-            raise HTTPException(status_code=404, detail=result.get("error"))
+        task = await _call_ts("AnalysisTaskRepository", "getTaskByTaskId", task_id)
+        if not task:
+            raise HTTPException(status_code=404, detail="Task not found")
 
         return {
-            "task_id": result["data"]["taskId"],
-            "user_id": result["data"]["userId"],
-            "symbol": result["data"]["symbol"],
-            "status": result["data"]["status"],
-            "progress": result["data"]["progress"],
-            "message": result["data"].get("message"),
-            "current_step": result["data"].get("currentStep"),
-            "created_at": result["data"]["createdAt"],
-            "started_at": result["data"].get("startedAt"),
-            "completed_at": result["data"].get("completedAt"),
-            "result": result["data"].get("result")
+            "task_id": task["taskId"],
+            "user_id": task["userId"],
+            "symbol": task["symbol"],
+            "status": task["status"],
+            "progress": task["progress"],
+            "message": task.get("message"),
+            "current_step": task.get("currentStep"),
+            "created_at": task["createdAt"],
+            "started_at": task.get("startedAt"),
+            "completed_at": task.get("completedAt"),
+            "result": task.get("result")
         }
 
     except HTTPException:
@@ -345,63 +327,23 @@ async def get_batch_status(batch_id: str) -> Dict[str, Any]:
         Batch status information including task counts and progress
     """
     try:
-        script = f"""
-const {{ getAnalysisBatchRepository }} = require('./build/repositories');
-
-async function main() {{
-    try {{
-        const repo = getAnalysisBatchRepository();
-        const batch = await repo.getBatchByBatchId('{batch_id}');
-
-        if (!batch) {{
-            console.log(JSON.stringify({{ success: false, error: 'Batch not found' }}));
-            return;
-        }}
-
-        console.log(JSON.stringify({{
-            success: true,
-            data: {{
-                batchId: batch.batchId,
-                userId: batch.userId,
-                title: batch.title,
-                description: batch.description,
-                status: batch.status,
-                totalTasks: batch.totalTasks,
-                completedTasks: batch.completedTasks || 0,
-                failedTasks: batch.failedTasks || 0,
-                progress: batch.progress || 0,
-                createdAt: batch.createdAt,
-                startedAt: batch.startedAt,
-                completedAt: batch.completedAt
-            }}
-        }}));
-    }} catch (error) {{
-        console.log(JSON.stringify({{ success: false, error: error.message }}));
-    }}
-}}
-
-main();
-"""
-
-        ts_bridge = get_ts_bridge()
-        result = await ts_bridge._run_node_script(script)
-
-        if not result.get("success"):
-            raise HTTPException(status_code=404, detail=result.get("error"))
+        batch = await _call_ts("AnalysisBatchRepository", "getBatchByBatchId", batch_id)
+        if not batch:
+            raise HTTPException(status_code=404, detail="Batch not found")
 
         return {
-            "batch_id": result["data"]["batchId"],
-            "user_id": result["data"]["userId"],
-            "title": result["data"].get("title"),
-            "description": result["data"].get("description"),
-            "status": result["data"]["status"],
-            "total_tasks": result["data"]["totalTasks"],
-            "completed_tasks": result["data"]["completedTasks"],
-            "failed_tasks": result["data"]["failedTasks"],
-            "progress": result["data"]["progress"],
-            "created_at": result["data"]["createdAt"],
-            "started_at": result["data"].get("startedAt"),
-            "completed_at": result["data"].get("completedAt")
+            "batch_id": batch["batchId"],
+            "user_id": batch["userId"],
+            "title": batch.get("title"),
+            "description": batch.get("description"),
+            "status": batch["status"],
+            "total_tasks": batch["totalTasks"],
+            "completed_tasks": batch.get("completedTasks") or 0,
+            "failed_tasks": batch.get("failedTasks") or 0,
+            "progress": batch.get("progress") or 0,
+            "created_at": batch["createdAt"],
+            "started_at": batch.get("startedAt"),
+            "completed_at": batch.get("completedAt")
         }
 
     except HTTPException:
@@ -433,52 +375,28 @@ async def get_user_tasks(
         List of user's tasks
     """
     try:
-        status_filter = f"'{status}'" if status else "undefined"
-
-        script = f"""
-const {{ getAnalysisTaskRepository }} = require('./build/repositories');
-
-async function main() {{
-    try {{
-        const repo = getAnalysisTaskRepository();
-        const tasks = await repo.getTasksByUser('{user_id}', {{
-            status: {status_filter},
-            limit: {limit},
-            skip: {skip}
-        }});
-
-        console.log(JSON.stringify({{
-            success: true,
-            data: {{
-                tasks: tasks.map(t => ({{
-                    taskId: t.taskId,
-                    symbol: t.symbol,
-                    status: t.status,
-                    progress: t.progress,
-                    createdAt: t.createdAt,
-                    completedAt: t.completedAt
-                }})),
-                count: tasks.length
-            }}
-        }}));
-    }} catch (error) {{
-        console.log(JSON.stringify({{ success: false, error: error.message }}));
-    }}
-}}
-
-main();
-"""
-
-        ts_bridge = get_ts_bridge()
-        result = await ts_bridge._run_node_script(script)
+        options: Dict[str, Any] = {"limit": limit, "skip": skip}
+        if status:
+            options["status"] = status
 
-        if not result.get("success"):
-            raise HTTPException(status_code=400, detail=result.get("error"))
+        tasks: List[Dict[str, Any]] = await _call_ts(
+            "AnalysisTaskRepository", "getTasksByUser", user_id, options
+        ) or []
 
         return {
             "user_id": user_id,
-            "tasks": result["data"]["tasks"],
-            "count": result["data"]["count"]
+            "tasks": [
+                {
+                    "taskId": t.get("taskId"),
+                    "symbol": t.get("symbol"),
+                    "status": t.get("status"),
+                    "progress": t.get("progress"),
+                    "createdAt": t.get("createdAt"),
+                    "completedAt": t.get("completedAt"),
+                }
+                for t in tasks
+            ],
+            "count": len(tasks)
         }
 
     except HTTPException:
@@ -502,35 +420,11 @@ async def get_user_stats(user_id: str) -> Dict[str, Any]:
         User statistics including task counts and token usage
     """
     try:
-        script = f"""
-const {{ getAnalysisTaskRepository }} = require('./build/repositories');
-
-async function main() {{
-    try {{
-        const repo = getAnalysisTaskRepository();
-        const stats = await repo.getUserStats('{user_id}');
-
-        console.log(JSON.stringify({{
-            success: true,
-            data: stats
-        }}));
-    }} catch (error) {{
-        console.log(JSON.stringify({{ success: false, error: error.message }}));
-    }}
-}}
-
-main();
-"""
-
-        ts_bridge = get_ts_bridge()
-        result = await ts_bridge._run_node_script(script)
-
-        if not result.get("success"):
-            raise HTTPException(status_code=400, detail=result.get("error"))
+        stats = await _call_ts("AnalysisTaskRepository", "getUserStats", user_id)
 
         return {
             "user_id": user_id,
-            **result["data"]
+            **(stats or {})
         }
 
     except HTTPException:
@@ -554,35 +448,8 @@ async def get_task_progress_from_redis(task_id: str) -> Dict[str, Any]:
         Real-time progress data from Redis
     """
     try:
-        script = f"""
-const {{ getRedisProgressClient }} = require('./build/integration');
-
-async function main() {{
-    try {{
-        const client = getRedisProgressClient();
-        await client.initialize();
-
-        const progress = await client.getProgress('{task_id}');
-
-        console.log(JSON.stringify({{
-            success: true,
-            data: progress
-        }}));
-    }} catch (error) {{
-        console.log(JSON.stringify({{ success: false, error: error.message }}));
-    }}
-}}
-
-main();
-"""
-
-        ts_bridge = get_ts_bridge()
-        result = await ts_bridge._run_node_script(script)
-
-        if not result.get("success"):
-            raise HTTPException(status_code=400, detail=result.get("error"))
-
-        return result.get("data", {})
+        progress = await _call_ts("RedisProgressClient", "getProgress", task_id)
+        return progress or {}
 
     except HTTPException:
         raise
@@ -605,35 +472,11 @@ async def cancel_task(task_id: str) -> Dict[str, Any]:
         Cancellation result
     """
     try:
-        script = f"""
-const {{ getAnalysisTaskRepository }} = require('./build/repositories');
-
-async function main() {{
-    try {{
-        const repo = getAnalysisTaskRepository();
-        const cancelled = await repo.cancelTask('{task_id}');
-
-        console.log(JSON.stringify({{
-            success: true,
-            data: {{ cancelled, taskId: '{task_id}' }}
-        }}));
-    }} catch (error) {{
-        console.log(JSON.stringify({{ success: false, error: error.message }}));
-    }}
-}}
-
-main();
-"""
-
-        ts_bridge = get_ts_bridge()
-        result = await ts_bridge._run_node_script(script)
-
-        if not result.get("success"):
-            raise HTTPException(status_code=400, detail=result.get("error"))
+        cancelled = await _call_ts("AnalysisTaskRepository", "cancelTask", task_id)
 
         return {
             "task_id": task_id,
-            "cancelled": result["data"]["cancelled"]
+            "cancelled": cancelled
         }
 
     except HTTPException:
@@ -657,35 +500,11 @@ async def cancel_batch(batch_id: str) -> Dict[str, Any]:
         Cancellation result
     """
     try:
-        script = f"""
-const {{ getAnalysisBatchRepository }} = require('./build/repositories');
-
-async function main() {{
-    try {{
-        const repo = getAnalysisBatchRepository();
-        const cancelled = await repo.cancelBatch('{batch_id}');
-
-        console.log(JSON.stringify({{
-            success: true,
-            data: {{ cancelled, batchId: '{batch_id}' }}
-        }}));
-    }} catch (error) {{
-        console.log(JSON.stringify({{ success: false, error: error.message }}));
-    }}
-}}
-
-main();
-"""
-
-        ts_bridge = get_ts_bridge()
-        result = await ts_bridge._run_node_script(script)
-
-        if not result.get("success"):
-            raise HTTPException(status_code=400, detail=result.get("error"))
+        cancelled = await _call_ts("AnalysisBatchRepository", "cancelBatch", batch_id)
 
         return {
             "batch_id": batch_id,
-            "cancelled": result["data"]["cancelled"]
+            "cancelled": cancelled
         }
 
     except HTTPException:
@@ -458,17 +458,19 @@ class MplfinancePlotDriver:
         self.plot()
         plt.show()
 
-    def to_base64(self, format: str = 'png') -> str:
-        """将图表转换为 base64 编码"""
+    def to_bytes(self, format: str = 'png') -> bytes:
+        """将图表渲染为图片字节"""
         import io
-        import base64
 
         buf = io.BytesIO()
         self.fig.savefig(buf, format=format, bbox_inches='tight', dpi=100, facecolor='white')
-        buf.seek(0)
-        img_base64 = base64.b64encode(buf.read()).decode('utf-8')
-        buf.close()
+        return buf.getvalue()
+
+    def to_base64(self, format: str = 'png') -> str:
+        """将图表转换为 base64 编码"""
+        import base64
 
+        img_base64 = base64.b64encode(self.to_bytes(format=format)).decode('utf-8')
         return f"data:image/{format};base64,{img_base64}"
 
 
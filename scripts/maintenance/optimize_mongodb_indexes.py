@@ -10,8 +10,11 @@ MongoDB 索引优化脚本
 
 使用方法：
     python scripts/maintenance/optimize_mongodb_indexes.py
+    # 同时删除已从 DatabaseIndexManager.INDEX_SPECS 移除的冗余索引（一次性迁移）
+    python scripts/maintenance/optimize_mongodb_indexes.py --drop-redundant
 """
 
+import argparse
 import asyncio
 import sys
 from pathlib import Path
@@ -23,6 +26,7 @@ sys.path.insert(0, str(project_root))
 from motor.motor_asyncio import AsyncIOMotorClient
 from app.core.config import settings
 from app.core.logging_config import logger
+from app.core.database_indexes import drop_redundant_database_indexes
 
 
 async def analyze_existing_indexes(collection):
@@ -251,7 +255,21 @@ async def test_query_performance(collection):
             logger.error(f"❌ 测试查询失败: {name}, 错误: {e}")
 
 
-async def main():
+async def drop_redundant_app_indexes(db):
+    """删除应用索引规范中已移除的冗余索引（DatabaseIndexManager.REDUNDANT_INDEXES）"""
+    logger.info("\n🗑️  删除应用冗余索引...")
+
+    results = await drop_redundant_database_indexes(db)
+    for name, dropped in results.items():
+        if dropped:
+            logger.info(f"✅ 已删除或不存在: {name}")
+        else:
+            logger.warning(f"⚠️  删除失败: {name}")
+
+    return results
+
+
+async def main(drop_redundant: bool = False):
     """主函数"""
     logger.info("🚀 开始 MongoDB 索引优化...")
     logger.info(f"📍 数据库: {settings.MONGO_DB}")
@@ -272,8 +290,10 @@ async def main():
         # 3. 创建优化索引
         created_count = await create_optimized_indexes(collection)
         
-        # 4. 删除冗余索引（可选）
-        # await drop_redundant_indexes(collection)
+        # 4. 删除冗余索引（可选，需显式指定 --drop-redundant）
+        if drop_redundant:
+            await drop_redundant_indexes(collection)
+            await drop_redundant_app_indexes(db)
         
         # 5. 测试查询性能
         await test_query_performance(collection)
@@ -298,6 +318,14 @@ async def main():
 
 
 if __name__ == "__main__":
-    success = asyncio.run(main())
+    parser = argparse.ArgumentParser(description="MongoDB 索引优化")
+    parser.add_argument(
+        "--drop-redundant",
+        action="store_true",
+        help="删除冗余索引（包括已从 DatabaseIndexManager.INDEX_SPECS 移除的索引）",
+    )
+    args = parser.parse_args()
+
+    success = asyncio.run(main(drop_redundant=args.drop_redundant))
     sys.exit(0 if success else 1)
 
@@ -0,0 +1,71 @@
+import asyncio
+
+
+def _make_manager():
+    from app.core.cache_manager import CacheConfig, CacheLevel, CacheManager
+
+    manager = CacheManager()
+    manager.CACHE_CONFIGS = {
+        **CacheManager.CACHE_CONFIGS,
+        "dep_test": CacheConfig(key="dep_test", ttl=300, level=CacheLevel.L1_MEMORY),
+    }
+    manager._build_fast_config()
+    return manager
+
+
+def test_dependency_event_evicts_decorated_result(monkeypatch):
+    import app.core.cache_invalidation as ci
+
+    manager = _make_manager()
+    invalidator = ci.CacheInvalidator(manager)
+    monkeypatch.setattr(ci, "get_cache_manager", lambda: manager)
+    monkeypatch.setattr(ci, "_cache_invalidator", invalidator)
+
+    calls = []
+
+    @ci.cached_with_invalidation(cache_key="dep_test", invalidate_on_keys={"stock_basic"})
+    async def load(code):
+        calls.append(code)
+        return {"code": code, "n": len(calls)}
+
+    async def scenario():
+        first = await load("000001")
+        # 命中缓存，不再调用函数
+        assert await load("000001") == first
+        assert len(calls) == 1
+        assert any(k.startswith("dep_test:") for k in manager._memory_cache.keys())
+
+        evicted = await invalidator.invalidate_dependencies("stock_basic")
+        assert evicted == 1
+        assert not any(k.startswith("dep_test:") for k in manager._memory_cache.keys())
+
+        # 失效后重新计算
+        second = await load("000001")
+        assert second["n"] == 2
+        assert len(calls) == 2
+
+    asyncio.run(scenario())
+
+
+def test_unrelated_dependency_keeps_cached_result(monkeypatch):
+    import app.core.cache_invalidation as ci
+
+    manager = _make_manager()
+    invalidator = ci.CacheInvalidator(manager)
+    monkeypatch.setattr(ci, "get_cache_manager", lambda: manager)
+    monkeypatch.setattr(ci, "_cache_invalidator", invalidator)
+
+    calls = []
+
+    @ci.cached_with_invalidation(cache_key="dep_test", invalidate_on_keys={"stock_basic"})
+    async def load(code):
+        calls.append(code)
+        return code
+
+    async def scenario():
+        await load("000001")
+        assert await invalidator.invalidate_dependencies("news_feed") == 0
+        await load("000001")
+        assert len(calls) == 1
+
+    asyncio.run(scenario())
@@ -0,0 +1,35 @@
+import asyncio
+from types import SimpleNamespace
+
+
+class _FakeRedis:
+    def __init__(self, data):
+        self.data = data
+        self.mget_calls = []
+
+    async def mget(self, keys):
+        self.mget_calls.append(list(keys))
+        return [self.data.get(k) for k in keys]
+
+
+def test_get_many_resolves_derived_keys_on_mget_path():
+    from app.core.cache_manager import CacheManager, _dumps
+
+    manager = CacheManager()
+    redis = _FakeRedis({
+        "cache:market_quotes:abc": _dumps({"price": 10.5}),
+        "cache:market_quotes": _dumps({"price": 9.9}),
+    })
+    manager._redis_service = SimpleNamespace(redis=redis)
+
+    async def scenario():
+        results = await manager.get_many(["market_quotes:abc", "market_quotes", "market_quotes:missing"])
+        assert results == {"market_quotes:abc": {"price": 10.5}, "market_quotes": {"price": 9.9}}
+        assert len(redis.mget_calls) == 1
+
+        # 命中的派生键写入前置缓存，再次读取不再访问 Redis
+        assert "market_quotes:abc" in manager._l1
+        assert await manager.get_many(["market_quotes:abc"]) == {"market_quotes:abc": {"price": 10.5}}
+        assert len(redis.mget_calls) == 1
+
+    asyncio.run(scenario())
@@ -0,0 +1,57 @@
+import asyncio
+import functools
+
+
+def test_call_warmup_func_awaits_wrapped_coroutines():
+    from app.core.cache_warming import _call_warmup_func
+
+    async def fetch(value):
+        return value
+
+    def returns_coroutine():
+        return fetch("sync-wrapper")
+
+    def plain():
+        return "sync"
+
+    async def scenario():
+        assert await _call_warmup_func(functools.partial(fetch, "partial")) == "partial"
+        assert await _call_warmup_func(returns_coroutine) == "sync-wrapper"
+        assert await _call_warmup_func(plain) == "sync"
+
+    asyncio.run(scenario())
+
+
+def test_snapshot_round_trip_skips_invalid_entries(tmp_path):
+    from app.core.cache_manager import CacheConfig, CacheLevel, CacheManager
+    from app.core.cache_warming import CacheWarmer, WarmupPriority, WarmupTask
+
+    manager = CacheManager()
+    manager.CACHE_CONFIGS = {
+        "warm_test": CacheConfig(key="warm_test", ttl=300, level=CacheLevel.L1_MEMORY),
+    }
+    manager._build_fast_config()
+    path = tmp_path / "snapshot.json"
+
+    warmer = CacheWarmer(cache_manager=manager, snapshot_path=path)
+    task = WarmupTask(
+        name="warm_test", func=None, priority=WarmupPriority.HIGH,
+        cache_key="warm_test", ttl=300,
+    )
+    warmer._record_snapshot(task, {"codes": ["000001", "600000"]})
+
+    async def scenario():
+        await warmer._save_snapshot()
+        manager._memory_cache.invalidate()
+
+        restored = await CacheWarmer(cache_manager=manager, snapshot_path=path).load_snapshot()
+        assert restored == 1
+        assert await manager.get("warm_test") == {"codes": ["000001", "600000"]}
+
+        # 未配置的键、格式错误的条目被丢弃
+        path.write_text('[["unknown_key", 1, 60, 9999999999], ["warm_test"], "x"]')
+        manager._memory_cache.invalidate()
+        assert await CacheWarmer(cache_manager=manager, snapshot_path=path).load_snapshot() == 0
+        assert await manager.get("warm_test") is None
+
+    asyncio.run(scenario())
@@ -0,0 +1,90 @@
+import asyncio
+
+
+def test_make_config_key_normalizes_kwargs_and_unhashable_args():
+    from app.core.config_cache import _make_config_key
+
+    assert _make_config_key("f", (1,), {"b": 2, "a": 1}) == _make_config_key("f", (1,), {"a": 1, "b": 2})
+    assert _make_config_key("f", (1,), {}) != _make_config_key("g", (1,), {})
+    # 不可哈希参数退化为字符串键，仍保持确定性
+    key = _make_config_key("f", ([1, 2],), {"opts": {"x": 1}})
+    assert isinstance(key, str)
+    assert key == _make_config_key("f", ([1, 2],), {"opts": {"x": 1}})
+
+
+def test_config_cache_ttl_and_sweep(monkeypatch):
+    import app.core.config_cache as cc
+
+    now = [1000.0]
+    monkeypatch.setattr(cc.time, "monotonic", lambda: now[0])
+
+    cache = cc.ConfigCache(default_ttl=10)
+    cache.set("a", 1)
+    cache.set("b", 2, ttl=100)
+    assert cache.get("a") == 1
+    assert cache.has("b")
+
+    now[0] += 11
+    assert cache.get("a") is None
+    assert cache.sweep_expired() == 0  # "a" 已在读取时移除
+    now[0] += 100
+    assert cache.sweep_expired() == 1
+    assert cache.keys() == []
+
+    stats = cache.get_stats()
+    assert stats["hits"] == 1 and stats["misses"] == 1
+
+
+def test_config_cache_evicts_oldest_when_full():
+    from app.core.config_cache import ConfigCache
+
+    cache = ConfigCache(default_ttl=60, maxsize=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.set("c", 3)
+    assert cache.keys() == ["b", "c"]
+
+
+def test_cached_config_coalesces_concurrent_misses():
+    from app.core.config_cache import cached_config, invalidate_all_config
+
+    invalidate_all_config()
+    calls = []
+
+    @cached_config(ttl=60)
+    async def load(name, *, scope="global"):
+        calls.append((name, scope))
+        await asyncio.sleep(0.01)
+        return {"name": name, "scope": scope}
+
+    async def scenario():
+        results = await asyncio.gather(*(load("llm", scope="user") for _ in range(5)))
+        assert all(r == {"name": "llm", "scope": "user"} for r in results)
+        assert await load("llm", scope="user") == results[0]
+        assert calls == [("llm", "user")]
+
+    asyncio.run(scenario())
+    invalidate_all_config()
+
+
+def test_cached_config_keys_distinguish_argument_types():
+    from app.core.config_cache import _make_config_key, cached_config, invalidate_all_config
+
+    assert len({_make_config_key("f", (v,), {}) for v in (1, 1.0, True)}) == 3
+    assert _make_config_key("f", (), {"n": 1}) != _make_config_key("f", (), {"n": 1.0})
+
+    invalidate_all_config()
+    calls = []
+
+    @cached_config(ttl=60)
+    async def kind(value):
+        calls.append(value)
+        return type(value).__name__
+
+    async def scenario():
+        assert [await kind(v) for v in (1, 1.0, True)] == ["int", "float", "bool"]
+        assert await kind(1) == "int"
+        assert len(calls) == 3
+
+    asyncio.run(scenario())
+    invalidate_all_config()
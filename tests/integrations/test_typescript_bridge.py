@@ -0,0 +1,144 @@
+import asyncio
+import shutil
+from pathlib import Path
+
+import pytest
+
+pytest.importorskip("httpx")
+
+from app.integrations.typescript_bridge import TypeScriptServiceBridge
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+
+ECHO_SERVICE = """
+class EchoService {
+  constructor() { this.calls = 0; }
+  async echo(params) { this.calls += 1; return { params, calls: this.calls }; }
+  add(a, b) { return a + b; }
+  fail() { throw new Error('boom'); }
+}
+module.exports = { EchoService };
+"""
+
+pytestmark = pytest.mark.skipif(shutil.which("node") is None, reason="node not installed")
+
+
+TASK_REPOSITORY = """
+let repo = null;
+exports.getAnalysisTaskRepository = () => {
+  if (!repo) {
+    repo = {
+      created: Date.now(),
+      async getTaskByTaskId(taskId) {
+        return taskId === 'missing' ? null : { taskId, status: 'running', progress: 50 };
+      },
+    };
+  }
+  return repo;
+};
+"""
+
+
+@pytest.fixture
+def ts_services(tmp_path):
+    shutil.copy(PROJECT_ROOT / "ts_services" / "bridge_server.js", tmp_path / "bridge_server.js")
+    (tmp_path / "build").mkdir()
+    (tmp_path / "build" / "index.js").write_text(ECHO_SERVICE)
+    (tmp_path / "build" / "repositories.js").write_text(TASK_REPOSITORY)
+    return tmp_path
+
+
+def _make_bridge(ts_services, tmp_path, transport):
+    bridge = TypeScriptServiceBridge(str(ts_services))
+    if transport == "stdio":
+        bridge.socket_path = None
+    else:
+        bridge.socket_path = str(tmp_path / "bridge.sock")
+    return bridge
+
+
+@pytest.mark.parametrize("transport", ["http", "stdio"])
+def test_call_service_through_worker(ts_services, tmp_path, transport):
+    bridge = _make_bridge(ts_services, tmp_path, transport)
+
+    async def scenario():
+        try:
+            first = await bridge.call_service("EchoService", "echo", {"code": "000001"})
+            assert first == {"params": {"code": "000001"}, "calls": 1}
+            # 同一个 worker 进程、同一个服务实例
+            pid = bridge._process.pid
+            second = await bridge.call_service("EchoService", "echo", {})
+            assert second["calls"] == 2
+            assert bridge._process.pid == pid
+
+            assert await bridge.call_service("EchoService", "add", [2, 3]) == 5
+            results = await asyncio.gather(
+                *(bridge.call_service("EchoService", "add", [i, i]) for i in range(20))
+            )
+            assert results == [2 * i for i in range(20)]
+
+            with pytest.raises(RuntimeError, match="boom"):
+                await bridge.call_service("EchoService", "fail")
+            with pytest.raises(RuntimeError, match="Unknown service"):
+                await bridge.call_service("MissingService", "echo")
+
+            health = await bridge.health_check()
+            assert health["status"] == "healthy"
+        finally:
+            await bridge.close()
+
+    asyncio.run(scenario())
+
+
+@pytest.mark.parametrize("transport", ["http", "stdio"])
+def test_worker_restarts_after_crash(ts_services, tmp_path, transport):
+    bridge = _make_bridge(ts_services, tmp_path, transport)
+
+    async def scenario():
+        try:
+            await bridge.call_service("EchoService", "echo", {})
+            old = bridge._process
+            old.kill()
+            await old.wait()
+            await asyncio.sleep(0.1)  # 让读取任务处理 EOF
+
+            result = await bridge.call_service("EchoService", "echo", {})
+            assert result["calls"] == 1  # 新进程，新的服务实例
+            assert bridge._process is not old
+        finally:
+            await bridge.close()
+
+    asyncio.run(scenario())
+
+
+def test_failed_startup_raises_and_leaves_no_worker(ts_services, tmp_path):
+    (ts_services / "bridge_server.js").write_text("process.exit(3);\n")
+    bridge = _make_bridge(ts_services, tmp_path, "http")
+
+    async def scenario():
+        for _ in range(2):
+            with pytest.raises(RuntimeError, match="failed to start"):
+                await bridge.call_service("EchoService", "echo", {})
+            assert bridge._process is None
+            assert bridge._client is None
+        await bridge.close()
+
+    asyncio.run(scenario())
+
+
+def test_factory_services_receive_positional_params(ts_services, tmp_path):
+    bridge = _make_bridge(ts_services, tmp_path, "http")
+
+    async def scenario():
+        try:
+            # 参数按 JSON 传递，不会被拼接进脚本
+            task_id = "abc'); process.exit(1); ('"
+            task = await bridge.call_service("AnalysisTaskRepository", "getTaskByTaskId", [task_id])
+            assert task == {"taskId": task_id, "status": "running", "progress": 50}
+            assert await bridge.call_service(
+                "AnalysisTaskRepository", "getTaskByTaskId", ["missing"]
+            ) is None
+        finally:
+            await bridge.close()
+
+    asyncio.run(scenario())
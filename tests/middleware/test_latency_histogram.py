@@ -0,0 +1,95 @@
+import math
+import random
+
+from app.middleware.latency_histogram import HISTOGRAM_MAX_MS, LatencyHistogram
+
+
+def _exact_percentile(samples, p):
+    """与直方图相同的秩定义：第 ceil(n * p / 100) 个样本"""
+    ordered = sorted(samples)
+    rank = max(1, math.ceil(len(ordered) * p / 100))
+    return ordered[rank - 1]
+
+
+def test_bucket_edges():
+    index = LatencyHistogram._index
+    value_at = LatencyHistogram._value_at
+
+    # 128µs 以内逐微秒计数，代表值即原值
+    for us in (0, 1, 64, 127):
+        assert index(us) == us
+        assert value_at(index(us)) == us
+
+    # 128µs 起每个 2 的幂区间划分为 64 个子桶：[128, 256) 宽 2µs，[256, 512) 宽 4µs
+    assert index(128) == index(129) == 128
+    assert index(130) == 129
+    assert value_at(128) == 128.5
+    assert index(255) == 191
+    assert index(256) == 192
+    assert value_at(192) == 257.5
+
+    # 桶编号随数值单调不减，且代表值的相对误差 < 1%
+    last = -1
+    for us in range(0, 1 << 20, 7):
+        i = index(us)
+        assert i >= last
+        last = i
+        if us:
+            assert abs(value_at(i) - us) / us < 0.01
+
+
+def test_record_clamps_to_range():
+    hist = LatencyHistogram()
+    hist.record(-5)
+    hist.record(HISTOGRAM_MAX_MS * 10)
+
+    assert hist.total == 2
+    assert hist.percentile(0) == 0.0
+    assert abs(hist.percentile(100) - HISTOGRAM_MAX_MS) / HISTOGRAM_MAX_MS < 0.01
+    # 上限值落在最后一个桶
+    assert hist.counts[len(hist.counts) - 1] == 1
+
+
+def test_percentiles_uniform_distribution():
+    hist = LatencyHistogram()
+    samples = [i / 10 for i in range(1, 10001)]  # 0.1ms - 1000ms
+    for value in samples:
+        hist.record(value)
+
+    for p, result in zip((1, 50, 90, 99, 99.9), hist.percentiles((1, 50, 90, 99, 99.9))):
+        expected = _exact_percentile(samples, p)
+        assert abs(result - expected) / expected < 0.01, (p, result, expected)
+
+
+def test_percentiles_long_tail_distribution():
+    rnd = random.Random(42)
+    samples = [rnd.expovariate(1 / 50) for _ in range(20000)]  # 均值 50ms 的指数分布
+    hist = LatencyHistogram()
+    for value in samples:
+        hist.record(value)
+
+    for p in (50, 95, 99, 99.9):
+        expected = _exact_percentile(samples, p)
+        assert abs(hist.percentile(p) - expected) / expected < 0.01, p
+
+
+def test_small_values_are_exact():
+    hist = LatencyHistogram()
+    for us in (5, 10, 20, 100):
+        hist.record(us / 1000)
+
+    assert hist.percentiles((25, 50, 75, 100)) == [0.005, 0.01, 0.02, 0.1]
+
+
+def test_empty_and_reset():
+    hist = LatencyHistogram()
+    assert hist.percentiles((50, 99)) == [0.0, 0.0]
+
+    for value in (1, 2, 3):
+        hist.record(value)
+    size = len(hist.counts)
+    hist.reset()
+
+    assert hist.total == 0
+    assert len(hist.counts) == size and not any(hist.counts)
+    assert hist.percentile(50) == 0.0
@@ -0,0 +1,149 @@
+import asyncio
+from types import SimpleNamespace
+
+from app.middleware.performance_monitor_v2 import (
+    UNMATCHED_ROUTE,
+    EnhancedPerformanceMonitor,
+    PerformanceMonitorMiddleware,
+)
+
+
+def test_monitor_aggregates_global_and_endpoint_stats():
+    async def scenario():
+        monitor = EnhancedPerformanceMonitor()
+        for i in range(1, 101):
+            monitor.record_request("GET", "/items/{id}", float(i), 200)
+        monitor.record_request("POST", "/items", 1500.0, 500)
+
+        stats = await monitor.get_global_stats()
+        assert stats["total_requests"] == 101
+        assert stats["errors"] == 1
+        assert stats["slow_queries"] == 1
+        assert abs(stats["p50_ms"] - 51) / 51 < 0.01
+
+        endpoints = {ep["path"]: ep for ep in await monitor.get_endpoint_stats(limit=10)}
+        items = endpoints["/items/{id}"]
+        assert items["request_count"] == 100
+        assert items["status_codes"] == {200: 100}
+        assert abs(items["p95_ms"] - 95) / 95 < 0.01
+        assert endpoints["/items"]["error_rate"] == 1.0
+
+        await monitor.reset_stats()
+        stats = await monitor.get_global_stats()
+        assert stats["total_requests"] == 0
+        assert stats["p99_ms"] == 0.0
+
+    asyncio.run(scenario())
+
+
+def test_enqueued_requests_are_drained_before_reading():
+    async def scenario():
+        monitor = EnhancedPerformanceMonitor()
+        for _ in range(10):
+            monitor.enqueue_request("GET", "/a", 5.0, 200)
+
+        stats = await monitor.get_global_stats()
+        assert stats["total_requests"] == 10
+        monitor._drain_task.cancel()
+
+    asyncio.run(scenario())
+
+
+def test_prometheus_metrics_group_samples_by_family():
+    async def scenario():
+        monitor = EnhancedPerformanceMonitor()
+        monitor.record_request("GET", "/a", 10.0, 200)
+        monitor.record_request("GET", "/a", 20.0, 404)
+        monitor.record_request("GET", "/b", 30.0, 200)
+
+        text = await monitor.get_prometheus_metrics()
+        assert "http_requests_total 3\n" in text
+        assert 'http_endpoint_requests_total{method="GET",path="/a",status="404"} 1' in text
+
+        # 同一指标族的样本必须连续出现
+        families = [line.split("{")[0].split(" ")[0] for line in text.splitlines() if line and not line.startswith("#")]
+        seen = []
+        for family in families:
+            if not seen or seen[-1] != family:
+                assert family not in seen, family
+                seen.append(family)
+
+    asyncio.run(scenario())
+
+
+def _http_scope(path, route=None):
+    scope = {"type": "http", "method": "GET", "path": path, "headers": []}
+    if route is not None:
+        scope["route"] = SimpleNamespace(path=route)
+    return scope
+
+
+def test_middleware_groups_by_route_template_and_buckets_unmatched():
+    async def scenario():
+        monitor = EnhancedPerformanceMonitor()
+
+        async def app(scope, receive, send):
+            status = 200 if "route" in scope else 404
+            await send({"type": "http.response.start", "status": status, "headers": []})
+            await send({"type": "http.response.body", "body": b""})
+
+        middleware = PerformanceMonitorMiddleware(app, monitor=monitor)
+        sent = []
+
+        async def send(message):
+            sent.append(message)
+
+        async def receive():
+            return {"type": "http.request"}
+
+        await middleware(_http_scope("/items/1", route="/items/{id}"), receive, send)
+        await middleware(_http_scope("/items/2", route="/items/{id}"), receive, send)
+        for i in range(20):
+            await middleware(_http_scope(f"/wp-admin/{i}.php"), receive, send)
+
+        assert any(name == b"x-process-time" for name, _ in sent[0]["headers"])
+
+        endpoints = {ep["path"]: ep for ep in await monitor.get_endpoint_stats(limit=10)}
+        assert set(endpoints) == {"/items/{id}", UNMATCHED_ROUTE}
+        assert endpoints["/items/{id}"]["request_count"] == 2
+        assert endpoints[UNMATCHED_ROUTE]["status_codes"] == {404: 20}
+        assert len(monitor._key_cache) == 2
+        monitor._drain_task.cancel()
+
+    asyncio.run(scenario())
+
+
+def test_middleware_skips_configured_prefixes():
+    async def scenario():
+        monitor = EnhancedPerformanceMonitor()
+
+        async def app(scope, receive, send):
+            await send({"type": "http.response.start", "status": 200, "headers": []})
+            await send({"type": "http.response.body", "body": b""})
+
+        sent = []
+
+        async def send(message):
+            sent.append(message)
+
+        async def receive():
+            return {"type": "http.request"}
+
+        middleware = PerformanceMonitorMiddleware(app, monitor=monitor)
+        for path in ("/health", "/metrics", "/static/app.js", "/favicon.ico"):
+            await middleware(_http_scope(path), receive, send)
+
+        assert all(b"x-process-time" not in dict(m["headers"]) for m in sent if "headers" in m)
+        assert sent[0]["headers"] == []
+        assert (await monitor.get_global_stats())["total_requests"] == 0
+
+        # 自定义前缀替换默认列表
+        custom = PerformanceMonitorMiddleware(app, monitor=monitor, skip_prefixes=("/internal",))
+        await custom(_http_scope("/internal/ping"), receive, send)
+        await custom(_http_scope("/health", route="/health"), receive, send)
+
+        endpoints = await monitor.get_endpoint_stats(limit=10)
+        assert [ep["path"] for ep in endpoints] == ["/health"]
+        monitor._drain_task.cancel()
+
+    asyncio.run(scenario())
@@ -0,0 +1,110 @@
+import asyncio
+from typing import Any, Dict
+
+from bson import ObjectId
+from pymongo import InsertOne, UpdateOne
+
+from app.repositories.base import PaginationParams, Repository
+
+
+class _FakeCursor:
+    def __init__(self, docs):
+        self._docs = docs
+
+    async def to_list(self, length=None):
+        return self._docs[:length]
+
+
+class _FakeCollection:
+    def __init__(self, aggregate_result=None):
+        self.aggregate_result = aggregate_result or []
+        self.pipelines = []
+        self.bulk_ops = []
+
+    def aggregate(self, pipeline):
+        self.pipelines.append(pipeline)
+        return _FakeCursor(self.aggregate_result)
+
+    async def bulk_write(self, ops, ordered=True):
+        self.bulk_ops.append((ops, ordered))
+        # 与 pymongo 一致：插入的文档在写入时被补上 _id
+        for op in ops:
+            if isinstance(op, InsertOne):
+                op._doc.setdefault("_id", ObjectId())
+
+
+class _ItemRepository(Repository[Dict[str, Any]]):
+    def __init__(self, collection):
+        super().__init__("items")
+        self._collection = collection
+
+    @property
+    def collection(self):
+        return self._collection
+
+    def _to_entity(self, document):
+        return {"id": document.get("id") or str(document.get("_id", "")), "name": document["name"]}
+
+    def _to_document(self, entity):
+        return dict(entity)
+
+
+def test_paginate_counts_and_fetches_in_one_aggregate():
+    facet = {"items": [{"_id": ObjectId(), "name": "a"}, {"_id": ObjectId(), "name": "b"}], "total": [{"n": 5}]}
+    collection = _FakeCollection([facet])
+    repo = _ItemRepository(collection)
+
+    result = asyncio.run(repo.paginate(
+        {"status": "open"},
+        PaginationParams(page=2, page_size=2, sort_by="name", sort_order=-1),
+    ))
+
+    assert [item["name"] for item in result.items] == ["a", "b"]
+    assert result.total == 5
+    assert result.has_next and result.has_prev
+
+    (pipeline,) = collection.pipelines
+    assert pipeline[0] == {"$match": {"status": "open"}}
+    assert pipeline[1] == {"$sort": {"name": -1}}
+    assert pipeline[2]["$facet"] == {
+        "items": [{"$skip": 2}, {"$limit": 2}],
+        "total": [{"$count": "n"}],
+    }
+
+
+def test_paginate_handles_no_matches():
+    repo = _ItemRepository(_FakeCollection([{"items": [], "total": []}]))
+
+    result = asyncio.run(repo.paginate(params=PaginationParams(page=1, page_size=20)))
+
+    assert result.items == [] and result.total == 0
+    assert not result.has_next and not result.has_prev
+
+
+def test_save_many_uses_one_bulk_write_and_keeps_order():
+    collection = _FakeCollection()
+    repo = _ItemRepository(collection)
+    existing_id = str(ObjectId())
+
+    saved = asyncio.run(repo.save_many([
+        {"name": "new-1"},
+        {"id": existing_id, "name": "existing"},
+        {"name": "new-2"},
+    ]))
+
+    (ops, ordered), = collection.bulk_ops
+    assert not ordered
+    assert [type(op) for op in ops] == [InsertOne, UpdateOne, InsertOne]
+    assert ops[1]._filter == {"_id": ObjectId(existing_id)}
+
+    assert [entity["name"] for entity in saved] == ["new-1", "existing", "new-2"]
+    assert saved[1]["id"] == existing_id
+    assert ObjectId.is_valid(saved[0]["id"]) and ObjectId.is_valid(saved[2]["id"])
+    assert saved[0]["id"] != saved[2]["id"]
+
+
+def test_save_many_with_no_entities_skips_the_write():
+    collection = _FakeCollection()
+
+    assert asyncio.run(_ItemRepository(collection).save_many([])) == []
+    assert collection.bulk_ops == []
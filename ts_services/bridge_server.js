@@ -0,0 +1,204 @@
+/**
+ * TACN v2.0 - Python bridge server
+ *
+ * Long-lived worker used by app/integrations/typescript_bridge.py.
+ *
+ * HTTP mode (`node bridge_server.js --socket /path/to.sock`):
+ *   POST /svc/<service>/<method> with the JSON params as body, served on a
+ *   UNIX domain socket. Responds {"ok": true, "data": ...} | {"ok": false, "error": "..."}.
+ *   Prints {"ready": true} on stdout once listening and exits when stdin closes.
+ *
+ * stdio mode (no arguments, used where UNIX sockets are unavailable):
+ *   newline-delimited JSON-RPC over stdin/stdout
+ *   request:  {"id": 1, "service": "TrendAnalysisService", "method": "analyze", "params": {...}}
+ *   response: {"id": 1, "ok": true, "data": ...} | {"id": 1, "ok": false, "error": "..."}
+ *
+ * Services are loaded and instantiated once, then reused for every call.
+ * stdout is reserved for protocol messages; diagnostics go to stderr.
+ */
+
+'use strict';
+
+const fs = require('fs');
+const http = require('http');
+const path = require('path');
+const readline = require('readline');
+
+const BUILD_DIR = path.join(__dirname, 'build');
+const VERSION = '2.0.0';
+
+// Service name -> module (relative to build/) exporting a class of that name.
+// Services not listed here are looked up in build/index.js.
+const SERVICE_MODULES = {
+  TrendAnalysisService: 'domain/analysis/trend-analysis.service',
+};
+
+// Services obtained from a factory function instead of `new`:
+// name -> [module relative to build/, factory export, optional async init method]
+const SERVICE_FACTORIES = {
+  AnalysisTaskRepository: ['repositories', 'getAnalysisTaskRepository'],
+  AnalysisBatchRepository: ['repositories', 'getAnalysisBatchRepository'],
+  RedisProgressClient: ['integration', 'getRedisProgressClient', 'initialize'],
+};
+
+// Service name -> Promise of the instance (shared by concurrent first calls)
+const instances = new Map();
+
+async function createService(name) {
+  const factory = SERVICE_FACTORIES[name];
+  if (factory) {
+    const [modulePath, factoryName, init] = factory;
+    const create = require(path.join(BUILD_DIR, modulePath))[factoryName];
+    if (typeof create !== 'function') {
+      throw new Error(`Unknown service: ${name}`);
+    }
+    const svc = create();
+    if (init) {
+      await svc[init]();
+    }
+    return svc;
+  }
+
+  const modulePath = path.join(BUILD_DIR, SERVICE_MODULES[name] || 'index.js');
+  const ServiceClass = require(modulePath)[name];
+  if (typeof ServiceClass !== 'function') {
+    throw new Error(`Unknown service: ${name}`);
+  }
+  return new ServiceClass();
+}
+
+function getService(name) {
+  let svc = instances.get(name);
+  if (!svc) {
+    svc = createService(name);
+    instances.set(name, svc);
+    // A failed creation is retried on the next call
+    svc.catch(() => instances.delete(name));
+  }
+  return svc;
+}
+
+// Built-in methods handled by the bridge itself
+const builtins = {
+  ping: async () => ({ version: VERSION, pid: process.pid }),
+};
+
+async function dispatch({ service, method, params }) {
+  if (service === '__bridge__') {
+    const fn = builtins[method];
+    if (!fn) {
+      throw new Error(`Unknown bridge method: ${method}`);
+    }
+    return fn(params);
+  }
+
+  const svc = await getService(service);
+  if (typeof svc[method] !== 'function') {
+    throw new Error(`Unknown method: ${service}.${method}`);
+  }
+  return Array.isArray(params) ? svc[method](...params) : svc[method](params);
+}
+
+function errorMessage(error) {
+  return error && error.message ? error.message : String(error);
+}
+
+async function invoke(request) {
+  try {
+    const data = await dispatch(request);
+    return { ok: true, data: data === undefined ? null : data };
+  } catch (error) {
+    return { ok: false, error: errorMessage(error) };
+  }
+}
+
+function reply(message) {
+  process.stdout.write(JSON.stringify(message) + '\n');
+}
+
+function serveStdio() {
+  const rl = readline.createInterface({ input: process.stdin, crlfDelay: Infinity });
+
+  // Requests are handled concurrently; responses are matched by id on the Python side.
+  rl.on('line', async (line) => {
+    if (!line.trim()) {
+      return;
+    }
+
+    let request;
+    try {
+      request = JSON.parse(line);
+    } catch (error) {
+      process.stderr.write(`bridge: invalid request line: ${error.message}\n`);
+      return;
+    }
+
+    reply({ id: request.id, ...(await invoke(request)) });
+  });
+
+  rl.on('close', () => process.exit(0));
+}
+
+function serveHttp(socketPath) {
+  try {
+    fs.unlinkSync(socketPath);
+  } catch (error) {
+    if (error.code !== 'ENOENT') {
+      throw error;
+    }
+  }
+
+  const server = http.createServer((req, res) => {
+    const match = /^\/svc\/([^/]+)\/([^/?]+)$/.exec(req.url);
+    if (req.method !== 'POST' || !match) {
+      res.writeHead(404);
+      res.end();
+      return;
+    }
+
+    const chunks = [];
+    req.on('data', (chunk) => chunks.push(chunk));
+    req.on('end', async () => {
+      let message;
+      try {
+        const body = chunks.length ? JSON.parse(Buffer.concat(chunks).toString('utf8')) : {};
+        message = await invoke({
+          service: decodeURIComponent(match[1]),
+          method: decodeURIComponent(match[2]),
+          params: body,
+        });
+      } catch (error) {
+        message = { ok: false, error: `invalid request body: ${errorMessage(error)}` };
+      }
+
+      const payload = JSON.stringify(message);
+      res.writeHead(200, {
+        'Content-Type': 'application/json',
+        'Content-Length': Buffer.byteLength(payload),
+      });
+      res.end(payload);
+    });
+  });
+
+  server.keepAliveTimeout = 60 * 1000;
+  server.listen(socketPath, () => reply({ ready: true }));
+
+  process.on('exit', () => {
+    try {
+      fs.unlinkSync(socketPath);
+    } catch (error) {
+      // already removed
+    }
+  });
+
+  // The parent closes stdin to stop the worker
+  process.stdin.on('end', () => process.exit(0));
+  process.stdin.resume();
+}
+
+const socketIndex = process.argv.indexOf('--socket');
+if (socketIndex !== -1 && process.argv[socketIndex + 1]) {
+  serveHttp(process.argv[socketIndex + 1]);
+} else {
+  serveStdio();
+}